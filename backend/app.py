@@ -11,10 +11,11 @@ import os
 try:
     from flask import Flask, request, jsonify
     from flask_cors import CORS
+    from flask_compress import Compress
     from flask_sqlalchemy import SQLAlchemy
     from flask_migrate import Migrate
     from flask_socketio import SocketIO, emit, join_room
-    from flask_jwt_extended import JWTManager
+    from flask_jwt_extended import JWTManager, decode_token
     from flask_limiter import Limiter
     from flask_limiter.util import get_remote_address
     from celery import Celery
@@ -24,6 +25,7 @@ try:
     from utils.rate_limiting import create_rate_limiter, rate_limit_handler
     from utils.security import SecurityMiddleware
     from utils.logging import RequestLogger, logger, monitor
+    from utils.json_provider import init_json_provider, json_column_dumps, json_column_loads
     print(" All imports successful")
 except Exception as e:
     print(f" Import error: {e}")
@@ -40,6 +42,7 @@ os.environ['NO_PROXY'] = 'localhost,127.0.0.1'
 # Initialize Flask app
 print(" Initializing Flask app...")
 app = Flask(__name__)
+init_json_provider(app)
 
 # Configuration
 print(" Loading configuration...")
@@ -52,11 +55,20 @@ else:
     # Use SQLite as fallback (no external database needed)
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///asi_agents.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool sized for gunicorn workers x threads. Pre-ping adds a round-trip on
+# every checkout, so it is off by default; enable it when connections go
+# through something that drops idle sockets without PgBouncer in front.
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_pre_ping': True,
-    'pool_recycle': 300,
-    'pool_size': 10,
-    'max_overflow': 20
+    'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'false').lower() == 'true',
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 3600)),
+    'pool_size': int(os.getenv('DB_POOL_SIZE', 20)),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+    # Rows per INSERT when batching executemany() (e.g. /api/agents/bulk)
+    'insertmanyvalues_page_size': 1000,
+    # Encode/decode JSON and JSONB columns (message metadata, relationships,
+    # capabilities) with orjson instead of the stdlib
+    'json_serializer': json_column_dumps,
+    'json_deserializer': json_column_loads
 }
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-string')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = False
@@ -71,6 +83,13 @@ jwt = JWTManager(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 CORS(app)
 
+# Compress JSON responses (audit reports run to tens of KB); tiny bodies are
+# not worth the CPU
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+Compress(app)
+
 # Initialize rate limiter
 limiter = create_rate_limiter(app)
 app.register_error_handler(429, rate_limit_handler)
@@ -114,7 +133,16 @@ print(" All blueprints registered")
 # Socket.IO events
 print(" Setting up Socket.IO events...")
 @socketio.on('connect')
-def handle_connect():
+def handle_connect(auth=None):
+    # Async message replies go to the sender's own room; only a verified
+    # access token (io(url, {auth: {token}})) puts a client in it
+    token = (auth or {}).get('token') if isinstance(auth, dict) else None
+    if token:
+        try:
+            identity = decode_token(token)['sub']
+        except Exception:
+            return False  # reject the connection
+        join_room(f'user_{identity}')
     print('Client connected')
     # Don't emit status message to avoid duplicate notifications
     # emit('status', {'message': 'Connected to ASI Agents Platform'})
@@ -3,6 +3,7 @@
 
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- Create custom types
 DO $$ BEGIN
@@ -34,9 +35,9 @@ CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
     username VARCHAR(80) UNIQUE NOT NULL,
     email VARCHAR(120) UNIQUE NOT NULL,
-    password_hash VARCHAR(128) NOT NULL,
+    password_hash BYTEA NOT NULL,
     wallet_address VARCHAR(42) UNIQUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP) NOT NULL,
     is_active BOOLEAN DEFAULT TRUE,
     last_login TIMESTAMP,
     profile_data JSONB DEFAULT '{}'::jsonb
@@ -52,8 +53,8 @@ CREATE TABLE IF NOT EXISTS agents (
     status agent_status DEFAULT 'active',
     agent_type VARCHAR(50) NOT NULL,
     owner_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP) NOT NULL,
+    last_seen TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP) NOT NULL,
     agent_metadata JSONB DEFAULT '{}'::jsonb,
     health_score DECIMAL(3,2) DEFAULT 1.00 CHECK (health_score >= 0 AND health_score <= 1)
 );
@@ -65,7 +66,7 @@ CREATE TABLE IF NOT EXISTS messages (
     sender_type message_sender_type NOT NULL,
     agent_id INTEGER REFERENCES agents(id) ON DELETE CASCADE,
     user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    timestamp TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP) NOT NULL,
     message_type VARCHAR(20) DEFAULT 'text',
     metadata JSONB DEFAULT '{}'::jsonb,
     is_read BOOLEAN DEFAULT FALSE,
@@ -81,8 +82,8 @@ CREATE TABLE IF NOT EXISTS knowledge_graph (
     relationships JSONB DEFAULT '{}'::jsonb,
     source VARCHAR(100),
     confidence_score DECIMAL(3,2) DEFAULT 0.80 CHECK (confidence_score >= 0 AND confidence_score <= 1),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP) NOT NULL,
+    updated_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP) NOT NULL,
     usage_count INTEGER DEFAULT 0,
     tags TEXT[] DEFAULT '{}'
 );
@@ -92,9 +93,9 @@ CREATE TABLE IF NOT EXISTS agent_sessions (
     id SERIAL PRIMARY KEY,
     agent_id INTEGER NOT NULL REFERENCES agents(id) ON DELETE CASCADE,
     user_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
-    session_id VARCHAR(100) UNIQUE NOT NULL,
+    session_id UUID UNIQUE NOT NULL,
     status session_status DEFAULT 'active',
-    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP) NOT NULL,
     ended_at TIMESTAMP,
     agent_metadata JSONB DEFAULT '{}'::jsonb,
     interaction_count INTEGER DEFAULT 0,
@@ -111,7 +112,7 @@ CREATE TABLE IF NOT EXISTS transactions (
     gas_used INTEGER,
     gas_price BIGINT,
     block_number INTEGER,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP) NOT NULL,
     agent_metadata JSONB DEFAULT '{}'::jsonb,
     network VARCHAR(20) DEFAULT 'ethereum',
     value DECIMAL(36,18) DEFAULT 0
@@ -126,22 +127,29 @@ CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at);
 CREATE INDEX IF NOT EXISTS idx_agents_owner_id ON agents(owner_id);
 CREATE INDEX IF NOT EXISTS idx_agents_status ON agents(status);
 CREATE INDEX IF NOT EXISTS idx_agents_type ON agents(agent_type);
+CREATE INDEX IF NOT EXISTS ix_agents_type_status ON agents(agent_type, status);
 CREATE INDEX IF NOT EXISTS idx_agents_last_seen ON agents(last_seen);
+CREATE INDEX IF NOT EXISTS ix_agents_caps_gin ON agents USING gin(capabilities jsonb_path_ops);
 
 CREATE INDEX IF NOT EXISTS idx_messages_agent_id ON messages(agent_id);
 CREATE INDEX IF NOT EXISTS idx_messages_user_id ON messages(user_id);
 CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp);
 CREATE INDEX IF NOT EXISTS idx_messages_sender_type ON messages(sender_type);
+CREATE INDEX IF NOT EXISTS idx_messages_agent_user_timestamp ON messages(agent_id, user_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_messages_agent_timestamp ON messages(agent_id, timestamp, id);
 
 CREATE INDEX IF NOT EXISTS idx_knowledge_concept ON knowledge_graph(concept);
 CREATE INDEX IF NOT EXISTS idx_knowledge_domain ON knowledge_graph(domain);
 CREATE INDEX IF NOT EXISTS idx_knowledge_confidence ON knowledge_graph(confidence_score);
 CREATE INDEX IF NOT EXISTS idx_knowledge_created_at ON knowledge_graph(created_at);
+CREATE INDEX IF NOT EXISTS ix_kg_concept_trgm ON knowledge_graph USING gin(concept gin_trgm_ops);
 
 CREATE INDEX IF NOT EXISTS idx_sessions_agent_id ON agent_sessions(agent_id);
-CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON agent_sessions(user_id);
 CREATE INDEX IF NOT EXISTS idx_sessions_status ON agent_sessions(status);
 CREATE INDEX IF NOT EXISTS idx_sessions_started_at ON agent_sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_started ON agent_sessions(user_id, started_at, id);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_status_started ON agent_sessions(user_id, status, started_at, id);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_agent_started ON agent_sessions(user_id, agent_id, started_at, id);
 
 CREATE INDEX IF NOT EXISTS idx_transactions_agent_id ON transactions(agent_id);
 CREATE INDEX IF NOT EXISTS idx_transactions_hash ON transactions(transaction_hash);
@@ -214,7 +222,7 @@ ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON FUNCTIONS TO asi_user;
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
 BEGIN
-    NEW.updated_at = CURRENT_TIMESTAMP;
+    NEW.updated_at = TIMEZONE('utc', CURRENT_TIMESTAMP);
     RETURN NEW;
 END;
 $$ language 'plpgsql';
@@ -226,9 +234,9 @@ CREATE TRIGGER update_knowledge_graph_updated_at
 
 -- Create a function to generate session IDs
 CREATE OR REPLACE FUNCTION generate_session_id()
-RETURNS TEXT AS $$
+RETURNS UUID AS $$
 BEGIN
-    RETURN 'session_' || extract(epoch from now())::bigint || '_' || substr(md5(random()::text), 1, 8);
+    RETURN uuid_generate_v4();
 END;
 $$ LANGUAGE plpgsql;
 
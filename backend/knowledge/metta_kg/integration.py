@@ -6,6 +6,7 @@ import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +18,22 @@ class MeTTaKnowledgeGraph:
     
     def __init__(self, endpoint: str = "http://localhost:8080"):
         self.endpoint = endpoint
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        })
+        # requests.Session isn't thread-safe and the knowledge routes call in
+        # from a thread pool, so each thread keeps its own pooled session
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session for the calling thread, created on first use"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                'Content-Type': 'application/json',
+                'Accept': 'application/json'
+            })
+            self._local.session = session
+        return session
     
     def query_concept(self, concept: str) -> Optional[Dict[str, Any]]:
         """
@@ -68,11 +68,22 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            # WAL + NORMAL sync avoid an fsync per commit during bulk loads.
+            # journal_mode cannot change inside a transaction, so commit first.
+            connection.exec_driver_sql('PRAGMA journal_mode=WAL')
+            connection.exec_driver_sql('PRAGMA synchronous=NORMAL')
+            connection.commit()
+
         context.configure(
             connection=connection, target_metadata=target_metadata
         )
 
         with context.begin_transaction():
+            if connection.dialect.name == 'postgresql':
+                # Scoped to the migration transaction; skips the WAL flush
+                # wait on each commit barrier inside it
+                context.execute('SET LOCAL synchronous_commit = off')
             context.run_migrations()
 
 
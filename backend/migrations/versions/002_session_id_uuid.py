@@ -0,0 +1,66 @@
+"""Store agent session IDs as UUID
+
+Revision ID: 002_session_id_uuid
+Revises: 001_initial
+Create Date: 2024-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import hashlib
+import re
+import uuid
+
+
+# revision identifiers, used by Alembic.
+revision = '002_session_id_uuid'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+# Older rows may hold IDs like 'session_1700000000_ab12cd34' (the old init.sql
+# generate_session_id()). Those can't be cast, so they become md5(old id) read
+# as a UUID: stable, and reproducible from the old value on either backend.
+UUID_PATTERN = '^[0-9a-fA-F]{8}(-?[0-9a-fA-F]{4}){3}-?[0-9a-fA-F]{12}$'
+
+
+def _legacy_uuid_hex(value):
+    if re.match(UUID_PATTERN, value):
+        return uuid.UUID(value).hex
+    return hashlib.md5(value.encode('utf-8')).hexdigest()
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # 16-byte native uuid instead of a 36-character varchar
+        op.execute(
+            'ALTER TABLE agent_sessions ALTER COLUMN session_id TYPE UUID USING '
+            f"CASE WHEN session_id ~ '{UUID_PATTERN}' THEN session_id::uuid ELSE md5(session_id)::uuid END"
+        )
+    else:
+        # Generic Uuid is CHAR(32) hex without dashes
+        sessions = sa.table('agent_sessions', sa.column('id', sa.Integer), sa.column('session_id', sa.String))
+        for row in bind.execute(sa.select(sessions.c.id, sessions.c.session_id)).all():
+            converted = _legacy_uuid_hex(row.session_id)
+            if converted != row.session_id:
+                bind.execute(
+                    sessions.update().where(sessions.c.id == row.id).values(session_id=converted)
+                )
+        with op.batch_alter_table('agent_sessions') as batch_op:
+            batch_op.alter_column('session_id',
+                existing_type=sa.String(length=100),
+                type_=sa.Uuid(),
+                existing_nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE agent_sessions ALTER COLUMN session_id TYPE VARCHAR(100) USING session_id::text')
+    else:
+        with op.batch_alter_table('agent_sessions') as batch_op:
+            batch_op.alter_column('session_id',
+                existing_type=sa.Uuid(),
+                type_=sa.String(length=100),
+                existing_nullable=False)
@@ -0,0 +1,48 @@
+"""Switch JSON columns to JSONB and index agent capabilities
+
+Revision ID: 003_jsonb_columns
+Revises: 002_session_id_uuid
+Create Date: 2024-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003_jsonb_columns'
+down_revision = '002_session_id_uuid'
+branch_labels = None
+depends_on = None
+
+JSON_COLUMNS = [
+    ('agents', 'capabilities'),
+    ('agents', 'agent_metadata'),
+    ('knowledge_graph', 'relationships'),
+    ('agent_sessions', 'agent_metadata'),
+    ('transactions', 'agent_metadata'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # JSONB and GIN are PostgreSQL-only; other backends keep JSON
+        op.create_index('ix_agents_caps_gin', 'agents', ['capabilities'])
+        return
+    
+    for table, column in JSON_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb')
+    
+    op.create_index('ix_agents_caps_gin', 'agents', ['capabilities'],
+                    postgresql_using='gin',
+                    postgresql_ops={'capabilities': 'jsonb_path_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_agents_caps_gin', table_name='agents')
+    
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    for table, column in JSON_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE JSON USING {column}::json')
@@ -0,0 +1,24 @@
+"""Add composite index on agents (agent_type, status)
+
+Revision ID: 004_agents_type_status_index
+Revises: 003_jsonb_columns
+Create Date: 2024-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004_agents_type_status_index'
+down_revision = '003_jsonb_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_agents_type_status', 'agents', ['agent_type', 'status'])
+
+
+def downgrade():
+    op.drop_index('ix_agents_type_status', table_name='agents')
@@ -0,0 +1,63 @@
+"""Fill timestamp columns on the database side
+
+Revision ID: 005_timestamp_server_defaults
+Revises: 004_agents_type_status_index
+Create Date: 2024-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005_timestamp_server_defaults'
+down_revision = '004_agents_type_status_index'
+branch_labels = None
+depends_on = None
+
+TIMESTAMP_COLUMNS = {
+    'users': ('created_at',),
+    'agents': ('created_at', 'last_seen'),
+    'messages': ('timestamp',),
+    'knowledge_graph': ('created_at', 'updated_at'),
+    'agent_sessions': ('started_at',),
+    'transactions': ('created_at',),
+}
+
+
+def _utc_now_sql():
+    # The columns are TIMESTAMP WITHOUT TIME ZONE holding UTC; PostgreSQL's now()
+    # would store the session's local time instead
+    if op.get_bind().dialect.name == 'postgresql':
+        return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+    return 'CURRENT_TIMESTAMP'
+
+
+def upgrade():
+    utc_now = _utc_now_sql()
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        # Backfill rows written without a timestamp before tightening to NOT NULL
+        for column in columns:
+            op.execute(
+                sa.text(f'UPDATE {table} SET "{column}" = {utc_now} WHERE "{column}" IS NULL')
+            )
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    server_default=sa.text(utc_now),
+                    nullable=False,
+                )
+
+
+def downgrade():
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    server_default=None,
+                    nullable=True,
+                )
@@ -0,0 +1,41 @@
+"""Store bcrypt password hashes as raw bytes
+
+Revision ID: 006_password_hash_bytes
+Revises: 005_timestamp_server_defaults
+Create Date: 2024-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006_password_hash_bytes'
+down_revision = '005_timestamp_server_defaults'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE users ALTER COLUMN password_hash TYPE BYTEA USING convert_to(password_hash, 'UTF8')")
+    else:
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.alter_column('password_hash',
+                existing_type=sa.String(length=128),
+                type_=sa.LargeBinary(length=60),
+                existing_nullable=False)
+        # SQLite keeps the TEXT storage class on copied rows; make them BLOBs
+        op.execute('UPDATE users SET password_hash = CAST(password_hash AS BLOB)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE users ALTER COLUMN password_hash TYPE VARCHAR(128) USING convert_from(password_hash, 'UTF8')")
+    else:
+        op.execute('UPDATE users SET password_hash = CAST(password_hash AS TEXT)')
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.alter_column('password_hash',
+                existing_type=sa.LargeBinary(length=60),
+                type_=sa.String(length=128),
+                existing_nullable=False)
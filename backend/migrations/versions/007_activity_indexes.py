@@ -0,0 +1,32 @@
+"""Index messages.timestamp and agents.status for activity counts
+
+Revision ID: 007_activity_indexes
+Revises: 006_password_hash_bytes
+Create Date: 2024-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_activity_indexes'
+down_revision = '006_password_hash_bytes'
+branch_labels = None
+depends_on = None
+
+# Same names as init.sql, so databases created from it are left untouched
+ACTIVITY_INDEXES = {
+    'idx_messages_timestamp': ('messages', ['timestamp']),
+    'idx_agents_status': ('agents', ['status']),
+}
+
+
+def upgrade():
+    for name, (table, columns) in ACTIVITY_INDEXES.items():
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, (table, _) in ACTIVITY_INDEXES.items():
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,33 @@
+"""Trigram index for substring search on knowledge_graph.concept
+
+Revision ID: 008_knowledge_concept_trgm
+Revises: 007_activity_indexes
+Create Date: 2024-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_knowledge_concept_trgm'
+down_revision = '007_activity_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # pg_trgm is PostgreSQL-only; a plain index here would duplicate the
+        # idx_knowledge_concept B-tree that 011 adds
+        return
+    
+    # concept LIKE '%text%' can use a trigram GIN index but never a B-tree
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_kg_concept_trgm', 'knowledge_graph', ['concept'],
+                    postgresql_using='gin',
+                    postgresql_ops={'concept': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_kg_concept_trgm', table_name='knowledge_graph', if_exists=True)
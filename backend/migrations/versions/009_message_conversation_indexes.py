@@ -0,0 +1,35 @@
+"""Composite indexes for conversation reads on messages
+
+Revision ID: 009_message_conversation_indexes
+Revises: 008_knowledge_concept_trgm
+Create Date: 2024-10-21 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009_message_conversation_indexes'
+down_revision = '008_knowledge_concept_trgm'
+branch_labels = None
+depends_on = None
+
+# Equality columns first, then the ORDER BY (timestamp, id) so rows come back
+# already sorted; same names as init.sql
+CONVERSATION_INDEXES = {
+    # get_messages / get_conversation: agent_id = ? AND user_id = ?
+    'idx_messages_agent_user_timestamp': ['agent_id', 'user_id', 'timestamp', 'id'],
+    # generate_agent_response context: agent_id = ?, newest first
+    'idx_messages_agent_timestamp': ['agent_id', 'timestamp', 'id'],
+}
+
+
+def upgrade():
+    for name, columns in CONVERSATION_INDEXES.items():
+        op.create_index(name, 'messages', columns, if_not_exists=True)
+
+
+def downgrade():
+    for name in CONVERSATION_INDEXES:
+        op.drop_index(name, table_name='messages', if_exists=True)
@@ -0,0 +1,35 @@
+"""Full-text index over knowledge_graph concept and definition
+
+Revision ID: 010_knowledge_search_index
+Revises: 009_message_conversation_indexes
+Create Date: 2024-10-21 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010_knowledge_search_index'
+down_revision = '009_message_conversation_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # Other backends keep the LIKE lookup only
+        return
+    
+    # Same name and expression as init.sql; query_knowledge filters on this
+    # exact expression so the planner can use it
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_knowledge_search ON knowledge_graph "
+        "USING gin(to_tsvector('english', concept || ' ' || COALESCE(definition, '')))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP INDEX IF EXISTS idx_knowledge_search')
@@ -0,0 +1,25 @@
+"""B-tree index for exact knowledge_graph.concept lookups
+
+Revision ID: 011_knowledge_concept_index
+Revises: 010_knowledge_search_index
+Create Date: 2024-10-21 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011_knowledge_concept_index'
+down_revision = '010_knowledge_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The trigram index serves LIKE but not concept = ?; same name as init.sql
+    op.create_index('idx_knowledge_concept', 'knowledge_graph', ['concept'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('idx_knowledge_concept', table_name='knowledge_graph', if_exists=True)
@@ -0,0 +1,27 @@
+"""Composite index for a user's sessions newest-first
+
+Revision ID: 012_sessions_user_started_index
+Revises: 011_knowledge_concept_index
+Create Date: 2024-10-22 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012_sessions_user_started_index'
+down_revision = '011_knowledge_concept_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # get_sessions filters by user_id and pages by (started_at, id) descending;
+    # same name as init.sql
+    op.create_index('idx_sessions_user_started', 'agent_sessions', ['user_id', 'started_at', 'id'],
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('idx_sessions_user_started', table_name='agent_sessions', if_exists=True)
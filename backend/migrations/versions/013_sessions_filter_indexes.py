@@ -0,0 +1,34 @@
+"""Composite indexes for filtered session listings
+
+Revision ID: 013_sessions_filter_indexes
+Revises: 012_sessions_user_started_index
+Create Date: 2024-10-23 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013_sessions_filter_indexes'
+down_revision = '012_sessions_user_started_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # get_sessions with ?status= (and get_active_sessions) or ?agent_id= still
+    # orders by (started_at, id) descending; same names as init.sql
+    op.create_index('idx_sessions_user_status_started', 'agent_sessions',
+                    ['user_id', 'status', 'started_at', 'id'], if_not_exists=True)
+    op.create_index('idx_sessions_user_agent_started', 'agent_sessions',
+                    ['user_id', 'agent_id', 'started_at', 'id'], if_not_exists=True)
+    # Every user_id lookup is served by the leading column of the composites;
+    # init.sql databases still carry the single-column index
+    op.drop_index('idx_sessions_user_id', table_name='agent_sessions', if_exists=True)
+
+
+def downgrade():
+    op.create_index('idx_sessions_user_id', 'agent_sessions', ['user_id'], if_not_exists=True)
+    op.drop_index('idx_sessions_user_agent_started', table_name='agent_sessions', if_exists=True)
+    op.drop_index('idx_sessions_user_status_started', table_name='agent_sessions', if_exists=True)
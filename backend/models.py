@@ -1,20 +1,47 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
+import os
+import time
+import uuid
+from operator import attrgetter
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, LargeBinary, Uuid
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import FunctionElement
 from flask_sqlalchemy import SQLAlchemy
 
 # This will be initialized in app.py
 db = SQLAlchemy()
 
+# Binary JSONB on PostgreSQL (no re-parse on read, GIN-indexable), plain JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), 'postgresql')
+
+
+class utcnow(FunctionElement):
+    """Current UTC time for TIMESTAMP WITHOUT TIME ZONE columns"""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    # now() follows the session TimeZone; pin it so naive columns hold UTC
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
 class User(db.Model):
     __tablename__ = 'users'
     
     id = Column(Integer, primary_key=True)
     username = Column(String(80), unique=True, nullable=False)
     email = Column(String(120), unique=True, nullable=False)
-    password_hash = Column(String(128), nullable=False)
+    password_hash = Column(LargeBinary(60), nullable=False)  # raw bcrypt output, no str round-trip
     wallet_address = Column(String(42), unique=True, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
     is_active = Column(Boolean, default=True)
     
     # Relationships
@@ -23,58 +50,114 @@ class User(db.Model):
 
 class Agent(db.Model):
     __tablename__ = 'agents'
+    __table_args__ = (
+        # Containment (@>) lookups on capabilities; plain index on non-PostgreSQL backends
+        db.Index('ix_agents_caps_gin', 'capabilities',
+                 postgresql_using='gin', postgresql_ops={'capabilities': 'jsonb_path_ops'}),
+        # Equality filters on the agent list
+        db.Index('ix_agents_type_status', 'agent_type', 'status'),
+        # Status-only filters such as the active-agent count
+        db.Index('idx_agents_status', 'status'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     address = Column(String(100), unique=True, nullable=False)
     description = Column(Text, nullable=True)
-    capabilities = Column(JSON, nullable=True)
+    capabilities = Column(JSONType, nullable=True)
     status = Column(String(20), default='inactive')  # active, inactive, connecting
     agent_type = Column(String(50), nullable=False)  # healthcare, logistics, finance, etc.
     owner_id = Column(Integer, ForeignKey('users.id'), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_seen = Column(DateTime, default=datetime.utcnow)
-    agent_metadata = Column(JSON, nullable=True)
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
+    last_seen = Column(DateTime, server_default=utcnow(), nullable=False)
+    agent_metadata = Column(JSONType, nullable=True)
     
     # Relationships
     messages = relationship('Message', backref='agent', lazy='dynamic')
+    
+    # Plain columns copied as-is into the API representation
+    _DICT_FIELDS = ('id', 'name', 'address', 'description', 'capabilities', 'status', 'agent_type')
+    _get_dict_fields = attrgetter(*_DICT_FIELDS)
+    
+    def to_dict(self, include_metadata=False):
+        """Serialize the agent for API responses"""
+        data = dict(zip(self._DICT_FIELDS, self._get_dict_fields(self)))
+        data['last_seen'] = self.last_seen.isoformat() if self.last_seen else None
+        data['created_at'] = self.created_at.isoformat() if self.created_at else None
+        if include_metadata:
+            data['metadata'] = self.agent_metadata
+        return data
 
 class Message(db.Model):
     __tablename__ = 'messages'
+    __table_args__ = (
+        # Recent-activity range scans (e.g. the last 24 hours in /health/metrics)
+        db.Index('idx_messages_timestamp', 'timestamp'),
+        # Conversation reads filter by agent (and user) and order by (timestamp, id)
+        db.Index('idx_messages_agent_user_timestamp', 'agent_id', 'user_id', 'timestamp', 'id'),
+        db.Index('idx_messages_agent_timestamp', 'agent_id', 'timestamp', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     content = Column(Text, nullable=False)
     sender_type = Column(String(20), nullable=False)  # user, agent, system
     agent_id = Column(Integer, ForeignKey('agents.id'), nullable=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, server_default=utcnow(), nullable=False)
     message_type = Column(String(20), default='text')  # text, image, file, command
-    message_metadata = Column(JSON, nullable=True)  # Changed from metadata to message_metadata
+    message_metadata = Column(JSONType, nullable=True)  # Changed from metadata to message_metadata
 
 class KnowledgeGraph(db.Model):
     __tablename__ = 'knowledge_graph'
+    __table_args__ = (
+        # Trigram GIN serves concept LIKE '%text%' lookups on PostgreSQL (needs pg_trgm);
+        # elsewhere it would just duplicate idx_knowledge_concept, so it is skipped
+        db.Index('ix_kg_concept_trgm', 'concept',
+                 postgresql_using='gin', postgresql_ops={'concept': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        # Exact concept lookups (get_concept); not unique, duplicates are allowed
+        db.Index('idx_knowledge_concept', 'concept'),
+    )
     
     id = Column(Integer, primary_key=True)
     concept = Column(String(200), nullable=False)
     definition = Column(Text, nullable=True)
     domain = Column(String(100), nullable=True, default='general')
-    relationships = Column(JSON, nullable=True)
+    relationships = Column(JSONType, nullable=True)
     source = Column(String(100), nullable=True)  # metta, manual, imported
     confidence_score = Column(Integer, default=0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=False)
+
+def new_session_id() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7) for AgentSession.session_id
+    
+    The leading 48 bits are the Unix time in milliseconds, so new ids land at
+    the right-hand edge of the unique index instead of on a random leaf page.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    # Stamp version 7 and the RFC 4122 variant over the random bits
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
 
 class AgentSession(db.Model):
     __tablename__ = 'agent_sessions'
+    __table_args__ = (
+        # A user's sessions newest-first, (started_at, id) keyset pages in get_sessions
+        db.Index('idx_sessions_user_started', 'user_id', 'started_at', 'id'),
+        # The same order within ?status= (and /active) or ?agent_id= filters
+        db.Index('idx_sessions_user_status_started', 'user_id', 'status', 'started_at', 'id'),
+        db.Index('idx_sessions_user_agent_started', 'user_id', 'agent_id', 'started_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     agent_id = Column(Integer, ForeignKey('agents.id'), nullable=False)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
-    session_id = Column(String(100), unique=True, nullable=False)
+    session_id = Column(Uuid, unique=True, nullable=False, default=new_session_id)  # native UUID on PostgreSQL, CHAR(32) elsewhere
     status = Column(String(20), default='active')  # active, ended, timeout
-    started_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, server_default=utcnow(), nullable=False)
     ended_at = Column(DateTime, nullable=True)
-    agent_metadata = Column(JSON, nullable=True)
+    agent_metadata = Column(JSONType, nullable=True)
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
@@ -87,5 +170,5 @@ class Transaction(db.Model):
     gas_used = Column(Integer, nullable=True)
     gas_price = Column(Integer, nullable=True)
     block_number = Column(Integer, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    agent_metadata = Column(JSON, nullable=True)
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
+    agent_metadata = Column(JSONType, nullable=True)
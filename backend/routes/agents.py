@@ -1,29 +1,127 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Agent, Message, AgentSession, db
+from models import Agent, Message, AgentSession, db, new_session_id
+from sqlalchemy import insert, update, select, exists, lambda_stmt, bindparam, event, func, and_
+from sqlalchemy.orm import Session, object_session
+from cachetools import TTLCache
 from datetime import datetime
+from threading import Lock
 import uuid
 
+from utils.json_provider import stream_json_array
+
 agents_bp = Blueprint('agents', __name__)
 
+# Short-TTL cache for the list/status endpoints the UI polls. Per-process only;
+# the TTL bounds staleness across workers.
+AGENTS_CACHE_TTL = 5
+_agents_cache = TTLCache(maxsize=16, ttl=AGENTS_CACHE_TTL)
+_agents_cache_lock = Lock()
+
+def _cached_payload(key, builder):
+    """Return the cached payload for key, building it on a miss"""
+    with _agents_cache_lock:
+        payload = _agents_cache.get(key)
+    if payload is None:
+        payload = builder()
+        with _agents_cache_lock:
+            _agents_cache[key] = payload
+    return payload
+
+def invalidate_agents_cache(*args):
+    """Drop cached agent payloads after any agent or session write"""
+    with _agents_cache_lock:
+        _agents_cache.clear()
+
+def _mark_agents_changed(mapper, connection, target):
+    """Note an agent or session write; the cache is dropped once it commits"""
+    session = object_session(target)
+    if session is not None:
+        session.info['agents_changed'] = True
+
+def _invalidate_after_commit(session):
+    # Clearing at flush would let a reader re-cache the pre-commit rows
+    if session.info.pop('agents_changed', False):
+        invalidate_agents_cache()
+
+def _discard_after_rollback(session):
+    session.info.pop('agents_changed', None)
+
+for _model in (Agent, AgentSession):
+    for _event in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event, _mark_agents_changed)
+event.listen(Session, 'after_commit', _invalidate_after_commit)
+event.listen(Session, 'after_rollback', _discard_after_rollback)
+
+# Rows fetched per round trip when streaming an agent's message history
+MESSAGES_STREAM_BATCH = 500
+
+# Statements built once at import; lambda_stmt caches the construction and
+# compiled SQL so only the bound parameters change per request
+_AGENT_BY_ID = lambda_stmt(lambda: select(Agent).where(Agent.id == bindparam('agent_id')))
+_AGENT_MESSAGES = lambda_stmt(
+    lambda: select(
+        Message.id, Message.content, Message.sender_type, Message.timestamp, Message.message_type
+    ).where(Message.agent_id == bindparam('agent_id')).order_by(Message.timestamp.desc(), Message.id.desc())
+)
+_COUNT_AGENT_MESSAGES = lambda_stmt(
+    lambda: select(func.count(Message.id)).where(Message.agent_id == bindparam('agent_id'))
+)
+_COUNT_AGENT_SESSIONS = lambda_stmt(
+    lambda: select(func.count(AgentSession.id)).where(AgentSession.agent_id == bindparam('agent_id'))
+)
+
+def _get_agent(agent_id):
+    """Primary-key lookup through the cached statement"""
+    return db.session.execute(_AGENT_BY_ID, {'agent_id': agent_id}).scalar_one_or_none()
+
+def _address_exists(address):
+    """Index-only EXISTS probe on the unique address column"""
+    return db.session.query(exists().where(Agent.address == address)).scalar()
+
+def _all_agents_payload(agent_type=None, status=None):
+    query = Agent.query
+    # Served by ix_agents_type_status
+    if agent_type:
+        query = query.filter_by(agent_type=agent_type)
+    if status:
+        query = query.filter_by(status=status)
+    
+    return [agent.to_dict() for agent in query.all()]
+
+def _agent_status_payload():
+    # One round-trip: active session counts come from a grouped outer join
+    # instead of a COUNT query per agent
+    rows = db.session.execute(
+        db.select(
+            Agent.id, Agent.name, Agent.status, Agent.last_seen,
+            func.count(AgentSession.id)
+        ).outerjoin(
+            AgentSession,
+            and_(AgentSession.agent_id == Agent.id, AgentSession.status == 'active')
+        ).group_by(Agent.id).order_by(Agent.id)
+    ).all()
+    
+    return [{
+        'agent_id': agent_id,
+        'name': name,
+        'status': status,
+        'active_sessions': active_sessions,
+        'last_seen': last_seen.isoformat() if last_seen else None
+    } for agent_id, name, status, last_seen, active_sessions in rows]
+
 @agents_bp.route('/', methods=['GET', 'POST'])
 @agents_bp.route('', methods=['GET', 'POST'])
 def agents():
     """Get all available agents or create a new agent"""
     if request.method == 'GET':
-        agents = Agent.query.all()
+        agent_type = request.args.get('type')
+        status = request.args.get('status')
         
-        return jsonify([{
-            'id': agent.id,
-            'name': agent.name,
-            'address': agent.address,
-            'description': agent.description,
-            'capabilities': agent.capabilities,
-            'status': agent.status,
-            'agent_type': agent.agent_type,
-            'last_seen': agent.last_seen.isoformat() if agent.last_seen else None,
-            'created_at': agent.created_at.isoformat()
-        } for agent in agents]), 200
+        return jsonify(_cached_payload(
+            ('agents', agent_type, status),
+            lambda: _all_agents_payload(agent_type, status)
+        )), 200
     
     elif request.method == 'POST':
         # Create new agent (requires authentication)
@@ -41,8 +139,7 @@ def agents():
                 return jsonify({'error': f'{field} is required'}), 400
         
         # Check if agent with same address already exists
-        existing_agent = Agent.query.filter_by(address=data['address']).first()
-        if existing_agent:
+        if _address_exists(data['address']):
             return jsonify({'error': 'Agent with this address already exists'}), 400
         
         agent = Agent(
@@ -57,37 +154,17 @@ def agents():
         db.session.add(agent)
         db.session.commit()
         
-        return jsonify({
-            'id': agent.id,
-            'name': agent.name,
-            'address': agent.address,
-            'description': agent.description,
-            'capabilities': agent.capabilities,
-            'status': agent.status,
-            'agent_type': agent.agent_type,
-            'created_at': agent.created_at.isoformat()
-        }), 201
+        return jsonify(agent.to_dict()), 201
 
 @agents_bp.route('/<int:agent_id>', methods=['GET'])
 def get_agent(agent_id):
     """Get specific agent details"""
-    agent = Agent.query.get(agent_id)
+    agent = _get_agent(agent_id)
     
     if not agent:
         return jsonify({'error': 'Agent not found'}), 404
     
-    return jsonify({
-        'id': agent.id,
-        'name': agent.name,
-        'address': agent.address,
-        'description': agent.description,
-        'capabilities': agent.capabilities,
-        'status': agent.status,
-        'agent_type': agent.agent_type,
-        'last_seen': agent.last_seen.isoformat() if agent.last_seen else None,
-        'created_at': agent.created_at.isoformat(),
-        'metadata': agent.agent_metadata
-    }), 200
+    return jsonify(agent.to_dict(include_metadata=True)), 200
 
 @agents_bp.route('/connect', methods=['POST'])
 @jwt_required()
@@ -99,7 +176,7 @@ def connect_agent():
     if not data or not data.get('agent_id'):
         return jsonify({'error': 'Agent ID is required'}), 400
     
-    agent = Agent.query.get(data['agent_id'])
+    agent = _get_agent(data['agent_id'])
     
     if not agent:
         return jsonify({'error': 'Agent not found'}), 404
@@ -108,7 +185,7 @@ def connect_agent():
         return jsonify({'error': 'Agent is not available'}), 400
     
     # Create new session
-    session_id = str(uuid.uuid4())
+    session_id = new_session_id()
     session = AgentSession(
         agent_id=agent.id,
         user_id=int(user_id),
@@ -121,7 +198,7 @@ def connect_agent():
     
     return jsonify({
         'message': 'Connected to agent successfully',
-        'session_id': session_id,
+        'session_id': str(session_id),
         'agent_id': agent.id,
         'agent_name': agent.name
     }), 200
@@ -136,48 +213,39 @@ def disconnect_agent():
     if not data or not data.get('session_id'):
         return jsonify({'error': 'Session ID is required'}), 400
     
-    session = AgentSession.query.filter_by(
-        session_id=data['session_id'],
-        user_id=int(user_id),
-        status='active'
-    ).first()
+    try:
+        session_id = uuid.UUID(str(data['session_id']))
+    except ValueError:
+        return jsonify({'error': 'Invalid session ID'}), 400
+    
+    # End the session with one conditional UPDATE ... RETURNING
+    ended = db.session.execute(
+        update(AgentSession).where(
+            AgentSession.session_id == session_id,
+            AgentSession.user_id == int(user_id),
+            AgentSession.status == 'active'
+        ).values(
+            status='ended',
+            ended_at=datetime.utcnow()
+        ).returning(AgentSession.session_id).execution_options(synchronize_session=False)
+    ).scalar()
+    db.session.commit()
     
-    if not session:
+    if ended is None:
         return jsonify({'error': 'Active session not found'}), 404
     
-    # End the session
-    session.status = 'ended'
-    session.ended_at = datetime.utcnow()
-    
-    db.session.commit()
+    # Core-style updates bypass the mapper events
+    invalidate_agents_cache()
     
     return jsonify({
         'message': 'Disconnected from agent successfully',
-        'session_id': session.session_id
+        'session_id': str(ended)
     }), 200
 
 @agents_bp.route('/status', methods=['GET'])
 def get_agent_status():
     """Get status of all agents"""
-    agents = Agent.query.all()
-    
-    status_data = []
-    for agent in agents:
-        # Count active sessions
-        active_sessions = AgentSession.query.filter_by(
-            agent_id=agent.id,
-            status='active'
-        ).count()
-        
-        status_data.append({
-            'agent_id': agent.id,
-            'name': agent.name,
-            'status': agent.status,
-            'active_sessions': active_sessions,
-            'last_seen': agent.last_seen.isoformat() if agent.last_seen else None
-        })
-    
-    return jsonify(status_data), 200
+    return jsonify(_cached_payload('status', _agent_status_payload)), 200
 
 @agents_bp.route('/deploy', methods=['POST'])
 @jwt_required()
@@ -190,7 +258,7 @@ def deploy_agent():
         return jsonify({'error': 'Name and address are required'}), 400
     
     # Check if agent address already exists
-    if Agent.query.filter_by(address=data['address']).first():
+    if _address_exists(data['address']):
         return jsonify({'error': 'Agent address already exists'}), 400
     
     # Create new agent
@@ -214,35 +282,104 @@ def deploy_agent():
         'address': agent.address
     }), 201
 
+# Upper bound on agents accepted by one bulk request; keeps the address IN
+# list and the batched insert under driver parameter limits
+MAX_BULK_AGENTS = 1000
+
+@agents_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_deploy_agents():
+    """Deploy many agents in a single batched insert"""
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or not isinstance(data, list):
+        return jsonify({'error': 'A list of agents is required'}), 400
+    if len(data) > MAX_BULK_AGENTS:
+        return jsonify({'error': f'At most {MAX_BULK_AGENTS} agents per request'}), 400
+    
+    for index, item in enumerate(data):
+        if not isinstance(item, dict) or not item.get('name') or not item.get('address'):
+            return jsonify({'error': f'Name and address are required (item {index})'}), 400
+        if not isinstance(item['name'], str) or not isinstance(item['address'], str):
+            return jsonify({'error': f'Name and address must be strings (item {index})'}), 400
+    
+    addresses = [item['address'] for item in data]
+    if len(set(addresses)) != len(addresses):
+        return jsonify({'error': 'Duplicate addresses in request'}), 400
+    
+    # Check all address collisions in one round-trip
+    existing = db.session.execute(
+        db.select(Agent.address).where(Agent.address.in_(addresses))
+    ).scalars().all()
+    if existing:
+        return jsonify({
+            'error': 'Agent address already exists',
+            'addresses': existing
+        }), 400
+    
+    rows = [{
+        'name': item['name'],
+        'address': item['address'],
+        'description': item.get('description'),
+        'capabilities': item.get('capabilities', []),
+        'agent_type': item.get('agent_type', 'general'),
+        'status': item.get('status', 'inactive'),
+        'owner_id': int(user_id),
+        'agent_metadata': item.get('metadata', {})
+    } for item in data]
+    
+    # executemany / insertmanyvalues batches these into as few statements as possible
+    db.session.execute(insert(Agent), rows)
+    db.session.commit()
+    # Core-style bulk inserts bypass the mapper events
+    invalidate_agents_cache()
+    
+    return jsonify({
+        'message': 'Agents deployed successfully',
+        'count': len(rows),
+        'addresses': addresses
+    }), 201
+
 @agents_bp.route('/<int:agent_id>/messages', methods=['GET'])
 def get_agent_messages(agent_id):
     """Get messages for a specific agent"""
-    agent = Agent.query.get(agent_id)
+    agent = _get_agent(agent_id)
     
     if not agent:
         return jsonify({'error': 'Agent not found'}), 404
     
-    messages = Message.query.filter_by(agent_id=agent_id).order_by(Message.timestamp.desc()).all()
-    
-    return jsonify([{
-        'id': message.id,
-        'content': message.content,
-        'sender_type': message.sender_type,
-        'timestamp': message.timestamp.isoformat() if message.timestamp else None,
-        'message_type': message.message_type
-    } for message in messages]), 200
+    def generate():
+        # Server-side cursor fetching MESSAGES_STREAM_BATCH rows at a time
+        result = db.session.execute(
+            _AGENT_MESSAGES, {'agent_id': agent_id},
+            execution_options={'yield_per': MESSAGES_STREAM_BATCH}
+        )
+        for message_id, content, sender_type, timestamp, message_type in result:
+            yield {
+                'id': message_id,
+                'content': content,
+                'sender_type': sender_type,
+                'timestamp': timestamp.isoformat() if timestamp else None,
+                'message_type': message_type
+            }
+    
+    return Response(
+        stream_with_context(stream_json_array(generate(), MESSAGES_STREAM_BATCH)),
+        mimetype='application/json'
+    ), 200
 
 @agents_bp.route('/<int:agent_id>/stats', methods=['GET'])
 def get_agent_stats(agent_id):
     """Get statistics for a specific agent"""
-    agent = Agent.query.get(agent_id)
+    agent = _get_agent(agent_id)
     
     if not agent:
         return jsonify({'error': 'Agent not found'}), 404
     
     # Count messages and sessions
-    total_messages = Message.query.filter_by(agent_id=agent_id).count()
-    total_sessions = AgentSession.query.filter_by(agent_id=agent_id).count()
+    total_messages = db.session.execute(_COUNT_AGENT_MESSAGES, {'agent_id': agent_id}).scalar()
+    total_sessions = db.session.execute(_COUNT_AGENT_SESSIONS, {'agent_id': agent_id}).scalar()
     
     return jsonify({
         'agent_id': agent_id,
@@ -257,7 +394,7 @@ def get_agent_stats(agent_id):
 @jwt_required()
 def update_agent(agent_id):
     """Update an agent"""
-    agent = Agent.query.get(agent_id)
+    agent = _get_agent(agent_id)
     
     if not agent:
         return jsonify({'error': 'Agent not found'}), 404
@@ -279,23 +416,13 @@ def update_agent(agent_id):
     
     db.session.commit()
     
-    return jsonify({
-        'id': agent.id,
-        'name': agent.name,
-        'address': agent.address,
-        'description': agent.description,
-        'capabilities': agent.capabilities,
-        'status': agent.status,
-        'agent_type': agent.agent_type,
-        'last_seen': agent.last_seen.isoformat() if agent.last_seen else None,
-        'created_at': agent.created_at.isoformat()
-    }), 200
+    return jsonify(agent.to_dict()), 200
 
 @agents_bp.route('/<int:agent_id>', methods=['DELETE'])
 @jwt_required()
 def delete_agent(agent_id):
     """Delete an agent"""
-    agent = Agent.query.get(agent_id)
+    agent = _get_agent(agent_id)
     
     if not agent:
         return jsonify({'error': 'Agent not found'}), 404
@@ -1,10 +1,17 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, current_app, request, jsonify, g, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.smart_contract_auditor import contract_auditor
 from utils.logging import logger
 from utils.sanitization import require_sanitized_input, validate_input_schema, InputSanitizer
+from utils.json_provider import dumps_bytes
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 from datetime import datetime
+from threading import Lock
+import gzip
+import hashlib
 import json
+import uuid
 
 audit_bp = Blueprint('audit', __name__)
 
@@ -20,7 +27,7 @@ AUDIT_SCHEMAS = {
         'language': {
             'required': True,
             'type': str,
-            'pattern': r'^(solidity|vyper|rust)$'
+            'choices': frozenset({'solidity', 'vyper', 'rust'})
         },
         'contract_name': {
             'required': False,
@@ -38,11 +45,107 @@ AUDIT_SCHEMAS = {
         'language': {
             'required': True,
             'type': str,
-            'pattern': r'^(solidity|vyper|rust)$'
+            'choices': frozenset({'solidity', 'vyper', 'rust'})
         }
     }
 }
 
+# Contracts at least this long are audited on a background thread and polled
+# via /contract/result/<job_id>; shorter ones still finish inline. Jobs live
+# in this process only, so results must be fetched from the same worker.
+ASYNC_AUDIT_THRESHOLD = 5000
+MAX_BATCH_AUDITS = 100
+AUDIT_JOB_TTL = 3600
+_audit_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='audit')
+_audit_jobs = TTLCache(maxsize=1000, ttl=AUDIT_JOB_TTL)
+_audit_jobs_lock = Lock()
+
+# Batch items get their own small pool so a large batch cannot queue ahead of
+# single async audits on _audit_executor. Items waiting here are capped;
+# further batches get a 503 until earlier ones drain.
+MAX_PENDING_BATCH_AUDITS = 2 * MAX_BATCH_AUDITS
+_batch_audit_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='audit-batch')
+_pending_batch_audits = 0
+_pending_batch_audits_lock = Lock()
+
+def _reserve_batch_audits(count):
+    """Claim queue room for count batch items, False if the batch pool is full"""
+    global _pending_batch_audits
+    with _pending_batch_audits_lock:
+        if _pending_batch_audits + count > MAX_PENDING_BATCH_AUDITS:
+            return False
+        _pending_batch_audits += count
+        return True
+
+def _release_batch_audits(count):
+    """Return queue room once batch items have finished"""
+    global _pending_batch_audits
+    with _pending_batch_audits_lock:
+        _pending_batch_audits -= count
+
+# Reports for recently audited code, keyed on (sha256 of code, language, name),
+# so resubmitting an unchanged contract skips the analysis tools
+AUDIT_CACHE_TTL = 600
+_audit_report_cache = TTLCache(maxsize=256, ttl=AUDIT_CACHE_TTL)
+_audit_report_cache_lock = Lock()
+
+def _cached_audit(contract_code, language, contract_name):
+    """Audit a contract, reusing the report of an identical recent submission"""
+    key = (hashlib.sha256(contract_code.encode('utf-8')).digest(), language, contract_name)
+    with _audit_report_cache_lock:
+        audit_report = _audit_report_cache.get(key)
+    if audit_report is None:
+        audit_report = contract_auditor.audit_contract(
+            contract_code=contract_code,
+            language=language,
+            contract_name=contract_name
+        )
+        with _audit_report_cache_lock:
+            _audit_report_cache[key] = audit_report
+    return audit_report
+
+def _run_audit(contract_code, language, contract_name, user_id):
+    """Audit a contract and log the outcome"""
+    audit_report = _cached_audit(contract_code, language, contract_name)
+    
+    # Log audit completion
+    logger.log_event('INFO', 'smart_contract_audit_requested', {
+        'user_id': user_id,
+        'contract_name': contract_name,
+        'language': language,
+        'security_score': audit_report['security_score'],
+        'vulnerability_count': audit_report['summary']['total_vulnerabilities']
+    })
+    return audit_report
+
+def _run_in_app_context(app, func, *args):
+    """Background entry point; logging reads g, which needs an app context"""
+    with app.app_context():
+        return func(*args)
+
+def _audit_batch_item(item, user_id):
+    """Validate and audit one batch entry, raising ValueError for bad input"""
+    if not isinstance(item, dict):
+        raise ValueError('Each contract must be an object')
+    
+    contract_code = item.get('contract_code')
+    language = item.get('language')
+    code_rules = AUDIT_SCHEMAS['audit_contract']['contract_code']
+    if not isinstance(contract_code, str) or not (
+        code_rules['min_length'] <= len(contract_code) <= code_rules['max_length']
+    ):
+        raise ValueError(
+            f"'contract_code' must be between {code_rules['min_length']} and {code_rules['max_length']} characters"
+        )
+    if language not in contract_auditor.supported_languages:
+        raise ValueError(f"Unsupported language: {language}")
+    
+    is_valid, validation_errors = contract_auditor.validate_contract_code(contract_code, language)
+    if not is_valid:
+        raise ValueError('; '.join(validation_errors))
+    
+    return _run_audit(contract_code, language, item.get('contract_name'), user_id)
+
 @audit_bp.route('/contract', methods=['POST'])
 # @jwt_required()
 @require_sanitized_input
@@ -50,7 +153,7 @@ AUDIT_SCHEMAS = {
 def audit_smart_contract():
     """Perform comprehensive smart contract audit"""
     try:
-        data = getattr(g, 'sanitized_data', request.get_json())
+        data = g.sanitized_data
         user_id = None  # get_jwt_identity()
         
         contract_code = data['contract_code']
@@ -68,21 +171,23 @@ def audit_smart_contract():
                 'validation_errors': validation_errors
             }), 400
         
-        # Perform audit
-        audit_report = contract_auditor.audit_contract(
-            contract_code=contract_code,
-            language=language,
-            contract_name=contract_name
-        )
+        # Long contracts run in the background so the worker is not pinned
+        if len(contract_code) >= ASYNC_AUDIT_THRESHOLD:
+            job_id = str(uuid.uuid4())
+            future = _audit_executor.submit(
+                _run_in_app_context, current_app._get_current_object(), _run_audit,
+                contract_code, language, contract_name, user_id
+            )
+            with _audit_jobs_lock:
+                _audit_jobs[job_id] = future
+            
+            return jsonify({
+                'message': 'Contract audit started',
+                'job_id': job_id,
+                'status': 'pending'
+            }), 202
         
-        # Log audit completion
-        logger.log_event('INFO', 'smart_contract_audit_requested', {
-            'user_id': user_id,
-            'contract_name': contract_name,
-            'language': language,
-            'security_score': audit_report['security_score'],
-            'vulnerability_count': audit_report['summary']['total_vulnerabilities']
-        })
+        audit_report = _run_audit(contract_code, language, contract_name, user_id)
         
         return jsonify({
             'message': 'Contract audit completed successfully',
@@ -93,6 +198,85 @@ def audit_smart_contract():
         logger.log_error(e, "Failed to audit smart contract")
         return jsonify({'error': 'Failed to audit smart contract'}), 500
 
+@audit_bp.route('/contract/batch', methods=['POST'])
+# @jwt_required()
+@require_sanitized_input
+def audit_smart_contract_batch():
+    """Audit several contracts in one request"""
+    try:
+        data = g.sanitized_data or {}
+        user_id = None  # get_jwt_identity()
+        
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        contracts = data.get('contracts')
+        if not isinstance(contracts, list) or not contracts:
+            return jsonify({'error': "'contracts' must be a non-empty list"}), 400
+        if len(contracts) > MAX_BATCH_AUDITS:
+            return jsonify({'error': f'At most {MAX_BATCH_AUDITS} contracts per batch'}), 400
+        if not _reserve_batch_audits(len(contracts)):
+            return jsonify({'error': 'Too many batch audits in progress, try again later'}), 503
+        
+        # Fan out across the batch pool; results keep the request order
+        app = current_app._get_current_object()
+        futures = []
+        try:
+            for item in contracts:
+                future = _batch_audit_executor.submit(_run_in_app_context, app, _audit_batch_item, item, user_id)
+                future.add_done_callback(lambda _: _release_batch_audits(1))
+                futures.append(future)
+        except Exception:
+            _release_batch_audits(len(contracts) - len(futures))
+            raise
+        
+        def generate():
+            # Each report is written as soon as it and all earlier ones are done
+            completed = 0
+            yield b'{"results":['
+            for index, future in enumerate(futures):
+                try:
+                    result = {'index': index, 'status': 'completed', 'audit_report': future.result()}
+                    completed += 1
+                except ValueError as e:
+                    result = {'index': index, 'status': 'invalid', 'error': str(e)}
+                except Exception as e:
+                    logger.log_error(e, f"Failed to audit smart contract at batch index {index}")
+                    result = {'index': index, 'status': 'failed', 'error': 'Failed to audit smart contract'}
+                yield (b',' if index else b'') + dumps_bytes(result)
+            yield b'],"total":%d,"completed":%d}\n' % (len(futures), completed)
+        
+        return Response(stream_with_context(generate()), mimetype='application/json'), 200
+        
+    except Exception as e:
+        logger.log_error(e, "Failed to audit smart contract batch")
+        return jsonify({'error': 'Failed to audit smart contract batch'}), 500
+
+@audit_bp.route('/contract/result/<job_id>', methods=['GET'])
+# @jwt_required()
+def get_audit_result(job_id):
+    """Get the result of a background contract audit"""
+    with _audit_jobs_lock:
+        future = _audit_jobs.get(job_id)
+    
+    if future is None:
+        return jsonify({'error': 'Audit job not found'}), 404
+    
+    if not future.done():
+        return jsonify({'job_id': job_id, 'status': 'pending'}), 202
+    
+    try:
+        audit_report = future.result()
+    except Exception as e:
+        logger.log_error(e, "Failed to audit smart contract")
+        return jsonify({'job_id': job_id, 'status': 'failed', 'error': 'Failed to audit smart contract'}), 500
+    
+    return jsonify({
+        'message': 'Contract audit completed successfully',
+        'job_id': job_id,
+        'status': 'completed',
+        'audit_report': audit_report
+    }), 200
+
 @audit_bp.route('/validate', methods=['POST'])
 # @jwt_required()
 @require_sanitized_input
@@ -100,7 +284,7 @@ def audit_smart_contract():
 def validate_contract_code():
     """Validate smart contract code syntax and structure"""
     try:
-        data = getattr(g, 'sanitized_data', request.get_json())
+        data = g.sanitized_data
         user_id = None  # get_jwt_identity()
         
         contract_code = data['contract_code']
@@ -130,214 +314,234 @@ def validate_contract_code():
         logger.log_error(e, "Failed to validate contract code")
         return jsonify({'error': 'Failed to validate contract code'}), 500
 
+# Reference data for the vulnerabilities, best-practices and tools endpoints
+_VULNERABILITIES = {
+    'reentrancy': {
+        'name': 'Reentrancy Attack',
+        'severity': 'high',
+        'description': 'External calls can be exploited to re-enter the contract and drain funds',
+        'prevention': 'Use checks-effects-interactions pattern or ReentrancyGuard',
+        'example': 'function withdraw() external { require(balances[msg.sender] > 0); msg.sender.call{value: balances[msg.sender]}(""); balances[msg.sender] = 0; }'
+    },
+    'integer_overflow': {
+        'name': 'Integer Overflow/Underflow',
+        'severity': 'high',
+        'description': 'Arithmetic operations can overflow, causing unexpected behavior',
+        'prevention': 'Use SafeMath library or Solidity 0.8+ built-in protection',
+        'example': 'uint256 result = a + b; // Can overflow if a + b > 2^256 - 1'
+    },
+    'unchecked_call': {
+        'name': 'Unchecked External Call',
+        'severity': 'medium',
+        'description': 'External calls can fail silently if return values are not checked',
+        'prevention': 'Always check return values of external calls',
+        'example': 'token.transfer(recipient, amount); // Should check return value'
+    },
+    'timestamp_dependency': {
+        'name': 'Timestamp Dependency',
+        'severity': 'medium',
+        'description': 'Using block.timestamp for randomness or time-sensitive operations',
+        'prevention': 'Use block numbers or commit-reveal schemes for randomness',
+        'example': 'uint256 random = block.timestamp % 100; // Predictable'
+    },
+    'tx_origin': {
+        'name': 'Transaction Origin Usage',
+        'severity': 'high',
+        'description': 'Using tx.origin for authorization can be bypassed',
+        'prevention': 'Use msg.sender instead of tx.origin',
+        'example': 'require(tx.origin == owner); // Vulnerable to phishing'
+    },
+    'gas_limit': {
+        'name': 'Gas Limit DoS',
+        'severity': 'medium',
+        'description': 'Loops or operations that can exceed gas limit',
+        'prevention': 'Limit loop iterations or use pagination',
+        'example': 'for(uint i = 0; i < users.length; i++) { // Can exceed gas limit }'
+    },
+    'front_running': {
+        'name': 'Front Running',
+        'severity': 'medium',
+        'description': 'Transactions can be front-run to exploit price differences',
+        'prevention': 'Use commit-reveal schemes or time delays',
+        'example': 'buyTokens(amount); // Price can change before execution'
+    },
+    'denial_of_service': {
+        'name': 'Denial of Service',
+        'severity': 'medium',
+        'description': 'Contract can be made unusable by external factors',
+        'prevention': 'Implement circuit breakers and emergency stops',
+        'example': 'External dependency failure can break contract functionality'
+    }
+}
+
+_BEST_PRACTICES = {
+    'security': [
+        'Use established libraries like OpenZeppelin',
+        'Implement proper access controls',
+        'Validate all inputs and outputs',
+        'Use checks-effects-interactions pattern',
+        'Implement emergency stop mechanisms',
+        'Use multi-signature wallets for admin functions',
+        'Regular security audits and testing'
+    ],
+    'gas_optimization': [
+        'Use appropriate data types (uint8 vs uint256)',
+        'Pack structs efficiently',
+        'Use events instead of storage for logs',
+        'Implement batch operations',
+        'Use libraries for common functions',
+        'Optimize loops and iterations',
+        'Use assembly for critical operations'
+    ],
+    'code_quality': [
+        'Follow naming conventions',
+        'Add comprehensive comments',
+        'Use NatSpec documentation',
+        'Implement proper error handling',
+        'Use events for important state changes',
+        'Modularize code into libraries',
+        'Write comprehensive tests'
+    ],
+    'testing': [
+        'Unit tests for all functions',
+        'Integration tests for workflows',
+        'Fuzz testing for edge cases',
+        'Formal verification for critical functions',
+        'Gas usage testing',
+        'Security testing with tools',
+        'Test on multiple networks'
+    ]
+}
+
+_TOOLS_INFO = {
+    'static_analysis': {
+        'slither': {
+            'name': 'Slither',
+            'description': 'Static analysis framework for Solidity',
+            'capabilities': ['vulnerability_detection', 'gas_optimization', 'code_quality'],
+            'supported_languages': ['solidity'],
+            'website': 'https://github.com/crytic/slither'
+        },
+        'mythril': {
+            'name': 'Mythril',
+            'description': 'Symbolic execution tool for Ethereum smart contracts',
+            'capabilities': ['symbolic_execution', 'vulnerability_detection', 'coverage_analysis'],
+            'supported_languages': ['solidity', 'vyper'],
+            'website': 'https://github.com/ConsenSys/mythril'
+        },
+        'oyente': {
+            'name': 'Oyente',
+            'description': 'Symbolic execution tool for smart contracts',
+            'capabilities': ['vulnerability_detection', 'gas_analysis'],
+            'supported_languages': ['solidity'],
+            'website': 'https://github.com/melonproject/oyente'
+        }
+    },
+    'dynamic_analysis': {
+        'echidna': {
+            'name': 'Echidna',
+            'description': 'Property-based testing tool for Ethereum smart contracts',
+            'capabilities': ['fuzz_testing', 'property_testing', 'crash_detection'],
+            'supported_languages': ['solidity'],
+            'website': 'https://github.com/crytic/echidna'
+        },
+        'manticore': {
+            'name': 'Manticore',
+            'description': 'Symbolic execution tool for smart contracts',
+            'capabilities': ['symbolic_execution', 'vulnerability_detection', 'test_generation'],
+            'supported_languages': ['solidity', 'vyper'],
+            'website': 'https://github.com/trailofbits/manticore'
+        }
+    },
+    'formal_verification': {
+        'certora': {
+            'name': 'Certora',
+            'description': 'Formal verification platform for smart contracts',
+            'capabilities': ['formal_verification', 'specification_language', 'automated_proving'],
+            'supported_languages': ['solidity'],
+            'website': 'https://www.certora.com/'
+        }
+    }
+}
+
+# Reference payloads for the GET endpoints below are constant, so each body is
+# encoded once at import and served with an ETag and Cache-Control header
+STATIC_MAX_AGE = 3600
+
+def _precomputed_json(payload):
+    """Encode a constant payload once; returns (body, gzipped body, etag)"""
+    body = dumps_bytes(payload)
+    return body, gzip.compress(body, 9), hashlib.md5(body).hexdigest()
+
+def _static_response(precomputed, public=True):
+    """Serve a precomputed body, answering 304 when the client's ETag matches"""
+    body, gzipped, etag = precomputed
+    use_gzip = 'gzip' in request.accept_encodings
+    if use_gzip:
+        etag = f'{etag}-gzip'
+    
+    if request.if_none_match.contains(etag):
+        # Revalidation hit: no body to attach
+        response = Response(status=304)
+    elif use_gzip:
+        # Already compressed at import; Flask-Compress leaves encoded responses alone
+        response = Response(gzipped, status=200, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body, status=200, mimetype='application/json')
+    
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    if public:
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+    response.cache_control.max_age = STATIC_MAX_AGE
+    return response
+
+_TEMPLATES_JSON = _precomputed_json({
+    'templates': contract_auditor.get_audit_templates(),
+    'supported_languages': contract_auditor.supported_languages,
+    'audit_tools': contract_auditor.audit_tools
+})
+_VULNERABILITIES_JSON = _precomputed_json({
+    'vulnerabilities': _VULNERABILITIES,
+    'severity_levels': contract_auditor.severity_levels,
+    'total_count': len(_VULNERABILITIES)
+})
+_BEST_PRACTICES_JSON = _precomputed_json({
+    'best_practices': _BEST_PRACTICES,
+    'categories': list(_BEST_PRACTICES.keys())
+})
+_TOOLS_JSON = _precomputed_json({
+    'tools': _TOOLS_INFO,
+    'categories': list(_TOOLS_INFO.keys()),
+    'total_tools': sum(len(category) for category in _TOOLS_INFO.values())
+})
+
 @audit_bp.route('/templates', methods=['GET'])
 # @jwt_required()
 def get_audit_templates():
     """Get available audit templates for different contract types"""
-    try:
-        templates = contract_auditor.get_audit_templates()
-        
-        return jsonify({
-            'templates': templates,
-            'supported_languages': contract_auditor.supported_languages,
-            'audit_tools': contract_auditor.audit_tools
-        }), 200
-        
-    except Exception as e:
-        logger.log_error(e, "Failed to get audit templates")
-        return jsonify({'error': 'Failed to get audit templates'}), 500
+    return _static_response(_TEMPLATES_JSON)
 
 @audit_bp.route('/vulnerabilities', methods=['GET'])
 # @jwt_required()
 def get_common_vulnerabilities():
     """Get information about common smart contract vulnerabilities"""
-    try:
-        vulnerabilities = {
-            'reentrancy': {
-                'name': 'Reentrancy Attack',
-                'severity': 'high',
-                'description': 'External calls can be exploited to re-enter the contract and drain funds',
-                'prevention': 'Use checks-effects-interactions pattern or ReentrancyGuard',
-                'example': 'function withdraw() external { require(balances[msg.sender] > 0); msg.sender.call{value: balances[msg.sender]}(""); balances[msg.sender] = 0; }'
-            },
-            'integer_overflow': {
-                'name': 'Integer Overflow/Underflow',
-                'severity': 'high',
-                'description': 'Arithmetic operations can overflow, causing unexpected behavior',
-                'prevention': 'Use SafeMath library or Solidity 0.8+ built-in protection',
-                'example': 'uint256 result = a + b; // Can overflow if a + b > 2^256 - 1'
-            },
-            'unchecked_call': {
-                'name': 'Unchecked External Call',
-                'severity': 'medium',
-                'description': 'External calls can fail silently if return values are not checked',
-                'prevention': 'Always check return values of external calls',
-                'example': 'token.transfer(recipient, amount); // Should check return value'
-            },
-            'timestamp_dependency': {
-                'name': 'Timestamp Dependency',
-                'severity': 'medium',
-                'description': 'Using block.timestamp for randomness or time-sensitive operations',
-                'prevention': 'Use block numbers or commit-reveal schemes for randomness',
-                'example': 'uint256 random = block.timestamp % 100; // Predictable'
-            },
-            'tx_origin': {
-                'name': 'Transaction Origin Usage',
-                'severity': 'high',
-                'description': 'Using tx.origin for authorization can be bypassed',
-                'prevention': 'Use msg.sender instead of tx.origin',
-                'example': 'require(tx.origin == owner); // Vulnerable to phishing'
-            },
-            'gas_limit': {
-                'name': 'Gas Limit DoS',
-                'severity': 'medium',
-                'description': 'Loops or operations that can exceed gas limit',
-                'prevention': 'Limit loop iterations or use pagination',
-                'example': 'for(uint i = 0; i < users.length; i++) { // Can exceed gas limit }'
-            },
-            'front_running': {
-                'name': 'Front Running',
-                'severity': 'medium',
-                'description': 'Transactions can be front-run to exploit price differences',
-                'prevention': 'Use commit-reveal schemes or time delays',
-                'example': 'buyTokens(amount); // Price can change before execution'
-            },
-            'denial_of_service': {
-                'name': 'Denial of Service',
-                'severity': 'medium',
-                'description': 'Contract can be made unusable by external factors',
-                'prevention': 'Implement circuit breakers and emergency stops',
-                'example': 'External dependency failure can break contract functionality'
-            }
-        }
-        
-        return jsonify({
-            'vulnerabilities': vulnerabilities,
-            'severity_levels': contract_auditor.severity_levels,
-            'total_count': len(vulnerabilities)
-        }), 200
-        
-    except Exception as e:
-        logger.log_error(e, "Failed to get vulnerability information")
-        return jsonify({'error': 'Failed to get vulnerability information'}), 500
+    return _static_response(_VULNERABILITIES_JSON)
 
 @audit_bp.route('/best-practices', methods=['GET'])
 @jwt_required()
 def get_best_practices():
     """Get smart contract development best practices"""
-    try:
-        best_practices = {
-            'security': [
-                'Use established libraries like OpenZeppelin',
-                'Implement proper access controls',
-                'Validate all inputs and outputs',
-                'Use checks-effects-interactions pattern',
-                'Implement emergency stop mechanisms',
-                'Use multi-signature wallets for admin functions',
-                'Regular security audits and testing'
-            ],
-            'gas_optimization': [
-                'Use appropriate data types (uint8 vs uint256)',
-                'Pack structs efficiently',
-                'Use events instead of storage for logs',
-                'Implement batch operations',
-                'Use libraries for common functions',
-                'Optimize loops and iterations',
-                'Use assembly for critical operations'
-            ],
-            'code_quality': [
-                'Follow naming conventions',
-                'Add comprehensive comments',
-                'Use NatSpec documentation',
-                'Implement proper error handling',
-                'Use events for important state changes',
-                'Modularize code into libraries',
-                'Write comprehensive tests'
-            ],
-            'testing': [
-                'Unit tests for all functions',
-                'Integration tests for workflows',
-                'Fuzz testing for edge cases',
-                'Formal verification for critical functions',
-                'Gas usage testing',
-                'Security testing with tools',
-                'Test on multiple networks'
-            ]
-        }
-        
-        return jsonify({
-            'best_practices': best_practices,
-            'categories': list(best_practices.keys())
-        }), 200
-        
-    except Exception as e:
-        logger.log_error(e, "Failed to get best practices")
-        return jsonify({'error': 'Failed to get best practices'}), 500
+    # Behind auth, so shared caches must not store it
+    return _static_response(_BEST_PRACTICES_JSON, public=False)
 
 @audit_bp.route('/tools', methods=['GET'])
 def get_audit_tools():
     """Get information about available audit tools"""
-    try:
-        tools_info = {
-            'static_analysis': {
-                'slither': {
-                    'name': 'Slither',
-                    'description': 'Static analysis framework for Solidity',
-                    'capabilities': ['vulnerability_detection', 'gas_optimization', 'code_quality'],
-                    'supported_languages': ['solidity'],
-                    'website': 'https://github.com/crytic/slither'
-                },
-                'mythril': {
-                    'name': 'Mythril',
-                    'description': 'Symbolic execution tool for Ethereum smart contracts',
-                    'capabilities': ['symbolic_execution', 'vulnerability_detection', 'coverage_analysis'],
-                    'supported_languages': ['solidity', 'vyper'],
-                    'website': 'https://github.com/ConsenSys/mythril'
-                },
-                'oyente': {
-                    'name': 'Oyente',
-                    'description': 'Symbolic execution tool for smart contracts',
-                    'capabilities': ['vulnerability_detection', 'gas_analysis'],
-                    'supported_languages': ['solidity'],
-                    'website': 'https://github.com/melonproject/oyente'
-                }
-            },
-            'dynamic_analysis': {
-                'echidna': {
-                    'name': 'Echidna',
-                    'description': 'Property-based testing tool for Ethereum smart contracts',
-                    'capabilities': ['fuzz_testing', 'property_testing', 'crash_detection'],
-                    'supported_languages': ['solidity'],
-                    'website': 'https://github.com/crytic/echidna'
-                },
-                'manticore': {
-                    'name': 'Manticore',
-                    'description': 'Symbolic execution tool for smart contracts',
-                    'capabilities': ['symbolic_execution', 'vulnerability_detection', 'test_generation'],
-                    'supported_languages': ['solidity', 'vyper'],
-                    'website': 'https://github.com/trailofbits/manticore'
-                }
-            },
-            'formal_verification': {
-                'certora': {
-                    'name': 'Certora',
-                    'description': 'Formal verification platform for smart contracts',
-                    'capabilities': ['formal_verification', 'specification_language', 'automated_proving'],
-                    'supported_languages': ['solidity'],
-                    'website': 'https://www.certora.com/'
-                }
-            }
-        }
-        
-        return jsonify({
-            'tools': tools_info,
-            'categories': list(tools_info.keys()),
-            'total_tools': sum(len(category) for category in tools_info.values())
-        }), 200
-        
-    except Exception as e:
-        logger.log_error(e, "Failed to get audit tools information")
-        return jsonify({'error': 'Failed to get audit tools information'}), 500
+    return _static_response(_TOOLS_JSON)
 
 @audit_bp.route('/history', methods=['GET'])
 @jwt_required()
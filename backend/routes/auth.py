@@ -1,27 +1,53 @@
 from flask import Blueprint, request, jsonify, g
-from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token, verify_jwt_in_request
+from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
 from models import User, Agent, Message, db
-from datetime import datetime
+from sqlalchemy import or_, update
+from sqlalchemy.orm import load_only
+from sqlalchemy.exc import IntegrityError
+import os
 import uuid
 import bcrypt
-import bleach
-import re
-from utils.sanitization import require_sanitized_input, validate_input_schema, VALIDATION_SCHEMAS, InputSanitizer
+import string
+from utils.sanitization import require_sanitized_input, validate_input_schema, VALIDATION_SCHEMAS, InputSanitizer, needs_cleaning
 from utils.logging import logger
 
 auth_bp = Blueprint('auth', __name__)
 
+# bcrypt work factor; each step doubles hashing cost. Stored hashes keep their
+# own cost and are upgraded to this one on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+
+# Character-class bit flags for validate_password
+_CLASS_UPPER, _CLASS_LOWER, _CLASS_DIGIT, _CLASS_SPECIAL = 1, 2, 4, 8
+
+def _build_class_table():
+    """Map every byte value to its character-class flag (0 if none)"""
+    table = bytearray(256)
+    for chars, flag in ((string.ascii_uppercase, _CLASS_UPPER),
+                        (string.ascii_lowercase, _CLASS_LOWER),
+                        (string.digits, _CLASS_DIGIT),
+                        ('!@#$%^&*(),.?":{}|<>', _CLASS_SPECIAL)):
+        for byte in chars.encode('ascii'):
+            table[byte] = flag
+    return bytes(table)
+
+_CLASS_TABLE = _build_class_table()
+
 def validate_password(password):
     """Validate password strength"""
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r"[A-Z]", password):
+    # translate() classifies every byte in one C-level pass; OR the few distinct flags
+    flags = 0
+    for flag in set(password.encode('utf-8').translate(_CLASS_TABLE)):
+        flags |= flag
+    if not flags & _CLASS_UPPER:
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r"[a-z]", password):
+    if not flags & _CLASS_LOWER:
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r"\d", password):
+    if not flags & _CLASS_DIGIT:
         return False, "Password must contain at least one digit"
-    if not re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
+    if not flags & _CLASS_SPECIAL:
         return False, "Password must contain at least one special character"
     return True, "Password is valid"
 
@@ -29,29 +55,61 @@ def sanitize_input(text):
     """Sanitize user input to prevent XSS"""
     if not text:
         return ""
+    # Plain text without control characters has nothing for bleach to strip or escape
+    if not needs_cleaning(text):
+        return text
+    import bleach  # deferred: bleach pulls in html5lib
     # Remove HTML tags and dangerous characters
     return bleach.clean(text, tags=[], strip=True)
 
 def hash_password(password):
     """Hash password using bcrypt"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    # Return as string for database storage
-    return hashed.decode('utf-8')
+    # Stored as-is in the LargeBinary column
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
 
 def verify_password(password, password_hash):
     """Verify password against hash"""
-    # Convert string back to bytes for bcrypt
-    if isinstance(password_hash, str):
-        password_hash = password_hash.encode('utf-8')
     return bcrypt.checkpw(password.encode('utf-8'), password_hash)
 
+def needs_rehash(password_hash):
+    """Check whether a stored hash was made with a different work factor"""
+    # bcrypt hashes are laid out as $2b$<rounds>$<salt><digest>
+    try:
+        return int(password_hash.split(b'$')[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+# Hash checked when no usable account matches, so failed logins cost one bcrypt
+# round either way and response time does not reveal which usernames exist
+DUMMY_HASH = bcrypt.hashpw(b'dummy-password', bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+DUPLICATE_USER_ERRORS = {
+    'username': 'Username already exists',
+    'email': 'Email already exists',
+    'wallet_address': 'Wallet address already exists',
+}
+
+def _duplicate_field(error):
+    """Name the unique users column an IntegrityError was raised for"""
+    # PostgreSQL exposes the constraint (users_email_key); SQLite only the message
+    diag = getattr(error.orig, 'diag', None)
+    detail = getattr(diag, 'constraint_name', None) or str(error.orig)
+    for field in DUPLICATE_USER_ERRORS:
+        if field in detail:
+            return field
+    return None
+
+def current_user_id():
+    """The authenticated user's id as an int"""
+    # Tokens carry the id as a string: PyJWT rejects non-string 'sub' claims
+    return int(get_jwt_identity())
+
 @auth_bp.route('/register', methods=['POST'])
 @require_sanitized_input
 @validate_input_schema(VALIDATION_SCHEMAS['user_registration'])
 def register():
     """Register a new user"""
-    data = getattr(g, 'sanitized_data', request.get_json())
+    data = g.sanitized_data
     
     # Sanitize inputs using our sanitizer
     username = InputSanitizer.sanitize_username(data['username'])
@@ -63,16 +121,6 @@ def register():
     if not is_valid:
         return jsonify({'error': message}), 400
     
-    # Check if user already exists
-    if User.query.filter_by(username=username).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    
-    if User.query.filter_by(email=email).first():
-        return jsonify({'error': 'Email already exists'}), 400
-    
-    # Hash password
-    password_hash = hash_password(password)
-    
     # Sanitize wallet address if provided
     wallet_address = None
     if data.get('wallet_address'):
@@ -81,6 +129,9 @@ def register():
         except ValueError as e:
             return jsonify({'error': str(e)}), 400
     
+    # Hash password
+    password_hash = hash_password(password)
+    
     # Create new user
     user = User(
         username=username,
@@ -89,8 +140,14 @@ def register():
         wallet_address=wallet_address
     )
     
-    db.session.add(user)
-    db.session.commit()
+    # The unique constraints decide duplicates atomically; no pre-check SELECTs
+    try:
+        db.session.add(user)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        field = _duplicate_field(e)
+        return jsonify({'error': DUPLICATE_USER_ERRORS.get(field, 'User already exists')}), 400
     
     return jsonify({
         'message': 'User created successfully',
@@ -109,21 +166,31 @@ def login():
     login_identifier = data['username']  # Can be username or email
     password = data['password']
     
-    # Try to find user by username first, then by email
-    user = User.query.filter_by(username=login_identifier).first()
-    if not user:
-        user = User.query.filter_by(email=login_identifier).first()
+    # Match username or email in one query; a username match takes precedence
+    candidates = User.query.options(
+        load_only(User.id, User.username, User.email, User.password_hash, User.is_active, User.wallet_address)
+    ).filter(
+        or_(User.username == login_identifier, User.email == login_identifier)
+    ).limit(2).all()
+    user = next((u for u in candidates if u.username == login_identifier), candidates[0] if candidates else None)
     
     if not user:
+        verify_password(password, DUMMY_HASH)
         return jsonify({'error': 'Invalid username/email or password'}), 401
     
     if not user.is_active:
+        verify_password(password, DUMMY_HASH)
         return jsonify({'error': 'Account is deactivated'}), 403
     
     # Verify password
     if not verify_password(password, user.password_hash):
         return jsonify({'error': 'Invalid username/email or password'}), 401
     
+    # Upgrade hashes made under an older work factor while the password is at hand
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+        db.session.commit()
+    
     # Create JWT token
     access_token = create_access_token(identity=str(user.id))
     
@@ -140,8 +207,7 @@ def login():
 @jwt_required()
 def get_profile():
     """Get user profile"""
-    user_id = get_jwt_identity()
-    user = User.query.get(int(user_id))
+    user = db.session.get(User, current_user_id())
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
@@ -159,8 +225,7 @@ def get_profile():
 @jwt_required()
 def update_profile():
     """Update user profile"""
-    user_id = get_jwt_identity()
-    user = User.query.get(int(user_id))
+    user = db.session.get(User, current_user_id())
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
@@ -188,17 +253,16 @@ def update_profile():
 def refresh_token():
     """Refresh JWT token"""
     try:
-        # Verify current token is valid
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
+        # @jwt_required has already verified the token
+        user_id = current_user_id()
         
         # Get user to ensure they still exist and are active
-        user = User.query.get(current_user_id)
+        user = db.session.get(User, user_id)
         if not user or not user.is_active:
             return jsonify({'error': 'User not found or inactive'}), 404
         
         # Create new access token
-        new_token = create_access_token(identity=str(current_user_id))
+        new_token = create_access_token(identity=str(user_id))
         
         return jsonify({
             'message': 'Token refreshed successfully',
@@ -214,10 +278,11 @@ def refresh_token():
 @jwt_required()
 def update_password():
     """Update user password"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(int(current_user_id))
+    user_id = current_user_id()
+    # Only the hash is needed; skip loading the full User
+    password_hash = db.session.query(User.password_hash).filter_by(id=user_id).scalar()
     
-    if not user:
+    if password_hash is None:
         return jsonify({'error': 'User not found'}), 404
     
     data = request.get_json()
@@ -228,7 +293,7 @@ def update_password():
     new_password = data['newPassword']
     
     # Verify current password
-    if not verify_password(current_password, user.password_hash):
+    if not verify_password(current_password, password_hash):
         return jsonify({'error': 'Current password is incorrect'}), 401
     
     # Validate new password
@@ -236,23 +301,23 @@ def update_password():
         return jsonify({'error': 'New password must be at least 6 characters long'}), 400
     
     # Update password
-    user.password_hash = hash_password(new_password)
-    user.updated_at = datetime.utcnow()
-    
     try:
+        db.session.execute(
+            update(User).where(User.id == user_id).values(password_hash=hash_password(new_password))
+        )
         db.session.commit()
         return jsonify({'message': 'Password updated successfully'}), 200
     except Exception as e:
         db.session.rollback()
-        logger.log_error(e, f"Error updating password for user {user.id}")
+        logger.log_error(e, f"Error updating password for user {user_id}")
         return jsonify({'error': 'Failed to update password'}), 500
 
 @auth_bp.route('/delete-account', methods=['DELETE'])
 @jwt_required()
 def delete_account():
     """Delete user account"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(int(current_user_id))
+    user_id = current_user_id()
+    user = db.session.get(User, user_id)
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
@@ -262,7 +327,7 @@ def delete_account():
         db.session.delete(user)
         db.session.commit()
         
-        logger.log_event('INFO', 'account_deleted', {'user_id': current_user_id})
+        logger.log_event('INFO', 'account_deleted', {'user_id': user_id})
         return jsonify({'message': 'Account deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
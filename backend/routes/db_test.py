@@ -3,12 +3,29 @@
 
 from flask import Blueprint, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
 from datetime import datetime
 import os
 
 # Create blueprint for database testing
 db_test_bp = Blueprint('db_test', __name__)
 
+# Statements built once at import; SQLAlchemy 2.x also rejects plain strings
+_SELECT_1 = text('SELECT 1')
+_HEALTH_CHECK_COUNT = text('SELECT COUNT(*) FROM health_check')
+_INSERT_TEST_REC = text("""
+    INSERT INTO health_check (status, created_at) 
+    VALUES ('backend_test', CURRENT_TIMESTAMP)
+    RETURNING status, created_at
+""")
+_DB_INFO = text("""
+    SELECT 
+        current_database() as database_name,
+        current_user as current_user,
+        version() as postgres_version,
+        now() as current_time
+""")
+
 @db_test_bp.route('/api/test/database', methods=['GET'])
 def test_database():
     """Test database connectivity and basic operations"""
@@ -16,28 +33,20 @@ def test_database():
         from app import db
         
         # Test 1: Check database connection
-        db.session.execute('SELECT 1')
+        db.session.execute(_SELECT_1)
         
         # Test 2: Check if health_check table exists
-        result = db.session.execute('SELECT COUNT(*) FROM health_check')
+        result = db.session.execute(_HEALTH_CHECK_COUNT)
         count = result.scalar()
         
-        # Test 3: Insert a test record
-        db.session.execute("""
-            INSERT INTO health_check (status, created_at) 
-            VALUES ('backend_test', CURRENT_TIMESTAMP)
-        """)
-        db.session.commit()
-        
-        # Test 4: Query the test record
-        result = db.session.execute("""
-            SELECT status, created_at 
-            FROM health_check 
-            WHERE status = 'backend_test' 
-            ORDER BY created_at DESC 
-            LIMIT 1
-        """)
-        test_record = result.fetchone()
+        # Test 3: Insert a test record and read it back via RETURNING. The
+        # savepoint is rolled back: proving writes work must not grow the
+        # table or pay a commit on every call.
+        savepoint = db.session.begin_nested()
+        try:
+            test_record = db.session.execute(_INSERT_TEST_REC).fetchone()
+        finally:
+            savepoint.rollback()
         
         return jsonify({
             'status': 'success',
@@ -66,16 +75,10 @@ def database_status():
         from app import db
         
         # Test connection
-        db.session.execute('SELECT 1')
+        db.session.execute(_SELECT_1)
         
         # Get database info
-        result = db.session.execute("""
-            SELECT 
-                current_database() as database_name,
-                current_user as current_user,
-                version() as postgres_version,
-                now() as current_time
-        """)
+        result = db.session.execute(_DB_INFO)
         db_info = result.fetchone()
         
         return jsonify({
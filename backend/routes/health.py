@@ -1,170 +1,406 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask_jwt_extended import jwt_required
-from models import db, Agent, User, Message, KnowledgeGraph
+from models import db, User, Agent, Message, KnowledgeGraph
 from datetime import datetime, timedelta
 import psutil
 import os
 import redis
 import requests
-from sqlalchemy import text
+from requests.adapters import HTTPAdapter
+from sqlalchemy import bindparam, column, create_engine, func, select, table, text
+from sqlalchemy.engine import make_url
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+import time
 from utils.logging import monitor, logger
+from utils.json_provider import dumps_bytes
 
 health_bp = Blueprint('health', __name__)
 
+# Probes and monitors poll these endpoints every few seconds; serve one
+# snapshot per TTL instead of re-running every check on each hit
+HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', 3))
+# Metrics are dashboard data, not a liveness signal; they can be older
+METRICS_CACHE_TTL = float(os.getenv('METRICS_CACHE_TTL', 30))
+# A failed refresh may keep serving the last good snapshot, but only while that
+# data is younger than this; after that the error is surfaced
+HEALTH_STALE_LIMIT = float(os.getenv('HEALTH_STALE_LIMIT', 300))
+_health_cache = {}  # key -> (checked_at, body, status_code, stale, fetched_at)
+# One refresh lock per key, so a slow metrics query never holds up /health
+_health_cache_locks = {}  # key -> Lock
+
+# Tiny pool reserved for probes: SELECT 1 must not queue behind request traffic
+# on the main pool, or a busy pod gets reported dead
+HEALTH_POOL_OPTIONS = {
+    'pool_size': 2,
+    'max_overflow': 0,
+    'pool_timeout': 0.5,
+    'connect_args': {'connect_timeout': 1},
+}
+_health_engines = {}  # database URL -> Engine
+_health_engines_lock = Lock()
+
+def _health_engine():
+    """Engine used only by the health probes"""
+    uri = current_app.config['SQLALCHEMY_DATABASE_URI']
+    engine = _health_engines.get(uri)
+    if engine is None:
+        with _health_engines_lock:
+            engine = _health_engines.get(uri)
+            if engine is None:
+                if make_url(uri).get_backend_name() == 'postgresql':
+                    engine = create_engine(uri, **HEALTH_POOL_OPTIONS)
+                else:
+                    # SQLite has no server-side pool to starve; reuse the app engine
+                    engine = db.engine
+                _health_engines[uri] = engine
+    return engine
+
+# Parsed once at import instead of on every probe
+_SELECT_1 = text('SELECT 1')
+
+def _ping_database():
+    """Round-trip SELECT 1 on the health engine"""
+    with _health_engine().connect() as connection:
+        connection.execute(_SELECT_1)
+
+# One client for every probe: building it per request paid a new pool and a
+# TCP handshake each time. Short timeouts fail a dead Redis in about a second.
+_redis_client = redis.Redis.from_url(
+    os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+    socket_timeout=1,
+    socket_connect_timeout=0.5,
+    socket_keepalive=True,
+    health_check_interval=30,
+    max_connections=4,
+)
+
+# A PING that succeeded this recently is trusted instead of repeated
+REDIS_PING_INTERVAL = 10
+_redis_last_ok = 0.0
+
+def _ping_redis():
+    """PING Redis unless the last successful PING is recent enough"""
+    global _redis_last_ok
+    if time.monotonic() - _redis_last_ok < REDIS_PING_INTERVAL:
+        return
+    try:
+        _redis_client.ping()
+    except Exception:
+        # Re-probe on the very next check
+        _redis_last_ok = 0.0
+        raise
+    _redis_last_ok = time.monotonic()
+
+# Check METTA_SERVER_URL first, then METTA_ENDPOINT, then default
+METTA_ENDPOINT = (os.getenv('METTA_SERVER_URL') or os.getenv('METTA_ENDPOINT', 'http://localhost:8080')).rstrip('/')
+METTA_HEALTH_URL = f'{METTA_ENDPOINT}/health'
+_metta_probe_method = 'HEAD'  # falls back to GET once if the server rejects HEAD
+# (connect, read) per request; a HEAD rejected with 405 followed by the GET
+# still finishes inside HEALTH_PROBE_TIMEOUT
+METTA_REQUEST_TIMEOUT = (0.4, 0.5)
+# A successful probe is reused for METTA_PROBE_TTL seconds, and served as stale
+# for up to METTA_STALE_LIMIT seconds while later probes fail
+METTA_PROBE_TTL = 10
+METTA_STALE_LIMIT = 60
+_metta_last_good = None  # (fetched_at, details)
+
+# Keep-alive session for the MeTTa probe so each check reuses one connection
+_metta_session = requests.Session()
+_metta_session.mount('http://', HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+_metta_session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+
+# Metrics key -> table whose size /health/metrics reports
+COUNTED_TABLES = {
+    'total_users': User.__table__,
+    'total_agents': Agent.__table__,
+    'total_messages': Message.__table__,
+    'total_knowledge_concepts': KnowledgeGraph.__table__,
+}
+_pg_stat_user_tables = table('pg_stat_user_tables', column('schemaname'), column('relname'), column('n_live_tup'))
+
+def _exact_count(counted, *criteria):
+    """COUNT(*) subquery built with Core, bypassing the ORM query machinery"""
+    return select(func.count()).select_from(counted).where(*criteria).scalar_subquery()
+
+def _estimated_count(counted):
+    """Planner row estimate from the statistics view; a catalog lookup, not a scan"""
+    return (
+        select(func.coalesce(func.max(_pg_stat_user_tables.c.n_live_tup), 0))
+        # Same-named tables in other schemas would otherwise be counted instead
+        .where(_pg_stat_user_tables.c.schemaname == func.current_schema(),
+               _pg_stat_user_tables.c.relname == counted.name)
+        .scalar_subquery()
+    )
+
+# Recent-activity counters; exact, but bounded by the timestamp and status indexes
+_ACTIVITY_COUNTS = {
+    'recent_messages_24h': _exact_count(Message.__table__, Message.__table__.c.timestamp >= bindparam('cutoff')),
+    'active_agents': _exact_count(Agent.__table__, Agent.__table__.c.status == 'active'),
+}
+
+def _metric_counts_statement(table_count):
+    """One SELECT returning every /health/metrics counter as a column"""
+    columns = [table_count(counted).label(key) for key, counted in COUNTED_TABLES.items()]
+    columns += [count.label(key) for key, count in _ACTIVITY_COUNTS.items()]
+    return select(*columns)
+
+# Table totals are estimated on PostgreSQL: exact COUNT(*) scans the whole table
+_METRIC_COUNTS_ESTIMATED = _metric_counts_statement(_estimated_count)
+# Backends without table statistics fall back to exact counts
+_METRIC_COUNTS_EXACT = _metric_counts_statement(_exact_count)
+
+def _cached_health_response(key, compute, ttl=None, stale_on_error=False):
+    """Return the cached snapshot for key, recomputing it once the TTL lapses"""
+    ttl = HEALTH_CACHE_TTL if ttl is None else ttl
+    entry = _health_cache.get(key)
+    if entry is None or time.monotonic() - entry[0] >= ttl:
+        lock = _health_cache_locks.get(key) or _health_cache_locks.setdefault(key, Lock())
+        # While another request is refreshing, answer with the snapshot we
+        # have; only a cold cache waits for the refresh
+        if lock.acquire(blocking=entry is None):
+            try:
+                # A concurrent request may have refreshed it while we waited
+                entry = _health_cache.get(key)
+                if entry is None or time.monotonic() - entry[0] >= ttl:
+                    payload, status_code = compute()
+                    # Stamped after computing so the age reflects the data's freshness.
+                    # A failed refresh can keep the last good body, flagged as stale,
+                    # until that body's own age passes HEALTH_STALE_LIMIT.
+                    now = time.monotonic()
+                    if (stale_on_error and status_code >= 500 and entry is not None and entry[2] < 500
+                            and now - entry[4] < HEALTH_STALE_LIMIT):
+                        entry = (now, entry[1], entry[2], True, entry[4])
+                    else:
+                        entry = (now, dumps_bytes(payload), status_code, False, now)
+                    _health_cache[key] = entry
+            finally:
+                lock.release()
+    response = Response(entry[1], status=entry[2], mimetype='application/json')
+    if entry[3]:
+        response.headers['X-Cache'] = 'STALE'
+    return response
+
 @health_bp.route('/health', methods=['GET'])
 def health_check():
     """Comprehensive health check endpoint"""
-    health_status = {
+    return _cached_health_response('health', _compute_health)
+
+def _check_database():
+    """Database connectivity probe"""
+    _ping_database()
+    return {
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat(),
-        'version': '1.0.0',
-        'services': {}
-    }
-    
-    overall_healthy = True
-    
-    # Database health check
-    try:
-        db.session.execute(text('SELECT 1'))
-        health_status['services']['database'] = {
-            'status': 'healthy',
-            'type': 'postgresql',
-            'response_time': '< 100ms'
-        }
-    except Exception as e:
-        health_status['services']['database'] = {
-            'status': 'unhealthy',
-            'error': str(e)
-        }
-        overall_healthy = False
-    
-    # Redis health check
+        'type': 'postgresql',
+        'response_time': '< 100ms'
+    }, True
+
+def _check_redis():
+    """Redis connectivity probe"""
+    _ping_redis()
+    return {
+        'status': 'healthy',
+        'type': 'redis',
+        'response_time': '< 50ms'
+    }, True
+
+def _request_metta_health():
+    """Hit the MeTTa health URL, preferring a bodiless HEAD"""
+    global _metta_probe_method
+    # Separate connect/read timeouts keep a hung server from stalling the probe
+    if _metta_probe_method == 'HEAD':
+        response = _metta_session.head(METTA_HEALTH_URL, timeout=METTA_REQUEST_TIMEOUT, allow_redirects=False)
+        if response.status_code not in (405, 501):
+            return response
+        # Server only routes GET (FastAPI's @app.get does); remember that
+        _metta_probe_method = 'GET'
+    # stream=True and close() skip downloading the body we never read
+    response = _metta_session.get(METTA_HEALTH_URL, timeout=METTA_REQUEST_TIMEOUT, stream=True)
+    response.close()
+    return response
+
+def _check_metta():
+    """MeTTa Knowledge Graph probe; never fails the overall check"""
+    global _metta_last_good
+    # The slowest, most flap-prone probe: reuse a recent success instead of re-probing
+    now = time.monotonic()
+    if _metta_last_good is not None and now - _metta_last_good[0] < METTA_PROBE_TTL:
+        return _metta_last_good[1], True
     try:
-        redis_client = redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
-        redis_client.ping()
-        health_status['services']['redis'] = {
+        response = _request_metta_health()
+        if not 200 <= response.status_code < 300:
+            raise Exception(f"HTTP {response.status_code}")
+        details = {
             'status': 'healthy',
-            'type': 'redis',
-            'response_time': '< 50ms'
+            'endpoint': METTA_ENDPOINT,
+            'response_time': f'{response.elapsed.total_seconds() * 1000:.0f}ms'
         }
+        _metta_last_good = (time.monotonic(), details)
+        return details, True
     except Exception as e:
-        health_status['services']['redis'] = {
-            'status': 'unhealthy',
-            'error': str(e)
-        }
-        overall_healthy = False
-    
-    # MeTTa Knowledge Graph health check
-    try:
-        # Check METTA_SERVER_URL first, then METTA_ENDPOINT, then default
-        metta_endpoint = os.getenv('METTA_SERVER_URL') or os.getenv('METTA_ENDPOINT', 'http://localhost:8080')
-        # Ensure localhost requests bypass proxy
-        os.environ['NO_PROXY'] = 'localhost,127.0.0.1'
-        response = requests.get(f"{metta_endpoint}/health", timeout=5)
-        if response.status_code == 200:
-            health_status['services']['metta_kg'] = {
-                'status': 'healthy',
-                'endpoint': metta_endpoint,
-                'response_time': f'{response.elapsed.total_seconds() * 1000:.0f}ms'
-            }
-        else:
-            raise Exception(f"HTTP {response.status_code}")
-    except Exception as e:
-        health_status['services']['metta_kg'] = {
+        # Ride out a blip on the last good result, but not a sustained outage
+        if _metta_last_good is not None and now - _metta_last_good[0] < METTA_STALE_LIMIT:
+            return {**_metta_last_good[1], 'stale': True}, True
+        # Don't mark overall as unhealthy since we have fallback
+        return {
             'status': 'unhealthy',
             'error': str(e),
             'fallback': 'mock_responses_enabled'
-        }
-        # Don't mark overall as unhealthy since we have fallback
+        }, True
+
+def _check_system():
+    """System resources probe"""
+    # Non-blocking: usage since the previous sample instead of sleeping 1s
+    cpu_percent = psutil.cpu_percent(interval=None)
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
     
-    # System resources check
-    try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        health_status['services']['system'] = {
-            'status': 'healthy' if cpu_percent < 80 and memory.percent < 80 and disk.percent < 90 else 'warning',
-            'cpu_usage': f'{cpu_percent}%',
-            'memory_usage': f'{memory.percent}%',
-            'disk_usage': f'{disk.percent}%'
-        }
-        
-        if cpu_percent > 80 or memory.percent > 80 or disk.percent > 90:
-            overall_healthy = False
-    except Exception as e:
-        health_status['services']['system'] = {
-            'status': 'unhealthy',
-            'error': str(e)
-        }
-        overall_healthy = False
+    return {
+        'status': 'healthy' if cpu_percent < 80 and memory.percent < 80 and disk.percent < 90 else 'warning',
+        'cpu_usage': f'{cpu_percent}%',
+        'memory_usage': f'{memory.percent}%',
+        'disk_usage': f'{disk.percent}%'
+    }, not (cpu_percent > 80 or memory.percent > 80 or disk.percent > 90)
+
+# Service name -> probe returning (details, healthy)
+HEALTH_PROBES = {
+    'database': _check_database,
+    'redis': _check_redis,
+    'metta_kg': _check_metta,
+    'system': _check_system,
+}
+HEALTH_PROBE_TIMEOUT = 2  # seconds for all probes together; each probe's own timeouts fit inside it
+# Reported but never the reason /health returns 503 (MeTTa has mock fallbacks)
+NON_CRITICAL_PROBES = frozenset({'metta_kg'})
+
+# The probes are independent and I/O bound; run them side by side
+_probe_executor = ThreadPoolExecutor(max_workers=len(HEALTH_PROBES), thread_name_prefix='health-probe')
+
+def _run_probe(app, probe):
+    """Executor entry point; the database probe needs the app's config"""
+    with app.app_context():
+        return probe()
+
+def _compute_health():
+    """Run every health check and return (payload, status_code)"""
+    health_status = {
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat(),
+        'version': '1.0.0',
+        'services': {}
+    }
     
-    # Application metrics
-    try:
-        total_users = User.query.count()
-        total_agents = Agent.query.count()
-        total_messages = Message.query.count()
-        total_knowledge = KnowledgeGraph.query.count()
-        
-        # Recent activity (last 24 hours)
-        recent_cutoff = datetime.utcnow() - timedelta(hours=24)
-        recent_messages = Message.query.filter(Message.timestamp >= recent_cutoff).count()
-        active_agents = Agent.query.filter(Agent.status == 'active').count()
-        
-        health_status['services']['application'] = {
-            'status': 'healthy',
-            'metrics': {
-                'total_users': total_users,
-                'total_agents': total_agents,
-                'total_messages': total_messages,
-                'total_knowledge_concepts': total_knowledge,
-                'recent_messages_24h': recent_messages,
-                'active_agents': active_agents
-            }
-        }
-    except Exception as e:
-        health_status['services']['application'] = {
-            'status': 'unhealthy',
-            'error': str(e)
-        }
-        overall_healthy = False
+    app = current_app._get_current_object()
+    futures = {name: _probe_executor.submit(_run_probe, app, probe) for name, probe in HEALTH_PROBES.items()}
+    
+    # One deadline shared by all probes, so a hung service costs at most the timeout
+    deadline = time.monotonic() + HEALTH_PROBE_TIMEOUT
+    overall_healthy = True
+    for name, future in futures.items():
+        try:
+            details, healthy = future.result(timeout=max(0, deadline - time.monotonic()))
+        except FuturesTimeoutError:
+            details, healthy = {'status': 'unhealthy', 'error': f'Timed out after {HEALTH_PROBE_TIMEOUT}s'}, False
+        except Exception as e:
+            details, healthy = {'status': 'unhealthy', 'error': str(e)}, False
+        if not healthy and name in NON_CRITICAL_PROBES:
+            details, healthy = {**details, 'status': 'degraded'}, True
+        health_status['services'][name] = details
+        overall_healthy = overall_healthy and healthy
     
     # Set overall status
     health_status['status'] = 'healthy' if overall_healthy else 'unhealthy'
     
     status_code = 200 if overall_healthy else 503
-    return jsonify(health_status), status_code
+    return health_status, status_code
+
+# Kubernetes only looks at the status code; nothing to build or encode per hit
+_LIVE_BODY = b'{"status":"alive"}'
 
 @health_bp.route('/health/live', methods=['GET'])
 def liveness_check():
     """Simple liveness check for Kubernetes"""
-    return jsonify({
-        'status': 'alive',
-        'timestamp': datetime.utcnow().isoformat()
-    }), 200
+    return Response(_LIVE_BODY, status=200, mimetype='application/json')
 
 @health_bp.route('/health/ready', methods=['GET'])
 def readiness_check():
     """Readiness check for Kubernetes"""
+    timestamp = datetime.utcnow().isoformat()
     try:
         # Check if database is accessible
-        db.session.execute(text('SELECT 1'))
+        _ping_database()
         
         # Check if Redis is accessible
-        redis_client = redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
-        redis_client.ping()
+        _ping_redis()
         
         return jsonify({
             'status': 'ready',
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': timestamp
         }), 200
     except Exception as e:
         return jsonify({
             'status': 'not_ready',
             'error': str(e),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': timestamp
         }), 503
 
+# Mock portfolio data - in production, this would fetch from DeFi APIs
+_PORTFOLIO_MOCK = {
+    'isDemoData': False,
+    'demoNotice': None,
+    'dataSource': 'DeFi APIs',
+    'totalValue': 12.456,
+    'totalValueChange': 0.234,
+    'totalValueChangePercent': 1.92,
+    'assets': [
+        {
+            'symbol': 'ETH',
+            'name': 'Ethereum',
+            'amount': 5.2,
+            'value': 8.456,
+            'change24h': 0.123,
+            'changePercent24h': 1.48,
+            'allocation': 68.0
+        },
+        {
+            'symbol': 'USDC',
+            'name': 'USD Coin',
+            'amount': 4000,
+            'value': 4.0,
+            'change24h': 0.001,
+            'changePercent24h': 0.03,
+            'allocation': 32.0
+        }
+    ],
+    'defiPositions': [
+        {
+            'protocol': 'Uniswap V3',
+            'asset': 'ETH/USDC LP',
+            'amount': 0.5,
+            'value': 1500.00,
+            'apy': 12.5,
+            'link': 'https://app.uniswap.org/'
+        },
+        {
+            'protocol': 'Compound',
+            'asset': 'cETH',
+            'amount': 1.2,
+            'value': 3600.00,
+            'apy': 3.8,
+            'link': 'https://compound.finance/'
+        },
+        {
+            'protocol': 'Aave',
+            'asset': 'aUSDC',
+            'amount': 1000.00,
+            'value': 1000.00,
+            'apy': 4.2,
+            'link': 'https://aave.com/'
+        }
+    ]
+}
+_PORTFOLIO_TEMPLATE = dumps_bytes(_PORTFOLIO_MOCK)
+
 @health_bp.route('/portfolio-data', methods=['GET'])
 @jwt_required()
 def get_portfolio_data():
@@ -174,64 +410,9 @@ def get_portfolio_data():
         if not wallet_address:
             return jsonify({'error': 'Wallet address is required'}), 400
         
-        # Mock portfolio data - in production, this would fetch from DeFi APIs
-        portfolio_data = {
-            'isDemoData': False,
-            'demoNotice': None,
-            'walletAddress': wallet_address,
-            'dataSource': 'DeFi APIs',
-            'totalValue': 12.456,
-            'totalValueChange': 0.234,
-            'totalValueChangePercent': 1.92,
-            'assets': [
-                {
-                    'symbol': 'ETH',
-                    'name': 'Ethereum',
-                    'amount': 5.2,
-                    'value': 8.456,
-                    'change24h': 0.123,
-                    'changePercent24h': 1.48,
-                    'allocation': 68.0
-                },
-                {
-                    'symbol': 'USDC',
-                    'name': 'USD Coin',
-                    'amount': 4000,
-                    'value': 4.0,
-                    'change24h': 0.001,
-                    'changePercent24h': 0.03,
-                    'allocation': 32.0
-                }
-            ],
-            'defiPositions': [
-                {
-                    'protocol': 'Uniswap V3',
-                    'asset': 'ETH/USDC LP',
-                    'amount': 0.5,
-                    'value': 1500.00,
-                    'apy': 12.5,
-                    'link': 'https://app.uniswap.org/'
-                },
-                {
-                    'protocol': 'Compound',
-                    'asset': 'cETH',
-                    'amount': 1.2,
-                    'value': 3600.00,
-                    'apy': 3.8,
-                    'link': 'https://compound.finance/'
-                },
-                {
-                    'protocol': 'Aave',
-                    'asset': 'aUSDC',
-                    'amount': 1000.00,
-                    'value': 1000.00,
-                    'apy': 4.2,
-                    'link': 'https://aave.com/'
-                }
-            ]
-        }
-        
-        return jsonify(portfolio_data), 200
+        # Only the wallet varies; splice it into the pre-encoded mock body
+        body = b'{"walletAddress":' + dumps_bytes(wallet_address) + b',' + _PORTFOLIO_TEMPLATE[1:]
+        return Response(body, mimetype='application/json'), 200
         
     except Exception as e:
         logger.log_error(e, f"Failed to get portfolio data for wallet {wallet_address}")
@@ -240,32 +421,35 @@ def get_portfolio_data():
 @health_bp.route('/health/metrics', methods=['GET'])
 def metrics():
     """Application metrics endpoint"""
+    return _cached_health_response('metrics', _compute_metrics, ttl=METRICS_CACHE_TTL, stale_on_error=True)
+
+def _metric_counts(now):
+    """All six metrics counters in a single round trip"""
+    estimated = db.engine.dialect.name == 'postgresql'
+    statement = _METRIC_COUNTS_ESTIMATED if estimated else _METRIC_COUNTS_EXACT
+    recent_cutoff = now - timedelta(hours=24)
+    row = db.session.execute(statement, {'cutoff': recent_cutoff}).one()
+    return {key: int(value) for key, value in row._mapping.items()}
+
+def _compute_metrics():
+    """Collect application and system metrics; returns (payload, status_code)"""
+    # One clock read shared by the 24h cutoff and both response shapes
+    now = datetime.utcnow()
+    timestamp = now.isoformat()
     try:
         # Database metrics
-        total_users = User.query.count()
-        total_agents = Agent.query.count()
-        total_messages = Message.query.count()
-        total_knowledge = KnowledgeGraph.query.count()
-        
-        # Recent activity metrics
-        recent_cutoff = datetime.utcnow() - timedelta(hours=24)
-        recent_messages = Message.query.filter(Message.timestamp >= recent_cutoff).count()
-        active_agents = Agent.query.filter(Agent.status == 'active').count()
+        counts = _metric_counts(now)
         
         # System metrics
         system_metrics = monitor.get_system_metrics()
         app_metrics = monitor.get_application_metrics()
         
         metrics_data = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': timestamp,
             'application': {
-                'total_users': total_users,
-                'total_agents': total_agents,
-                'total_messages': total_messages,
-                'total_knowledge_concepts': total_knowledge,
-                'recent_messages_24h': recent_messages,
-                'active_agents': active_agents,
-                **app_metrics
+                **counts,
+                **app_metrics,
+                'dropped_log_events': logger.dropped_events
             },
             'system': system_metrics,
             'performance': monitor.metrics
@@ -273,16 +457,16 @@ def metrics():
         
         # Log metrics access
         logger.log_event('INFO', 'metrics_accessed', {
-            'total_users': total_users,
-            'total_agents': total_agents,
-            'active_agents': active_agents
+            'total_users': counts['total_users'],
+            'total_agents': counts['total_agents'],
+            'active_agents': counts['active_agents']
         })
         
-        return jsonify(metrics_data), 200
+        return metrics_data, 200
     except Exception as e:
         logger.log_error(e, "Failed to retrieve metrics")
-        return jsonify({
+        return {
             'error': 'Failed to retrieve metrics',
             'details': str(e),
-            'timestamp': datetime.utcnow().isoformat()
-        }), 500
+            'timestamp': timestamp
+        }, 500
@@ -1,11 +1,121 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import KnowledgeGraph, db
+from utils.sanitization import check_schema, validate_input_schema
 from knowledge.metta_kg.integration import knowledge_graph
+from cachetools import TTLCache
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.orm import load_only
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import logging
+import os
+from threading import BoundedSemaphore, Lock
 
 knowledge_bp = Blueprint('knowledge', __name__)
 
+logger = logging.getLogger(__name__)
+
+# Identical knowledge lookups repeat often and the graph changes slowly, so read
+# results are reused for a minute by default. They don't depend on the caller's
+# identity. Writes clear this process's cache; other workers catch up within the TTL.
+KNOWLEDGE_CACHE_TTL = int(os.getenv('KNOWLEDGE_CACHE_TTL', 60))
+_knowledge_cache = TTLCache(maxsize=1024, ttl=KNOWLEDGE_CACHE_TTL)
+_knowledge_cache_lock = Lock()
+
+def _cached_knowledge(key, compute):
+    """Reuse a recent result for key; ?fresh=1 bypasses and refreshes it"""
+    if request.args.get('fresh') != '1':
+        with _knowledge_cache_lock:
+            result = _knowledge_cache.get(key)
+        if result is not None:
+            return result
+    result = compute()
+    with _knowledge_cache_lock:
+        _knowledge_cache[key] = result
+    return result
+
+# Validation schemas for knowledge writes
+KNOWLEDGE_SCHEMAS = {
+    'add_concept': {
+        'concept': {
+            'required': True,
+            'type': str,
+            'min_length': 1,
+            'max_length': 200
+        },
+        'definition': {
+            'required': False,
+            'type': str
+        },
+        'domain': {
+            'required': False,
+            'type': str,
+            'max_length': 100
+        },
+        'confidence_score': {
+            'required': False,
+            'type': (int, float)
+        },
+        'relationships': {
+            'required': False,
+            'type': dict
+        },
+        'source': {
+            'required': False,
+            'type': str,
+            'max_length': 100
+        }
+    },
+    'create_relationship': {
+        'from_concept': {
+            'required': True,
+            'type': str,
+            'min_length': 1
+        },
+        'to_concept': {
+            'required': True,
+            'type': str,
+            'min_length': 1
+        },
+        'relationship_type': {
+            'required': True,
+            'type': str,
+            'min_length': 1
+        },
+        'properties': {
+            'required': False,
+            'type': dict
+        }
+    }
+}
+
+# MeTTa calls are HTTP round trips; run them alongside the local SQL lookup
+_kg_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='knowledge-graph')
+
+# Same expression as idx_knowledge_search (GIN) so PostgreSQL can use the index
+_KNOWLEDGE_DOCUMENT = func.to_tsvector(
+    literal_column("'english'"),
+    KnowledgeGraph.concept + literal_column("' '") + func.coalesce(KnowledgeGraph.definition, literal_column("''"))
+)
+
+def _knowledge_search_filter(query_text: str, dialect_name: str):
+    """WHERE clause for a local knowledge lookup"""
+    substring = KnowledgeGraph.concept.contains(query_text)
+    if dialect_name != 'postgresql':
+        return substring
+    # Full-text match on concept + definition; the substring match stays for
+    # partial words and is served by the concept trigram index
+    return or_(
+        substring,
+        _KNOWLEDGE_DOCUMENT.op('@@')(func.websearch_to_tsquery(literal_column("'english'"), query_text))
+    )
+
+def _invalidate_knowledge_cache():
+    """Drop cached reads after this process changes the knowledge base"""
+    with _knowledge_cache_lock:
+        _knowledge_cache.clear()
+
 @knowledge_bp.route('/query', methods=['POST'])
 @jwt_required()
 def query_knowledge():
@@ -18,16 +128,17 @@ def query_knowledge():
     query_text = data['query']
     domain = data.get('domain', 'general')
     
-    try:
+    def compute():
         # Query MeTTa Knowledge Graph with intelligent responses
-        kg_results = knowledge_graph.query(query_text)
+        kg_future = _kg_executor.submit(knowledge_graph.query, query_text)
         
-        # Also query local knowledge base
+        # Meanwhile query the local knowledge base on this thread's session
         local_results = KnowledgeGraph.query.filter(
-            KnowledgeGraph.concept.contains(query_text)
+            _knowledge_search_filter(query_text, db.session.get_bind().dialect.name)
         ).limit(5).all()
+        kg_results = kg_future.result()
         
-        return jsonify({
+        return {
             'query': query_text,
             'domain': domain,
             'kg_results': kg_results,
@@ -38,8 +149,11 @@ def query_knowledge():
                 'confidence_score': result.confidence_score,
                 'source': result.source
             } for result in local_results],
-            'timestamp': datetime.utcnow().isoformat()
-        }), 200
+            'timestamp': datetime.utcnow()
+        }
+    
+    try:
+        return jsonify(_cached_knowledge(('query', query_text, domain), compute)), 200
         
     except Exception as e:
         return jsonify({'error': f'Knowledge query failed: {str(e)}'}), 500
@@ -48,17 +162,18 @@ def query_knowledge():
 @jwt_required()
 def get_concept(concept_name):
     """Get information about a specific concept"""
-    try:
-        # Query MeTTa Knowledge Graph
-        metta_result = knowledge_graph.query_concept(concept_name)
+    def compute():
+        # Query MeTTa Knowledge Graph and get relationships in parallel
+        metta_future = _kg_executor.submit(knowledge_graph.query_concept, concept_name)
+        relationships_future = _kg_executor.submit(knowledge_graph.find_relationships, concept_name)
         
-        # Query local knowledge base
+        # Meanwhile query the local knowledge base on this thread's session
         local_result = KnowledgeGraph.query.filter_by(concept=concept_name).first()
         
-        # Get relationships
-        relationships = knowledge_graph.find_relationships(concept_name)
+        metta_result = metta_future.result()
+        relationships = relationships_future.result()
         
-        return jsonify({
+        return {
             'concept': concept_name,
             'metta_data': metta_result,
             'local_data': {
@@ -69,8 +184,11 @@ def get_concept(concept_name):
                 'source': local_result.source
             } if local_result else None,
             'relationships': relationships,
-            'timestamp': datetime.utcnow().isoformat()
-        }), 200
+            'timestamp': datetime.utcnow()
+        }
+    
+    try:
+        return jsonify(_cached_knowledge(('concept', concept_name), compute)), 200
         
     except Exception as e:
         return jsonify({'error': f'Failed to get concept: {str(e)}'}), 500
@@ -80,7 +198,9 @@ def get_concept(concept_name):
 def get_domain_knowledge(domain_name):
     """Get knowledge context for a specific domain"""
     try:
-        context = knowledge_graph.get_knowledge_context(domain_name)
+        context = _cached_knowledge(
+            ('domain', domain_name), lambda: knowledge_graph.get_knowledge_context(domain_name)
+        )
         
         return jsonify(context), 200
         
@@ -89,13 +209,11 @@ def get_domain_knowledge(domain_name):
 
 @knowledge_bp.route('/concept', methods=['POST'])
 @jwt_required()
+@validate_input_schema(KNOWLEDGE_SCHEMAS['add_concept'])
 def add_concept():
     """Add new concept to the knowledge graph"""
     data = request.get_json()
     
-    if not data or not data.get('concept'):
-        return jsonify({'error': 'Concept is required'}), 400
-    
     concept = data['concept']
     definition = data.get('definition', '')
     domain = data.get('domain', 'general')
@@ -124,6 +242,7 @@ def add_concept():
         
         db.session.add(local_knowledge)
         db.session.commit()
+        _invalidate_knowledge_cache()
         
         return jsonify({
             'message': 'Concept added successfully',
@@ -132,7 +251,7 @@ def add_concept():
             'domain': domain,
             'metta_success': metta_success,
             'local_id': local_knowledge.id,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 201
         
     except Exception as e:
@@ -166,6 +285,7 @@ def add_knowledge():
         
         db.session.add(local_knowledge)
         db.session.commit()
+        _invalidate_knowledge_cache()
         
         return jsonify({
             'message': 'Knowledge added successfully',
@@ -178,16 +298,102 @@ def add_knowledge():
         db.session.rollback()
         return jsonify({'error': f'Failed to add knowledge: {str(e)}'}), 500
 
+# Upper bound on concepts accepted by one bulk request
+MAX_BULK_CONCEPTS = 1000
+
+# Bulk MeTTa sync gets its own single worker so an import never occupies the
+# _kg_executor threads that interactive queries wait on; at most
+# MAX_PENDING_BULK_SYNCS batches may be queued or running at once
+MAX_PENDING_BULK_SYNCS = 4
+_bulk_sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='knowledge-bulk-sync')
+_bulk_sync_slots = BoundedSemaphore(MAX_PENDING_BULK_SYNCS)
+
+def _sync_concepts_to_metta(concepts):
+    """Background MeTTa writes, one after another, for concepts already stored locally"""
+    try:
+        for concept, properties in concepts:
+            try:
+                if not knowledge_graph.add_concept(concept, properties):
+                    logger.warning("MeTTa rejected bulk concept %r", concept)
+            except Exception:
+                logger.exception("MeTTa sync failed for bulk concept %r", concept)
+    finally:
+        _bulk_sync_slots.release()
+
+@knowledge_bp.route('/concepts/bulk', methods=['POST'])
+@jwt_required()
+def add_concepts_bulk():
+    """Add many concepts in one transaction; MeTTa is updated in the background"""
+    data = request.get_json()
+    items = data.get('concepts') if isinstance(data, dict) else None
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'concepts must be a non-empty list'}), 400
+    if len(items) > MAX_BULK_CONCEPTS:
+        return jsonify({'error': f'At most {MAX_BULK_CONCEPTS} concepts per request'}), 400
+    # Each row gets the same rules as a single add_concept
+    errors = {}
+    for index, item in enumerate(items):
+        try:
+            check_schema(item, KNOWLEDGE_SCHEMAS['add_concept'])
+        except ValueError as e:
+            errors[index] = str(e)
+    if errors:
+        return jsonify({
+            'error': 'Invalid concepts',
+            'invalid_indexes': list(errors),
+            'details': {str(index): message for index, message in errors.items()}
+        }), 400
+    
+    # Refuse before writing anything rather than store rows MeTTa never gets
+    if not _bulk_sync_slots.acquire(blocking=False):
+        return jsonify({'error': 'Too many bulk imports in progress, retry shortly'}), 503
+    
+    queued = False
+    try:
+        local_knowledge = [KnowledgeGraph(
+            concept=item['concept'],
+            definition=item.get('definition', ''),
+            domain=item.get('domain', 'general'),
+            relationships=item.get('relationships', {}),
+            source=item.get('source', 'manual'),
+            confidence_score=item.get('confidence_score', 0.8)
+        ) for item in items]
+        
+        db.session.add_all(local_knowledge)
+        db.session.commit()
+        _invalidate_knowledge_cache()
+        
+        # The SQL rows are the source of truth; MeTTa catches up asynchronously
+        _bulk_sync_executor.submit(_sync_concepts_to_metta, [(item.concept, {
+            'definition': item.definition,
+            'domain': item.domain,
+            'confidence_score': item.confidence_score,
+            'relationships': item.relationships
+        }) for item in local_knowledge])
+        queued = True  # the job releases the slot from here on
+        
+        return jsonify({
+            'message': 'Concepts added successfully',
+            'count': len(local_knowledge),
+            'local_ids': [item.id for item in local_knowledge],
+            'metta_sync': 'queued',
+            'timestamp': datetime.utcnow()
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        if not queued:
+            _bulk_sync_slots.release()
+        return jsonify({'error': f'Failed to add concepts: {str(e)}'}), 500
+
 @knowledge_bp.route('/relationships', methods=['POST'])
 @jwt_required()
+@validate_input_schema(KNOWLEDGE_SCHEMAS['create_relationship'])
 def create_relationship():
     """Create a relationship between concepts"""
     data = request.get_json()
     
-    required_fields = ['from_concept', 'to_concept', 'relationship_type']
-    if not all(field in data for field in required_fields):
-        return jsonify({'error': 'from_concept, to_concept, and relationship_type are required'}), 400
-    
     try:
         success = knowledge_graph.create_relationship(
             data['from_concept'],
@@ -197,6 +403,7 @@ def create_relationship():
         )
         
         if success:
+            _invalidate_knowledge_cache()
             return jsonify({
                 'message': 'Relationship created successfully',
                 'from_concept': data['from_concept'],
@@ -219,19 +426,24 @@ def search_knowledge():
     if not query:
         return jsonify({'error': 'Search query is required'}), 400
     
-    try:
+    def compute():
         results = knowledge_graph.semantic_search(query, limit=limit)
-        
-        return jsonify({
+        return {
             'query': query,
             'results': results,
             'count': len(results),
-            'timestamp': datetime.utcnow().isoformat()
-        }), 200
+            'timestamp': datetime.utcnow()
+        }
+    
+    try:
+        return jsonify(_cached_knowledge(('search', query, limit), compute)), 200
         
     except Exception as e:
         return jsonify({'error': f'Search failed: {str(e)}'}), 500
         
+# Upper bound on ?per_page for the concept list
+MAX_CONCEPTS_PER_PAGE = 200
+
 @knowledge_bp.route('/concepts', methods=['GET'])
 def get_concepts():
     """Get all concepts from the knowledge graph"""
@@ -240,13 +452,19 @@ def get_concepts():
         per_page = int(request.args.get('per_page', 20))
         domain = request.args.get('domain', None)
         
-        query = KnowledgeGraph.query
+        # Everything the listing returns; skips the relationships JSON
+        query = KnowledgeGraph.query.options(load_only(
+            KnowledgeGraph.id, KnowledgeGraph.concept, KnowledgeGraph.definition,
+            KnowledgeGraph.domain, KnowledgeGraph.confidence_score, KnowledgeGraph.source,
+            KnowledgeGraph.created_at, KnowledgeGraph.updated_at
+        ))
         if domain:
             query = query.filter_by(domain=domain)
         
         concepts = query.paginate(
             page=page, 
             per_page=per_page, 
+            max_per_page=MAX_CONCEPTS_PER_PAGE,
             error_out=False
         )
         
@@ -258,18 +476,18 @@ def get_concepts():
                 'domain': concept.domain,
                 'confidence_score': concept.confidence_score,
                 'source': concept.source,
-                'created_at': concept.created_at.isoformat(),
-                'updated_at': concept.updated_at.isoformat()
+                'created_at': concept.created_at,
+                'updated_at': concept.updated_at
             } for concept in concepts.items],
             'pagination': {
                 'page': page,
-                'per_page': per_page,
+                'per_page': concepts.per_page,
                 'total': concepts.total,
                 'pages': concepts.pages,
                 'has_next': concepts.has_next,
                 'has_prev': concepts.has_prev
             },
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 200
         
     except Exception as e:
@@ -306,6 +524,7 @@ def update_concept(concept_id):
         concept.updated_at = datetime.utcnow()
         
         db.session.commit()
+        _invalidate_knowledge_cache()
         
         return jsonify({
             'message': 'Concept updated successfully',
@@ -316,9 +535,9 @@ def update_concept(concept_id):
                 'domain': concept.domain,
                 'confidence_score': concept.confidence_score,
                 'source': concept.source,
-                'updated_at': concept.updated_at.isoformat()
+                'updated_at': concept.updated_at
             },
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 200
         
     except Exception as e:
@@ -337,11 +556,12 @@ def delete_concept(concept_id):
         concept_name = concept.concept
         db.session.delete(concept)
         db.session.commit()
+        _invalidate_knowledge_cache()
         
         return jsonify({
             'message': 'Concept deleted successfully',
             'concept_name': concept_name,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 200
         
     except Exception as e:
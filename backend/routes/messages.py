@@ -1,13 +1,73 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import Message, Agent, db
+from sqlalchemy import and_, bindparam, or_, select
+from sqlalchemy.orm import aliased
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import uuid
 from utils.ai_intelligence import ai_intelligence, ai_enhanced_response
 from utils.logging import log_agent_interaction, logger
+from utils.json_provider import stream_json_array
+from utils.sanitization import validate_input_schema
 
 messages_bp = Blueprint('messages', __name__)
 
+# Validation schemas for message writes
+MESSAGE_SCHEMAS = {
+    'send_message': {
+        'content': {
+            'required': True,
+            'type': str,
+            'min_length': 1
+        },
+        'agent_id': {
+            'required': True,
+            'type': (int, str),
+            'min_length': 1
+        },
+        'message_type': {
+            'required': False,
+            'type': str,
+            'max_length': 20
+        },
+        'metadata': {
+            'required': False,
+            'type': dict
+        }
+    }
+}
+
+# Rows per server-side cursor fetch (and per encoded chunk) in get_conversation
+CONVERSATION_STREAM_BATCH = 500
+# Largest ?limit= get_conversation honours; larger values are clamped
+MAX_CONVERSATION_LIMIT = 10000
+
+_CONVERSATION = select(
+    Message.id, Message.content, Message.sender_type, Message.timestamp, Message.message_type
+).where(
+    Message.agent_id == bindparam('agent_id'), Message.user_id == bindparam('user_id')
+).order_by(Message.timestamp.asc(), Message.id.asc())
+_ResumeFrom = aliased(Message)
+
+# Replies for ?async=1 sends are generated here and pushed over Socket.IO
+_reply_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='agent-reply')
+
+# Frontend slugs accepted in place of a numeric agent_id
+AGENT_ID_ALIASES = {
+    'healthcare-agent': 1,
+    'logistics-agent': 2,
+    'financial-agent': 3
+}
+
+# Agent.agent_type -> prompt set in ai_intelligence; anything else is 'general'
+AGENT_TYPE_MAP = {
+    'healthcare': 'healthcare',
+    'logistics': 'logistics',
+    'financial': 'financial',
+    'finance': 'financial'
+}
+
 @messages_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_messages():
@@ -21,36 +81,29 @@ def get_messages():
     messages = Message.query.filter_by(
         agent_id=agent_id,
         user_id=user_id
-    ).order_by(Message.timestamp.asc()).all()
+    ).order_by(Message.timestamp.asc(), Message.id.asc()).all()
     
     return jsonify([{
         'id': msg.id,
         'content': msg.content,
         'sender_type': msg.sender_type,
-        'timestamp': msg.timestamp.isoformat(),
+        'timestamp': msg.timestamp,
         'message_type': msg.message_type,
         'metadata': msg.metadata
     } for msg in messages]), 200
 
 @messages_bp.route('/', methods=['POST'])
 @jwt_required()
+@validate_input_schema(MESSAGE_SCHEMAS['send_message'])
 def send_message():
     """Send a message to an agent"""
     user_id = get_jwt_identity()
     data = request.get_json()
     
-    if not data or not data.get('content') or not data.get('agent_id'):
-        return jsonify({'error': 'Content and agent_id are required'}), 400
-    
     # Handle string agent IDs
     agent_id = data['agent_id']
     if isinstance(agent_id, str) and not agent_id.isdigit():
-        agent_mapping = {
-            'healthcare-agent': 1,
-            'logistics-agent': 2, 
-            'financial-agent': 3
-        }
-        agent_id = agent_mapping.get(agent_id, 1)
+        agent_id = AGENT_ID_ALIASES.get(agent_id, 1)
     
     agent = Agent.query.get(agent_id)
     if not agent:
@@ -66,73 +119,121 @@ def send_message():
         metadata=data.get('metadata', {})
     )
     
+    # Committed on its own before any generation: it survives a failed reply,
+    # and its server-side timestamp is taken before the reply's
     db.session.add(user_message)
     db.session.commit()
     
+    if request.args.get('async') == '1':
+        # Answer over the sender's Socket.IO room
+        _reply_executor.submit(
+            _reply_in_background, current_app._get_current_object(), agent.id, user_id, data['content'], user_message.id
+        )
+        return jsonify({
+            'message': 'Message accepted',
+            'user_message_id': user_message.id,
+            'agent_response_id': None,
+            'status': 'pending'
+        }), 202
+    
+    # Generated outside any transaction, then stored in a short second one
+    agent_response = _build_agent_reply(agent, user_id, data['content'])
+    db.session.add(agent_response)
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Message sent successfully',
+        'user_message_id': user_message.id,
+        'agent_response_id': agent_response.id
+    }), 201
+
+def _build_agent_reply(agent: Agent, user_id, content: str) -> Message:
+    """Generate, analyze and log the agent's reply; returns it unsaved"""
     # Generate intelligent agent response based on agent type
-    agent_response_content = generate_agent_response(agent.name, data['content'])
+    agent_response_content = generate_agent_response(agent, content, user_id)
     
     # Analyze user sentiment and intent
-    sentiment_analysis = ai_intelligence.analyze_sentiment(data['content'])
-    intent_analysis = ai_intelligence.extract_intent(data['content'], agent.agent_type)
+    sentiment_analysis = ai_intelligence.analyze_sentiment(content)
+    intent_analysis = ai_intelligence.extract_intent(content, agent.agent_type)
     
     # Log agent interaction
     logger.log_agent_event(str(agent.id), 'message_processed', {
-        'user_message_length': len(data['content']),
+        'user_message_length': len(content),
         'agent_type': agent.agent_type,
         'sentiment': sentiment_analysis['sentiment'],
         'intent': intent_analysis['primary_intent']
     })
     
-    # Create agent response
-    agent_response = Message(
+    # Create agent response; the JSON metadata column needs a string
+    response_time = datetime.utcnow().isoformat()
+    return Message(
         content=agent_response_content,
         sender_type='agent',
-        agent_id=agent_id,
+        agent_id=agent.id,
         user_id=user_id,
         message_type='text',
-        metadata={'response_time': datetime.utcnow().isoformat()}
+        metadata={'response_time': response_time}
     )
-    
-    db.session.add(agent_response)
-    db.session.commit()
-    
-    return jsonify({
-        'message': 'Message sent successfully',
-        'user_message_id': user_message.id,
-        'agent_response_id': agent_response.id
-    }), 201
 
-def generate_agent_response(agent_name: str, user_message: str) -> str:
+def _reply_in_background(app, agent_id, user_id, content: str, user_message_id):
+    """Executor entry point for ?async=1: store the reply and emit agent_response"""
+    with app.app_context():
+        try:
+            agent = db.session.get(Agent, agent_id)
+            agent_response = _build_agent_reply(agent, user_id, content)
+            db.session.add(agent_response)
+            db.session.commit()
+            
+            socketio = app.extensions.get('socketio')
+            if socketio is not None:
+                socketio.emit('agent_response', {
+                    'agent_id': agent_id,
+                    'message': agent_response.content,
+                    'user_message_id': user_message_id,
+                    'agent_response_id': agent_response.id,
+                    'timestamp': agent_response.timestamp.isoformat()
+                }, room=f'user_{user_id}')
+        except Exception as e:
+            db.session.rollback()
+            logger.log_error(e, f"Background reply failed for agent {agent_id}")
+
+def generate_agent_response(agent: Agent, user_message: str, user_id=None) -> str:
     """Generate intelligent responses based on agent type using AI"""
+    agent_name = agent.name
     
-    # Determine agent type
-    agent_type = 'general'
-    if 'healthcare' in agent_name.lower():
-        agent_type = 'healthcare'
-    elif 'logistics' in agent_name.lower():
-        agent_type = 'logistics'
-    elif 'financial' in agent_name.lower():
-        agent_type = 'financial'
+    agent_type = AGENT_TYPE_MAP.get(agent.agent_type, 'general')
     
     # Use AI intelligence to generate response
     try:
-        # Get conversation context (last 5 messages)
-        recent_messages = Message.query.filter_by(
-            agent_id=Agent.query.filter_by(name=agent_name).first().id
-        ).order_by(Message.timestamp.desc()).limit(5).all()
+        # Get conversation context (last 5 messages of this user's conversation
+        # with the agent); plain rows, no ORM objects
+        conversation = {'agent_id': agent.id}
+        if user_id is not None:
+            conversation['user_id'] = user_id
+        recent_messages = Message.query.with_entities(
+            Message.content, Message.sender_type, Message.timestamp
+        ).filter_by(
+            **conversation
+        ).order_by(Message.timestamp.desc(), Message.id.desc()).limit(5).all()
         
         context = {
             'recent_messages': [
                 {
-                    'content': msg.content,
-                    'sender_type': msg.sender_type,
-                    'timestamp': msg.timestamp.isoformat()
-                } for msg in reversed(recent_messages)
+                    'content': content,
+                    'sender_type': sender_type,
+                    'timestamp': timestamp
+                } for content, sender_type, timestamp in reversed(recent_messages)
             ],
             'agent_type': agent_type,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }
+        if user_id is not None:
+            # Stable across turns, unlike recent_messages; scopes the response cache
+            context['conversation_id'] = f'{agent.id}:{user_id}'
+        
+        # End the context query's transaction so no snapshot or connection is
+        # held across the model's network round trip
+        db.session.commit()
         
         # Generate AI response
         response = ai_intelligence.generate_response(agent_type, user_message, context)
@@ -151,17 +252,17 @@ def generate_agent_response(agent_name: str, user_message: str) -> str:
         logger.log_error(e, f"AI response generation failed for {agent_name}")
         
         # Fallback to original logic
-        return generate_fallback_response(agent_name, user_message)
+        return generate_fallback_response(agent_type, user_message)
 
-def generate_fallback_response(agent_name: str, user_message: str) -> str:
+def generate_fallback_response(agent_type: str, user_message: str) -> str:
     """Fallback response generation"""
-    if 'healthcare' in agent_name.lower():
+    if agent_type == 'healthcare':
         return f"As a Healthcare Assistant, I understand your concern: '{user_message}'. I can help with medical analysis, symptom checking, and treatment planning. For accurate diagnosis, please consult with a healthcare professional. Based on your query, I recommend maintaining a healthy lifestyle and seeking medical advice if symptoms persist."
     
-    elif 'logistics' in agent_name.lower():
+    elif agent_type == 'logistics':
         return f"As a Logistics Coordinator, I'll help optimize your logistics for: '{user_message}'. I specialize in route optimization, inventory management, and delivery tracking. Let me analyze your supply chain needs and suggest improvements to reduce costs and improve delivery times."
     
-    elif 'financial' in agent_name.lower():
+    elif agent_type == 'financial':
         return f"As a Financial Advisor, I'll analyze your financial query: '{user_message}'. I can help with portfolio management, risk assessment, and DeFi integration. Let me provide investment insights and suggest strategies to optimize your returns while managing risk effectively."
     
     else:
@@ -182,7 +283,7 @@ def get_message(message_id):
         'content': message.content,
         'sender_type': message.sender_type,
         'agent_id': message.agent_id,
-        'timestamp': message.timestamp.isoformat(),
+        'timestamp': message.timestamp,
         'message_type': message.message_type,
         'metadata': message.metadata
     }), 200
@@ -190,18 +291,51 @@ def get_message(message_id):
 @messages_bp.route('/conversation/<int:agent_id>', methods=['GET'])
 @jwt_required()
 def get_conversation(agent_id):
-    """Get conversation history with a specific agent"""
+    """Get conversation history with a specific agent
+
+    Streams the whole history oldest-first. ?after=<message id> resumes after
+    that message (keyset, so deep pages cost the same; an unknown id yields an
+    empty list) and ?limit=<n> (1..MAX_CONVERSATION_LIMIT) caps it.
+    """
     user_id = get_jwt_identity()
+    stmt = _CONVERSATION
     
-    messages = Message.query.filter_by(
-        agent_id=agent_id,
-        user_id=user_id
-    ).order_by(Message.timestamp.asc()).all()
+    # Checked before the Response exists: once streaming starts, an error can
+    # only truncate the body
+    try:
+        after = int(request.args['after']) if 'after' in request.args else None
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'after and limit must be integers'}), 400
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
     
-    return jsonify([{
-        'id': msg.id,
-        'content': msg.content,
-        'sender_type': msg.sender_type,
-        'timestamp': msg.timestamp.isoformat(),
-        'message_type': msg.message_type
-    } for msg in messages]), 200
+    if after is not None:
+        # Compared in SQL, so the timestamp never round-trips through Python
+        after_timestamp = select(_ResumeFrom.timestamp).where(_ResumeFrom.id == after).scalar_subquery()
+        stmt = stmt.where(or_(
+            Message.timestamp > after_timestamp,
+            and_(Message.timestamp == after_timestamp, Message.id > after)
+        ))
+    if limit is not None:
+        stmt = stmt.limit(min(limit, MAX_CONVERSATION_LIMIT))
+    
+    def generate():
+        # Server-side cursor fetching CONVERSATION_STREAM_BATCH rows at a time
+        result = db.session.execute(
+            stmt, {'agent_id': agent_id, 'user_id': user_id},
+            execution_options={'yield_per': CONVERSATION_STREAM_BATCH}
+        )
+        for message_id, content, sender_type, timestamp, message_type in result:
+            yield {
+                'id': message_id,
+                'content': content,
+                'sender_type': sender_type,
+                'timestamp': timestamp,
+                'message_type': message_type
+            }
+    
+    return Response(
+        stream_with_context(stream_json_array(generate(), CONVERSATION_STREAM_BATCH)),
+        mimetype='application/json'
+    ), 200
@@ -1,20 +1,46 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, request, jsonify, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.multisig import multisig_manager
 from utils.logging import logger
 from utils.sanitization import require_sanitized_input, validate_input_schema, InputSanitizer
+from utils.json_provider import dumps_bytes
+from cachetools import TTLCache
 from datetime import datetime
+from functools import lru_cache
+from threading import Lock
+import hashlib
 import json
+import os
 
 multisig_bp = Blueprint('multisig', __name__)
 
+@lru_cache(maxsize=4096)
+def _user_address(user_id) -> str:
+    """Placeholder wallet address for a user id (until profiles carry one)"""
+    # JWT identities are strings; the zero-padded form needs an int
+    return f"0x{int(user_id):040d}"
+
+# (multisig_address, chain) -> (encoded status body, etag). On-chain status
+# moves slowly; a few seconds of reuse spares the RPC and lets clients revalidate
+WALLET_STATUS_CACHE_TTL = int(os.getenv('WALLET_STATUS_CACHE_TTL', 5))
+_wallet_status_cache = TTLCache(maxsize=4096, ttl=WALLET_STATUS_CACHE_TTL)
+_wallet_status_lock = Lock()
+
+def _invalidate_wallet_status(multisig_address=None, chain='ethereum'):
+    """Forget a wallet's cached status after a write; all of them when the wallet is unknown"""
+    with _wallet_status_lock:
+        if multisig_address is None:
+            _wallet_status_cache.clear()
+        else:
+            _wallet_status_cache.pop((multisig_address, chain), None)
+
 # Validation schemas for multisig operations
 MULTISIG_SCHEMAS = {
     'create_wallet': {
         'chain': {
             'required': True,
             'type': str,
-            'pattern': r'^(ethereum|polygon|solana)$'
+            'choices': frozenset({'ethereum', 'polygon', 'solana'})
         },
         'owners': {
             'required': True,
@@ -57,7 +83,7 @@ MULTISIG_SCHEMAS = {
         'chain': {
             'required': False,
             'type': str,
-            'pattern': r'^(ethereum|polygon|solana)$'
+            'choices': frozenset({'ethereum', 'polygon', 'solana'})
         }
     },
     'approve_transaction': {
@@ -81,7 +107,7 @@ MULTISIG_SCHEMAS = {
 def create_multisig_wallet():
     """Create a new multi-signature wallet"""
     try:
-        data = getattr(g, 'sanitized_data', request.get_json())
+        data = g.sanitized_data
         user_id = get_jwt_identity()
         
         # Validate multisig configuration
@@ -101,7 +127,7 @@ def create_multisig_wallet():
         )
         
         # Log wallet creation
-        logger.log_event('INFO', 'multisig_wallet_created_by_user', {
+        logger.log_event_async('INFO', 'multisig_wallet_created_by_user', {
             'user_id': user_id,
             'chain': data['chain'],
             'owners_count': len(data['owners']),
@@ -125,7 +151,7 @@ def create_multisig_wallet():
 def create_transaction():
     """Create a transaction for multi-signature approval"""
     try:
-        data = getattr(g, 'sanitized_data', request.get_json())
+        data = g.sanitized_data
         user_id = get_jwt_identity()
         
         # Create transaction
@@ -136,9 +162,11 @@ def create_transaction():
             data=data.get('data', '0x'),
             chain=data.get('chain', 'ethereum')
         )
+        # pending_transactions changes
+        _invalidate_wallet_status(data['multisig_address'], data.get('chain', 'ethereum'))
         
         # Log transaction creation
-        logger.log_event('INFO', 'multisig_transaction_created_by_user', {
+        logger.log_event_async('INFO', 'multisig_transaction_created_by_user', {
             'user_id': user_id,
             'transaction_id': transaction['transaction_id'],
             'multisig_address': data['multisig_address'],
@@ -162,11 +190,11 @@ def create_transaction():
 def approve_transaction(transaction_id):
     """Approve a multi-signature transaction"""
     try:
-        data = getattr(g, 'sanitized_data', request.get_json())
+        data = g.sanitized_data
         user_id = get_jwt_identity()
         
         # Get user's wallet address (in real implementation, get from user profile)
-        approver_address = data.get('approver_address', f"0x{user_id:040d}")
+        approver_address = data.get('approver_address') or _user_address(user_id)
         
         # Approve transaction
         approval = multisig_manager.approve_transaction(
@@ -174,9 +202,11 @@ def approve_transaction(transaction_id):
             approver=approver_address,
             signature=data.get('signature')
         )
+        # Only the transaction id is known here unless the manager reports the wallet
+        _invalidate_wallet_status(approval.get('multisig_address'), approval.get('chain', 'ethereum'))
         
         # Log approval
-        logger.log_event('INFO', 'multisig_transaction_approved_by_user', {
+        logger.log_event_async('INFO', 'multisig_transaction_approved_by_user', {
             'user_id': user_id,
             'transaction_id': transaction_id,
             'approver': approver_address
@@ -197,11 +227,11 @@ def approve_transaction(transaction_id):
 def reject_transaction(transaction_id):
     """Reject a multi-signature transaction"""
     try:
-        data = getattr(g, 'sanitized_data', request.get_json())
+        data = g.sanitized_data
         user_id = get_jwt_identity()
         
         # Get user's wallet address
-        rejector_address = data.get('rejector_address', f"0x{user_id:040d}")
+        rejector_address = data.get('rejector_address') or _user_address(user_id)
         
         # Reject transaction
         rejection = multisig_manager.reject_transaction(
@@ -209,9 +239,10 @@ def reject_transaction(transaction_id):
             rejector=rejector_address,
             reason=data.get('reason')
         )
+        _invalidate_wallet_status(rejection.get('multisig_address'), rejection.get('chain', 'ethereum'))
         
         # Log rejection
-        logger.log_event('WARNING', 'multisig_transaction_rejected_by_user', {
+        logger.log_event_async('WARNING', 'multisig_transaction_rejected_by_user', {
             'user_id': user_id,
             'transaction_id': transaction_id,
             'rejector': rejector_address,
@@ -233,13 +264,26 @@ def get_wallet_status(multisig_address):
     """Get status of a multi-signature wallet"""
     try:
         chain = request.args.get('chain', 'ethereum')
-        
-        # Get wallet status
-        status = multisig_manager.get_multisig_status(multisig_address, chain)
-        
-        return jsonify({
-            'wallet_status': status
-        }), 200
+        key = (multisig_address, chain)
+        
+        with _wallet_status_lock:
+            cached = _wallet_status_cache.get(key)
+        if cached is None:
+            # Get wallet status
+            status = multisig_manager.get_multisig_status(multisig_address, chain)
+            body = dumps_bytes({'wallet_status': status})
+            cached = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+            with _wallet_status_lock:
+                _wallet_status_cache[key] = cached
+        body, etag = cached
+        
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, status=200, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.private = True
+        return response
         
     except Exception as e:
         logger.log_error(e, f"Failed to get wallet status for {multisig_address}")
@@ -270,7 +314,7 @@ def get_transaction_history(multisig_address):
 def add_owner(multisig_address):
     """Add a new owner to multi-signature wallet"""
     try:
-        data = getattr(g, 'sanitized_input', request.get_json())
+        data = g.sanitized_data
         user_id = get_jwt_identity()
         
         new_owner = InputSanitizer.sanitize_text(data.get('new_owner'))
@@ -283,12 +327,13 @@ def add_owner(multisig_address):
         result = multisig_manager.add_owner(
             multisig_address=multisig_address,
             new_owner=new_owner,
-            approver=f"0x{user_id:040d}",
+            approver=_user_address(user_id),
             chain=chain
         )
+        _invalidate_wallet_status(multisig_address, chain)
         
         # Log owner addition
-        logger.log_event('INFO', 'multisig_owner_added_by_user', {
+        logger.log_event_async('INFO', 'multisig_owner_added_by_user', {
             'user_id': user_id,
             'multisig_address': multisig_address,
             'new_owner': new_owner
@@ -309,7 +354,7 @@ def add_owner(multisig_address):
 def remove_owner(multisig_address):
     """Remove an owner from multi-signature wallet"""
     try:
-        data = getattr(g, 'sanitized_input', request.get_json())
+        data = g.sanitized_data
         user_id = get_jwt_identity()
         
         owner_to_remove = InputSanitizer.sanitize_text(data.get('owner_to_remove'))
@@ -322,12 +367,13 @@ def remove_owner(multisig_address):
         result = multisig_manager.remove_owner(
             multisig_address=multisig_address,
             owner_to_remove=owner_to_remove,
-            approver=f"0x{user_id:040d}",
+            approver=_user_address(user_id),
             chain=chain
         )
+        _invalidate_wallet_status(multisig_address, chain)
         
         # Log owner removal
-        logger.log_event('INFO', 'multisig_owner_removed_by_user', {
+        logger.log_event_async('INFO', 'multisig_owner_removed_by_user', {
             'user_id': user_id,
             'multisig_address': multisig_address,
             'owner_removed': owner_to_remove
@@ -348,7 +394,7 @@ def remove_owner(multisig_address):
 def change_threshold(multisig_address):
     """Change the threshold for multi-signature wallet"""
     try:
-        data = getattr(g, 'sanitized_input', request.get_json())
+        data = g.sanitized_data
         user_id = get_jwt_identity()
         
         new_threshold = data.get('new_threshold')
@@ -361,12 +407,13 @@ def change_threshold(multisig_address):
         result = multisig_manager.change_threshold(
             multisig_address=multisig_address,
             new_threshold=new_threshold,
-            approver=f"0x{user_id:040d}",
+            approver=_user_address(user_id),
             chain=chain
         )
+        _invalidate_wallet_status(multisig_address, chain)
         
         # Log threshold change
-        logger.log_event('INFO', 'multisig_threshold_changed_by_user', {
+        logger.log_event_async('INFO', 'multisig_threshold_changed_by_user', {
             'user_id': user_id,
             'multisig_address': multisig_address,
             'new_threshold': new_threshold
@@ -381,29 +428,32 @@ def change_threshold(multisig_address):
         logger.log_error(e, f"Failed to change threshold for {multisig_address}")
         return jsonify({'error': 'Failed to change threshold'}), 500
 
+# Static for the life of the process; encoded once instead of per request
+_SUPPORTED_CHAINS_BODY = dumps_bytes({
+    'supported_chains': multisig_manager.supported_chains,
+    'capabilities': {
+        'ethereum': [
+            'Gnosis Safe integration',
+            'ERC-20 token support',
+            'Gas optimization',
+            'Owner management'
+        ],
+        'polygon': [
+            'Low-cost transactions',
+            'EVM compatibility',
+            'Fast confirmations',
+            'Gas optimization'
+        ],
+        'solana': [
+            'SPL token support',
+            'Program upgrades',
+            'Fast transactions',
+            'Low fees'
+        ]
+    }
+})
+
 @multisig_bp.route('/supported-chains', methods=['GET'])
 def get_supported_chains():
     """Get list of supported blockchain networks"""
-    return jsonify({
-        'supported_chains': multisig_manager.supported_chains,
-        'capabilities': {
-            'ethereum': [
-                'Gnosis Safe integration',
-                'ERC-20 token support',
-                'Gas optimization',
-                'Owner management'
-            ],
-            'polygon': [
-                'Low-cost transactions',
-                'EVM compatibility',
-                'Fast confirmations',
-                'Gas optimization'
-            ],
-            'solana': [
-                'SPL token support',
-                'Program upgrades',
-                'Fast transactions',
-                'Low fees'
-            ]
-        }
-    }), 200
+    return Response(_SUPPORTED_CHAINS_BODY, status=200, mimetype='application/json')
@@ -1,17 +1,59 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import AgentSession, Agent, User, db
-from datetime import datetime
-import uuid
+from models import AgentSession, Agent, User, db, new_session_id
+from routes.agents import invalidate_agents_cache
+from sqlalchemy import and_, func, insert, or_, select
+from sqlalchemy.orm import aliased
+from datetime import datetime, timezone
+from operator import attrgetter
+import time
 
 sessions_bp = Blueprint('sessions', __name__)
 
+_CursorSession = aliased(AgentSession)
+
+# Largest page get_sessions returns; a larger ?per_page= is clamped
+MAX_SESSIONS_PER_PAGE = 100
+
+# Fields every session payload carries, in response order
+_SESSION_FIELDS = ('id', 'session_id', 'agent_id', 'user_id', 'status', 'started_at', 'ended_at', 'agent_metadata')
+_get_session_fields = attrgetter(*_SESSION_FIELDS)
+
+# Columns the session listings return; selected as plain rows, not ORM objects
+_SESSION_COLUMNS = tuple(getattr(AgentSession, field) for field in _SESSION_FIELDS)
+
+# (epoch second, ISO string) for response timestamps; one tuple so a reader
+# never sees the second from one tick and the string from another
+_tick = (0, '')
+
+def _now_iso() -> str:
+    """Current UTC time to the second, formatted once per second"""
+    global _tick
+    second = int(time.time())
+    if _tick[0] != second:
+        # Naive ISO string, matching the utcnow()-based timestamps elsewhere
+        _tick = (second, datetime.fromtimestamp(second, timezone.utc).replace(tzinfo=None).isoformat())
+    return _tick[1]
+
+def _current_user_id():
+    """The JWT identity as an int, or None when it is not a numeric user id"""
+    try:
+        return int(get_jwt_identity())
+    except (TypeError, ValueError):
+        return None
+
+def _session_payload(session):
+    """Serialize a session (model instance or _SESSION_COLUMNS row) for API responses"""
+    return dict(zip(_SESSION_FIELDS, _get_session_fields(session)))
+
 @sessions_bp.route('/', methods=['POST'])
 @sessions_bp.route('', methods=['POST'])
 @jwt_required()
 def create_session():
     """Create a new agent session"""
-    user_id = get_jwt_identity()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'Invalid user identity'}), 401
     data = request.get_json()
     
     if not data or not data.get('agent_id'):
@@ -20,39 +62,35 @@ def create_session():
     agent_id = data['agent_id']
     
     try:
-        # Verify agent exists
-        agent = Agent.query.get(agent_id)
-        if not agent:
+        # Verify agent exists; only the owner is needed, so skip loading the row
+        row = db.session.execute(select(Agent.owner_id).where(Agent.id == agent_id)).first()
+        if row is None:
             return jsonify({'error': 'Agent not found'}), 404
         
         # Check if user has permission to create session with this agent
-        if agent.owner_id and agent.owner_id != int(user_id):
+        owner_id = row.owner_id
+        if owner_id and owner_id != user_id:
             return jsonify({'error': 'Permission denied'}), 403
         
-        # Create new session
-        session = AgentSession(
-            agent_id=agent_id,
-            user_id=user_id,
-            session_id=str(uuid.uuid4()),
-            status='active',
-            agent_metadata=data.get('metadata', {})
-        )
-        
-        db.session.add(session)
+        # Create new session: a Core INSERT ... RETURNING, no unit-of-work
+        # flush or identity-map entry for a row this request never touches again
+        session = db.session.execute(
+            insert(AgentSession).values(
+                agent_id=agent_id,
+                user_id=user_id,
+                session_id=new_session_id(),
+                status='active',
+                agent_metadata=data.get('metadata', {})
+            ).returning(*_SESSION_COLUMNS)
+        ).one()
         db.session.commit()
+        # Core-style inserts bypass the mapper events; /agents/status counts active sessions
+        invalidate_agents_cache()
         
         return jsonify({
             'message': 'Session created successfully',
-            'session': {
-                'id': session.id,
-                'session_id': session.session_id,
-                'agent_id': session.agent_id,
-                'user_id': session.user_id,
-                'status': session.status,
-                'started_at': session.started_at.isoformat(),
-                'agent_metadata': session.agent_metadata
-            },
-            'timestamp': datetime.utcnow().isoformat()
+            'session': _session_payload(session),
+            'timestamp': _now_iso()
         }), 201
         
     except Exception as e:
@@ -64,7 +102,9 @@ def create_session():
 @jwt_required()
 def get_sessions():
     """Get all sessions for the current user"""
-    user_id = get_jwt_identity()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'Invalid user identity'}), 401
     
     try:
         page = int(request.args.get('page', 1))
@@ -72,39 +112,68 @@ def get_sessions():
         status = request.args.get('status', None)
         agent_id = request.args.get('agent_id', None)
         
-        query = AgentSession.query.filter_by(user_id=int(user_id))
+        query = AgentSession.query.filter_by(user_id=user_id)
         
         if status:
             query = query.filter_by(status=status)
         if agent_id:
             query = query.filter_by(agent_id=agent_id)
         
-        sessions = query.order_by(AgentSession.started_at.desc()).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        query = query.order_by(AgentSession.started_at.desc(), AgentSession.id.desc()).with_entities(*_SESSION_COLUMNS)
+        
+        # Bounded before any query runs, so a page is never larger than this
+        if per_page < 1:
+            per_page = 20
+        per_page = min(per_page, MAX_SESSIONS_PER_PAGE)
+        
+        if 'cursor' in request.args:
+            # Keyset paging: ?cursor= starts, then pass back next_cursor (the
+            # last session's id). No OFFSET scan and no COUNT(*).
+            cursor = request.args.get('cursor', type=int)
+            if cursor is not None:
+                # (started_at, id) of the cursor row, compared in SQL
+                cursor_row = select(_CursorSession.started_at).where(_CursorSession.id == cursor).scalar_subquery()
+                query = query.filter(or_(
+                    AgentSession.started_at < cursor_row,
+                    and_(AgentSession.started_at == cursor_row, AgentSession.id < cursor)
+                ))
+            rows = query.limit(per_page + 1).all()
+            has_next = len(rows) > per_page
+            rows = rows[:per_page]
+            
+            return jsonify({
+                'sessions': [_session_payload(session) for session in rows],
+                'pagination': {
+                    'per_page': per_page,
+                    'has_next': has_next,
+                    'next_cursor': rows[-1].id if has_next else None
+                },
+                'timestamp': _now_iso()
+            }), 200
+        
+        # Page mode: the total rides along as a window count on each row, so
+        # the page and its total come from one query instead of paginate()'s
+        # separate SELECT COUNT(*)
+        page = max(page, 1)
+        rows = query.add_columns(func.count().over().label('total')).limit(per_page).offset((page - 1) * per_page).all()
+        if rows:
+            total = rows[0].total
+        else:
+            # Past the last page (or no sessions): no row to carry the total
+            total = query.order_by(None).count() if page > 1 else 0
+        pages = -(-total // per_page)
         
         return jsonify({
-            'sessions': [{
-                'id': session.id,
-                'session_id': session.session_id,
-                'agent_id': session.agent_id,
-                'user_id': session.user_id,
-                'status': session.status,
-                'started_at': session.started_at.isoformat(),
-                'ended_at': session.ended_at.isoformat() if session.ended_at else None,
-                'agent_metadata': session.agent_metadata
-            } for session in sessions.items],
+            'sessions': [_session_payload(session) for session in rows],
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': sessions.total,
-                'pages': sessions.pages,
-                'has_next': sessions.has_next,
-                'has_prev': sessions.has_prev
+                'total': total,
+                'pages': pages,
+                'has_next': page < pages,
+                'has_prev': page > 1
             },
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': _now_iso()
         }), 200
         
     except Exception as e:
@@ -114,29 +183,21 @@ def get_sessions():
 @jwt_required()
 def get_session(session_id):
     """Get a specific session"""
-    user_id = get_jwt_identity()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'Invalid user identity'}), 401
     
     try:
-        session = AgentSession.query.get(session_id)
+        # Scoped to the caller, so another user's session is simply not found
+        session = AgentSession.query.filter_by(
+            id=session_id, user_id=user_id
+        ).with_entities(*_SESSION_COLUMNS).first()
         if not session:
             return jsonify({'error': 'Session not found'}), 404
         
-        # Check if user has permission to view this session
-        if session.user_id != int(user_id):
-            return jsonify({'error': 'Permission denied'}), 403
-        
         return jsonify({
-            'session': {
-                'id': session.id,
-                'session_id': session.session_id,
-                'agent_id': session.agent_id,
-                'user_id': session.user_id,
-                'status': session.status,
-                'started_at': session.started_at.isoformat(),
-                'ended_at': session.ended_at.isoformat() if session.ended_at else None,
-                'agent_metadata': session.agent_metadata
-            },
-            'timestamp': datetime.utcnow().isoformat()
+            'session': _session_payload(session),
+            'timestamp': _now_iso()
         }), 200
         
     except Exception as e:
@@ -146,21 +207,19 @@ def get_session(session_id):
 @jwt_required()
 def update_session(session_id):
     """Update a session"""
-    user_id = get_jwt_identity()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'Invalid user identity'}), 401
     data = request.get_json()
     
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
     try:
-        session = AgentSession.query.get(session_id)
+        session = AgentSession.query.filter_by(id=session_id, user_id=user_id).first()
         if not session:
             return jsonify({'error': 'Session not found'}), 404
         
-        # Check if user has permission to update this session
-        if session.user_id != int(user_id):
-            return jsonify({'error': 'Permission denied'}), 403
-        
         # Update fields if provided
         if 'status' in data:
             session.status = data['status']
@@ -174,17 +233,8 @@ def update_session(session_id):
         
         return jsonify({
             'message': 'Session updated successfully',
-            'session': {
-                'id': session.id,
-                'session_id': session.session_id,
-                'agent_id': session.agent_id,
-                'user_id': session.user_id,
-                'status': session.status,
-                'started_at': session.started_at.isoformat(),
-                'ended_at': session.ended_at.isoformat() if session.ended_at else None,
-                'agent_metadata': session.agent_metadata
-            },
-            'timestamp': datetime.utcnow().isoformat()
+            'session': _session_payload(session),
+            'timestamp': _now_iso()
         }), 200
         
     except Exception as e:
@@ -195,23 +245,24 @@ def update_session(session_id):
 @jwt_required()
 def delete_session(session_id):
     """Delete a session"""
-    user_id = get_jwt_identity()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'Invalid user identity'}), 401
     
     try:
-        session = AgentSession.query.get(session_id)
-        if not session:
+        # One DELETE; zero rows means missing or not the caller's
+        deleted = AgentSession.query.filter_by(
+            id=session_id, user_id=user_id
+        ).delete(synchronize_session=False)
+        if not deleted:
             return jsonify({'error': 'Session not found'}), 404
-        
-        # Check if user has permission to delete this session
-        if session.user_id != int(user_id):
-            return jsonify({'error': 'Permission denied'}), 403
-        
-        db.session.delete(session)
         db.session.commit()
+        # Bulk deletes bypass the mapper events too
+        invalidate_agents_cache()
         
         return jsonify({
             'message': 'Session deleted successfully',
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': _now_iso()
         }), 200
         
     except Exception as e:
@@ -222,26 +273,20 @@ def delete_session(session_id):
 @jwt_required()
 def get_active_sessions():
     """Get all active sessions for the current user"""
-    user_id = get_jwt_identity()
+    user_id = _current_user_id()
+    if user_id is None:
+        return jsonify({'error': 'Invalid user identity'}), 401
     
     try:
         active_sessions = AgentSession.query.filter_by(
             user_id=user_id,
             status='active'
-        ).order_by(AgentSession.started_at.desc()).all()
+        ).order_by(AgentSession.started_at.desc(), AgentSession.id.desc()).with_entities(*_SESSION_COLUMNS).all()
         
         return jsonify({
-            'active_sessions': [{
-                'id': session.id,
-                'session_id': session.session_id,
-                'agent_id': session.agent_id,
-                'user_id': session.user_id,
-                'status': session.status,
-                'started_at': session.started_at.isoformat(),
-                'agent_metadata': session.agent_metadata
-            } for session in active_sessions],
+            'active_sessions': [_session_payload(session) for session in active_sessions],
             'count': len(active_sessions),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': _now_iso()
         }), 200
         
     except Exception as e:
@@ -63,10 +63,10 @@ def create_transaction():
                 'gas_used': transaction.gas_used,
                 'gas_price': transaction.gas_price,
                 'block_number': transaction.block_number,
-                'created_at': transaction.created_at.isoformat(),
+                'created_at': transaction.created_at,
                 'agent_metadata': transaction.agent_metadata
             },
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 201
         
     except Exception as e:
@@ -102,7 +102,7 @@ def get_transactions():
                     'has_next': False,
                     'has_prev': False
                 },
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': datetime.utcnow()
             }), 200
         
         query = Transaction.query.filter(Transaction.agent_id.in_(agent_ids))
@@ -114,7 +114,7 @@ def get_transactions():
         if transaction_type:
             query = query.filter_by(transaction_type=transaction_type)
         
-        transactions = query.order_by(Transaction.created_at.desc()).paginate(
+        transactions = query.order_by(Transaction.created_at.desc(), Transaction.id.desc()).paginate(
             page=page,
             per_page=per_page,
             error_out=False
@@ -130,7 +130,7 @@ def get_transactions():
                 'gas_used': transaction.gas_used,
                 'gas_price': transaction.gas_price,
                 'block_number': transaction.block_number,
-                'created_at': transaction.created_at.isoformat(),
+                'created_at': transaction.created_at,
                 'agent_metadata': transaction.agent_metadata
             } for transaction in transactions.items],
             'pagination': {
@@ -141,7 +141,7 @@ def get_transactions():
                 'has_next': transactions.has_next,
                 'has_prev': transactions.has_prev
             },
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 200
         
     except Exception as e:
@@ -173,10 +173,10 @@ def get_transaction(transaction_id):
                 'gas_used': transaction.gas_used,
                 'gas_price': transaction.gas_price,
                 'block_number': transaction.block_number,
-                'created_at': transaction.created_at.isoformat(),
+                'created_at': transaction.created_at,
                 'agent_metadata': transaction.agent_metadata
             },
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 200
         
     except Exception as e:
@@ -227,10 +227,10 @@ def update_transaction(transaction_id):
                 'gas_used': transaction.gas_used,
                 'gas_price': transaction.gas_price,
                 'block_number': transaction.block_number,
-                'created_at': transaction.created_at.isoformat(),
+                'created_at': transaction.created_at,
                 'agent_metadata': transaction.agent_metadata
             },
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 200
         
     except Exception as e:
@@ -261,7 +261,7 @@ def get_agent_transactions(agent_id):
         if status:
             query = query.filter_by(status=status)
         
-        transactions = query.order_by(Transaction.created_at.desc()).paginate(
+        transactions = query.order_by(Transaction.created_at.desc(), Transaction.id.desc()).paginate(
             page=page,
             per_page=per_page,
             error_out=False
@@ -277,7 +277,7 @@ def get_agent_transactions(agent_id):
                 'gas_used': transaction.gas_used,
                 'gas_price': transaction.gas_price,
                 'block_number': transaction.block_number,
-                'created_at': transaction.created_at.isoformat(),
+                'created_at': transaction.created_at,
                 'agent_metadata': transaction.agent_metadata
             } for transaction in transactions.items],
             'pagination': {
@@ -288,7 +288,7 @@ def get_agent_transactions(agent_id):
                 'has_next': transactions.has_next,
                 'has_prev': transactions.has_prev
             },
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 200
         
     except Exception as e:
@@ -314,7 +314,7 @@ def get_transaction_stats():
                 'total_gas_used': 0,
                 'average_gas_price': 0,
                 'transaction_types': {},
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': datetime.utcnow()
             }), 200
         
         # Get transaction statistics
@@ -359,7 +359,7 @@ def get_transaction_stats():
             'total_gas_used': int(gas_stats.total_gas or 0),
             'average_gas_price': float(gas_stats.avg_gas_price or 0),
             'transaction_types': transaction_types,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }), 200
         
     except Exception as e:
@@ -16,6 +16,7 @@ os.environ['TESTING'] = 'True'
 os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
 os.environ['SECRET_KEY'] = 'test-secret-key'
 os.environ['JWT_SECRET_KEY'] = 'test-jwt-secret'
+os.environ['BCRYPT_LOG_ROUNDS'] = '4'
 
 @pytest.fixture(scope='session')
 def app():
@@ -37,7 +38,9 @@ def app():
     backend_dir = os.path.dirname(__file__) + '/..'
     sys.path.insert(0, backend_dir)
     from models import db
+    from utils.json_provider import init_json_provider
     db.init_app(app)
+    init_json_provider(app)
     
     # Initialize JWT
     jwt = JWTManager(app)
@@ -46,11 +49,13 @@ def app():
     migrate = Migrate(app, db)
     
     # Register blueprints for testing
-    from routes import auth_bp, agents_bp, messages_bp, knowledge_bp
+    from routes import auth_bp, agents_bp, messages_bp, knowledge_bp, health_bp, sessions_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(agents_bp, url_prefix='/api/agents')
     app.register_blueprint(messages_bp, url_prefix='/api/messages')
     app.register_blueprint(knowledge_bp, url_prefix='/api/knowledge')
+    app.register_blueprint(health_bp, url_prefix='/api')
+    app.register_blueprint(sessions_bp, url_prefix='/api/sessions')
     
     # Create database tables
     with app.app_context():
@@ -4,6 +4,7 @@ Unit tests for agents API endpoints
 
 import pytest
 import json
+import uuid
 from datetime import datetime
 
 
@@ -169,4 +170,184 @@ class TestAgentsAPI:
             assert len(data) == 2
             # Messages are ordered by timestamp desc, so newest first
             assert data[0]['content'] == 'How are you?'
-            assert data[1]['content'] == 'Hello agent'
\ No newline at end of file
+            assert data[1]['content'] == 'Hello agent'
+    
+    def test_bulk_deploy_agents(self, client, db_session, app):
+        """Test deploying several agents in one request"""
+        with app.app_context():
+            from flask_jwt_extended import create_access_token
+            from models import Agent
+            
+            headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+            agents_data = [
+                {'name': f'Bulk Agent {i}', 'address': f'agent1qbulk{i}', 'agent_type': 'test'}
+                for i in range(3)
+            ]
+            
+            response = client.post(
+                '/api/agents/bulk',
+                data=json.dumps(agents_data),
+                content_type='application/json',
+                headers=headers
+            )
+            assert response.status_code == 201
+            assert json.loads(response.data)['count'] == 3
+            assert Agent.query.count() == 3
+            
+            # Re-posting the same addresses is rejected without inserting anything
+            response = client.post(
+                '/api/agents/bulk',
+                data=json.dumps(agents_data),
+                content_type='application/json',
+                headers=headers
+            )
+            assert response.status_code == 400
+            assert Agent.query.count() == 3
+    
+    def test_bulk_deploy_rejects_oversized_and_mistyped(self, client, db_session, app):
+        """Test the bulk size cap and non-string addresses are 400s, not 500s"""
+        with app.app_context():
+            from flask_jwt_extended import create_access_token
+            from routes.agents import MAX_BULK_AGENTS
+            
+            headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+            oversized = [{'name': f'Agent {i}', 'address': f'agent1q{i}'} for i in range(MAX_BULK_AGENTS + 1)]
+            mistyped = [{'name': 'Agent', 'address': ['agent1qlist']}]
+            
+            for payload in (oversized, mistyped):
+                response = client.post('/api/agents/bulk', json=payload, headers=headers)
+                assert response.status_code == 400
+
+    def test_agents_list_cache_invalidated_on_write(self, client, db_session, auth_headers, app):
+        """Test the cached agent list reflects newly created agents"""
+        with app.app_context():
+            assert json.loads(client.get('/api/agents/').data) == []
+            
+            response = client.post(
+                '/api/agents/',
+                data=json.dumps({
+                    'name': 'Cached Agent',
+                    'address': 'agent1qcached',
+                    'description': 'Cache invalidation test',
+                    'agent_type': 'test'
+                }),
+                content_type='application/json',
+                headers=auth_headers
+            )
+            assert response.status_code == 201
+            
+            data = json.loads(client.get('/api/agents/').data)
+            assert [agent['name'] for agent in data] == ['Cached Agent']
+    
+    def test_agents_cache_invalidated_on_commit_not_flush(self, db_session, app):
+        """Test a flushed agent write only drops the cache once it commits"""
+        with app.app_context():
+            from models import Agent, db
+            from routes.agents import _agents_cache
+            
+            _agents_cache['list'] = []
+            db.session.add(Agent(name='Pending Agent', address='agent1qpending', agent_type='test'))
+            db.session.flush()
+            assert 'list' in _agents_cache
+            db.session.rollback()
+            assert 'list' in _agents_cache
+            
+            db.session.add(Agent(name='Committed Agent', address='agent1qcommitted', agent_type='test'))
+            db.session.commit()
+            assert 'list' not in _agents_cache
+
+    def test_get_agent_status_counts_active_sessions(self, client, db_session, app):
+        """Test agent status reports active session counts per agent"""
+        with app.app_context():
+            from models import Agent, AgentSession, db
+            
+            busy = Agent(name='Busy Agent', address='agent1qbusy', agent_type='test', status='active')
+            idle = Agent(name='Idle Agent', address='agent1qidle', agent_type='test', status='inactive')
+            db.session.add_all([busy, idle])
+            db.session.commit()
+            
+            db.session.add_all([
+                AgentSession(agent_id=busy.id, session_id=uuid.uuid4(), status='active'),
+                AgentSession(agent_id=busy.id, session_id=uuid.uuid4(), status='active'),
+                AgentSession(agent_id=busy.id, session_id=uuid.uuid4(), status='ended')
+            ])
+            db.session.commit()
+            
+            response = client.get('/api/agents/status')
+            assert response.status_code == 200
+            
+            counts = {item['name']: item['active_sessions'] for item in json.loads(response.data)}
+            assert counts == {'Busy Agent': 2, 'Idle Agent': 0}
+
+    def test_connect_and_disconnect_agent(self, client, db_session, app):
+        """Test a session can be opened and closed by its UUID"""
+        with app.app_context():
+            from flask_jwt_extended import create_access_token
+            from models import Agent, db
+            
+            agent = Agent(name='Session Agent', address='agent1qsession', agent_type='test', status='active')
+            db.session.add(agent)
+            db.session.commit()
+            
+            headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+            response = client.post('/api/agents/connect', json={'agent_id': agent.id}, headers=headers)
+            assert response.status_code == 200
+            session_id = json.loads(response.data)['session_id']
+            assert str(uuid.UUID(session_id)) == session_id
+            
+            response = client.post('/api/agents/disconnect', json={'session_id': session_id}, headers=headers)
+            assert response.status_code == 200
+            assert json.loads(response.data)['session_id'] == session_id
+            
+            # Already ended
+            response = client.post('/api/agents/disconnect', json={'session_id': session_id}, headers=headers)
+            assert response.status_code == 404
+            
+            response = client.post('/api/agents/disconnect', json={'session_id': 'not-a-uuid'}, headers=headers)
+            assert response.status_code == 400
+
+    def test_get_agents_filtered_by_type_and_status(self, client, db_session, app):
+        """Test filtering the agent list by type and status"""
+        with app.app_context():
+            from models import Agent, db
+            
+            db.session.add_all([
+                Agent(name='Health On', address='agent1qh1', agent_type='healthcare', status='active'),
+                Agent(name='Health Off', address='agent1qh2', agent_type='healthcare', status='inactive'),
+                Agent(name='Finance On', address='agent1qf1', agent_type='financial', status='active')
+            ])
+            db.session.commit()
+            
+            data = json.loads(client.get('/api/agents/?type=healthcare').data)
+            assert sorted(agent['name'] for agent in data) == ['Health Off', 'Health On']
+            
+            data = json.loads(client.get('/api/agents/?type=healthcare&status=active').data)
+            assert [agent['name'] for agent in data] == ['Health On']
+            
+            data = json.loads(client.get('/api/agents/?status=active').data)
+            assert len(data) == 2
+
+    def test_get_agent_stats(self, client, db_session, app):
+        """Test message and session totals for an agent"""
+        with app.app_context():
+            from models import Agent, AgentSession, Message, db
+            
+            agent = Agent(name='Stats Agent', address='agent1qstats', agent_type='test')
+            db.session.add(agent)
+            db.session.commit()
+            
+            db.session.add_all([
+                Message(content='one', sender_type='user', agent_id=agent.id),
+                Message(content='two', sender_type='agent', agent_id=agent.id),
+                AgentSession(agent_id=agent.id, session_id=uuid.uuid4(), status='ended')
+            ])
+            db.session.commit()
+            
+            response = client.get(f'/api/agents/{agent.id}/stats')
+            assert response.status_code == 200
+            
+            data = json.loads(response.data)
+            assert data['total_messages'] == 2
+            assert data['total_sessions'] == 1
+            
+            assert client.get('/api/agents/99999/stats').status_code == 404
@@ -0,0 +1,187 @@
+"""
+Unit tests for smart contract audit API endpoints
+"""
+
+import pytest
+import json
+from unittest.mock import patch
+from flask import Flask
+
+
+@pytest.fixture
+def audit_client():
+    """Test client with only the audit blueprint registered"""
+    from routes.audit import audit_bp, _audit_report_cache
+    
+    _audit_report_cache.clear()
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(audit_bp, url_prefix='/api/audit')
+    return app.test_client()
+
+
+MOCK_REPORT = {
+    'security_score': 90,
+    'summary': {'total_vulnerabilities': 0},
+    'vulnerabilities': []
+}
+
+
+class TestAuditAPI:
+    """Test audit API endpoints"""
+    
+    def test_get_vulnerabilities(self, audit_client):
+        """Test the vulnerability reference payload"""
+        response = audit_client.get('/api/audit/vulnerabilities')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['total_count'] == len(data['vulnerabilities'])
+        assert 'reentrancy' in data['vulnerabilities']
+        assert response.headers['ETag']
+        assert 'max-age=3600' in response.headers['Cache-Control']
+    
+    def test_static_endpoint_not_modified(self, audit_client):
+        """Test a matching If-None-Match gets an empty 304"""
+        etag = audit_client.get('/api/audit/tools').headers['ETag']
+        
+        response = audit_client.get('/api/audit/tools', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+    
+    def test_static_endpoint_etag_mismatch(self, audit_client):
+        """Test a stale If-None-Match gets the full body"""
+        response = audit_client.get('/api/audit/tools', headers={'If-None-Match': '"stale"'})
+        
+        assert response.status_code == 200
+        assert json.loads(response.data)['total_tools'] > 0
+    
+    @patch('routes.audit.contract_auditor')
+    def test_audit_small_contract_inline(self, mock_auditor, audit_client):
+        """Test short contracts are audited within the request"""
+        mock_auditor.validate_contract_code.return_value = (True, [])
+        mock_auditor.audit_contract.return_value = MOCK_REPORT
+        
+        response = audit_client.post('/api/audit/contract', json={
+            'contract_code': 'contract Token { uint256 supply; }',
+            'language': 'solidity'
+        })
+        
+        assert response.status_code == 200
+        assert json.loads(response.data)['audit_report'] == MOCK_REPORT
+    
+    @patch('routes.audit.contract_auditor')
+    def test_audit_large_contract_in_background(self, mock_auditor, audit_client):
+        """Test long contracts return a job id that can be polled for the report"""
+        from routes.audit import ASYNC_AUDIT_THRESHOLD, _audit_jobs
+        mock_auditor.validate_contract_code.return_value = (True, [])
+        mock_auditor.audit_contract.return_value = MOCK_REPORT
+        code = 'contract Token { ' + 'uint256 supply; ' * (ASYNC_AUDIT_THRESHOLD // 10) + '}'
+        
+        response = audit_client.post('/api/audit/contract', json={'contract_code': code, 'language': 'solidity'})
+        
+        assert response.status_code == 202
+        job_id = json.loads(response.data)['job_id']
+        _audit_jobs[job_id].result(timeout=5)
+        
+        response = audit_client.get(f'/api/audit/contract/result/{job_id}')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['status'] == 'completed'
+        assert data['audit_report'] == MOCK_REPORT
+    
+    def test_audit_result_unknown_job(self, audit_client):
+        """Test polling an unknown job id"""
+        response = audit_client.get('/api/audit/contract/result/missing')
+        
+        assert response.status_code == 404
+    
+    @patch('routes.audit.contract_auditor')
+    def test_audit_batch_partial_failure(self, mock_auditor, audit_client):
+        """Test batch results keep request order and report bad items individually"""
+        mock_auditor.supported_languages = ['solidity', 'vyper', 'rust']
+        mock_auditor.validate_contract_code.return_value = (True, [])
+        mock_auditor.audit_contract.return_value = MOCK_REPORT
+        
+        response = audit_client.post('/api/audit/contract/batch', json={'contracts': [
+            {'contract_code': 'contract A { uint256 a; }', 'language': 'solidity'},
+            {'contract_code': 'contract B { uint256 b; }', 'language': 'cobol'},
+            {'contract_code': 'contract C { uint256 c; }', 'language': 'vyper'}
+        ]})
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [r['status'] for r in data['results']] == ['completed', 'invalid', 'completed']
+        assert [r['index'] for r in data['results']] == [0, 1, 2]
+        assert data['completed'] == 2
+    
+    def test_audit_batch_rejects_oversized(self, audit_client):
+        """Test the batch size cap"""
+        from routes.audit import MAX_BATCH_AUDITS
+        contracts = [{'contract_code': 'contract A {}', 'language': 'solidity'}] * (MAX_BATCH_AUDITS + 1)
+        
+        response = audit_client.post('/api/audit/contract/batch', json={'contracts': contracts})
+        
+        assert response.status_code == 400
+    
+    def test_audit_batch_rejects_non_object_body(self, audit_client):
+        """Test a JSON array body is a 400, not a 500"""
+        response = audit_client.post('/api/audit/contract/batch', json=[{'contracts': []}])
+        
+        assert response.status_code == 400
+    
+    @patch('routes.audit.contract_auditor')
+    def test_audit_batch_uses_own_bounded_pool(self, mock_auditor, audit_client):
+        """Test batches stay off the async audit pool and are refused once its queue is full"""
+        from routes import audit
+        mock_auditor.supported_languages = ['solidity']
+        mock_auditor.validate_contract_code.return_value = (True, [])
+        mock_auditor.audit_contract.return_value = MOCK_REPORT
+        contracts = [{'contract_code': 'contract A { uint256 a; }', 'language': 'solidity'}]
+        
+        with patch.object(audit, '_audit_executor') as async_pool:
+            response = audit_client.post('/api/audit/contract/batch', json={'contracts': contracts})
+            assert json.loads(response.data)['completed'] == 1
+            async_pool.submit.assert_not_called()
+        
+        with patch.object(audit, '_pending_batch_audits', audit.MAX_PENDING_BATCH_AUDITS):
+            response = audit_client.post('/api/audit/contract/batch', json={'contracts': contracts})
+            assert response.status_code == 503
+    
+    def test_validate_rejects_unknown_language(self, audit_client):
+        """Test the language field is checked against the allowed choices"""
+        response = audit_client.post('/api/audit/validate', json={
+            'contract_code': 'contract Token { uint256 supply; }',
+            'language': 'cobol'
+        })
+        
+        assert response.status_code == 400
+        assert 'must be one of' in json.loads(response.data)['error']
+    
+    @patch('routes.audit.contract_auditor')
+    def test_audit_reuses_report_for_same_code(self, mock_auditor, audit_client):
+        """Test an identical resubmission is served from the report cache"""
+        mock_auditor.validate_contract_code.return_value = (True, [])
+        mock_auditor.audit_contract.return_value = MOCK_REPORT
+        payload = {'contract_code': 'contract Token { uint256 supply; }', 'language': 'solidity'}
+        
+        first = audit_client.post('/api/audit/contract', json=payload)
+        second = audit_client.post('/api/audit/contract', json=payload)
+        
+        assert first.status_code == second.status_code == 200
+        assert json.loads(second.data)['audit_report'] == MOCK_REPORT
+        mock_auditor.audit_contract.assert_called_once()
+    
+    def test_static_endpoint_gzip(self, audit_client):
+        """Test clients accepting gzip get the precompressed body"""
+        import gzip
+        plain = audit_client.get('/api/audit/vulnerabilities')
+        
+        response = audit_client.get('/api/audit/vulnerabilities', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data) == plain.data
+        assert response.headers['ETag'] != plain.headers['ETag']
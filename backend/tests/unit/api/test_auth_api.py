@@ -0,0 +1,157 @@
+"""
+Unit tests for authentication API endpoints
+"""
+
+import pytest
+import json
+from unittest.mock import patch
+
+
+class TestAuthAPI:
+    """Test authentication API endpoints"""
+    
+    def _create_user(self, app, username='alice', password='Str0ng!pass', is_active=True):
+        from models import User, db
+        from routes.auth import hash_password
+        
+        with app.app_context():
+            user = User(
+                username=username,
+                email=f'{username}@example.com',
+                password_hash=hash_password(password),
+                is_active=is_active
+            )
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+    
+    def test_login_success(self, client, db_session, app):
+        """Test login with valid credentials"""
+        self._create_user(app)
+        
+        response = client.post('/api/auth/login', json={'username': 'alice', 'password': 'Str0ng!pass'})
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['username'] == 'alice'
+        assert 'access_token' in data
+    
+    def test_login_unknown_user_still_hashes(self, client, db_session):
+        """Test a missing account runs one bcrypt check like a wrong password"""
+        with patch('routes.auth.bcrypt.checkpw', return_value=False) as checkpw:
+            response = client.post('/api/auth/login', json={'username': 'nobody', 'password': 'whatever'})
+        
+        assert response.status_code == 401
+        checkpw.assert_called_once()
+    
+    def test_login_wrong_password(self, client, db_session, app):
+        """Test login with a wrong password"""
+        self._create_user(app)
+        
+        response = client.post('/api/auth/login', json={'username': 'alice', 'password': 'wrong'})
+        
+        assert response.status_code == 401
+    
+    def test_login_rehashes_old_work_factor(self, client, db_session, app):
+        """Test a hash made with a different cost is upgraded on login"""
+        import bcrypt
+        from models import User, db
+        from routes.auth import BCRYPT_ROUNDS
+        
+        user_id = self._create_user(app)
+        with app.app_context():
+            user = db.session.get(User, user_id)
+            user.password_hash = bcrypt.hashpw(b'Str0ng!pass', bcrypt.gensalt(rounds=BCRYPT_ROUNDS + 1))
+            db.session.commit()
+        
+        response = client.post('/api/auth/login', json={'username': 'alice', 'password': 'Str0ng!pass'})
+        
+        assert response.status_code == 200
+        with app.app_context():
+            assert db.session.get(User, user_id).password_hash.split(b'$')[2] == b'%02d' % BCRYPT_ROUNDS
+    
+    @pytest.mark.parametrize('password,valid', [
+        ('Str0ng!pass', True),
+        ('short!1A', True),
+        ('Sh0rt!', False),
+        ('str0ng!pass', False),
+        ('STR0NG!PASS', False),
+        ('Strong!pass', False),
+        ('Str0ngpass', False),
+        ('Str0ng!pässwörd', True),
+        ('ÄÖÜ0!pässwörd', False),
+    ])
+    def test_validate_password(self, password, valid):
+        """Test each password strength rule"""
+        from routes.auth import validate_password
+        
+        assert validate_password(password)[0] is valid
+    
+    def test_login_with_email(self, client, db_session, app):
+        """Test login accepts the email address as identifier"""
+        self._create_user(app)
+        
+        response = client.post('/api/auth/login', json={'username': 'alice@example.com', 'password': 'Str0ng!pass'})
+        
+        assert response.status_code == 200
+        assert json.loads(response.data)['username'] == 'alice'
+    
+    def test_register_duplicate_username_and_email(self, client, db_session, app):
+        """Test register reports which unique field is taken"""
+        self._create_user(app)
+        payload = {'username': 'alice', 'email': 'new@example.com', 'password': 'Str0ng!pass'}
+        
+        response = client.post('/api/auth/register', json=payload)
+        assert response.status_code == 400
+        assert 'Username' in json.loads(response.data)['error']
+        
+        payload.update(username='bob', email='alice@example.com')
+        response = client.post('/api/auth/register', json=payload)
+        assert response.status_code == 400
+        assert 'Email' in json.loads(response.data)['error']
+    
+    def test_update_password(self, client, db_session, app):
+        """Test changing the password checks the current one and stores the new hash"""
+        from flask_jwt_extended import create_access_token
+        user_id = self._create_user(app)
+        with app.app_context():
+            headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+        
+        response = client.post('/api/auth/update-password', headers=headers,
+                               json={'currentPassword': 'wrong', 'newPassword': 'N3w!password'})
+        assert response.status_code == 401
+        
+        response = client.post('/api/auth/update-password', headers=headers,
+                               json={'currentPassword': 'Str0ng!pass', 'newPassword': 'N3w!password'})
+        assert response.status_code == 200
+        
+        response = client.post('/api/auth/login', json={'username': 'alice', 'password': 'N3w!password'})
+        assert response.status_code == 200
+    
+    def test_refresh_token(self, client, db_session, app):
+        """Test refreshing a valid token for an active user"""
+        from flask_jwt_extended import create_access_token
+        user_id = self._create_user(app)
+        with app.app_context():
+            headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+        
+        response = client.post('/api/auth/refresh', headers=headers)
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['user_id'] == user_id
+        assert data['access_token']
+    
+    def test_get_profile(self, client, db_session, app):
+        """Test the profile of the token's user is returned"""
+        from flask_jwt_extended import create_access_token
+        user_id = self._create_user(app)
+        with app.app_context():
+            headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+        
+        response = client.get('/api/auth/profile', headers=headers)
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['id'] == user_id
+        assert data['username'] == 'alice'
@@ -0,0 +1,263 @@
+"""
+Unit tests for health check API endpoints
+"""
+
+import pytest
+import json
+from unittest.mock import patch
+from flask import Flask
+
+
+@pytest.fixture
+def health_client():
+    """Test client with only the health blueprint registered"""
+    from routes.health import health_bp, _health_cache
+
+    _health_cache.clear()
+    app = Flask(__name__)
+    app.config['TESTING'] = True
+    app.register_blueprint(health_bp, url_prefix='/api')
+    return app.test_client()
+
+
+class TestHealthAPI:
+    """Test health API endpoints"""
+
+    def test_health_snapshot_reused_within_ttl(self, health_client):
+        """Test repeated polls within the TTL run the checks once"""
+        payload = {'status': 'healthy', 'services': {}}
+        with patch('routes.health._compute_health', return_value=(payload, 200)) as compute:
+            first = health_client.get('/api/health')
+            second = health_client.get('/api/health')
+
+        assert compute.call_count == 1
+        assert first.status_code == second.status_code == 200
+        assert json.loads(second.data) == payload
+
+    def test_health_snapshot_keeps_status(self, health_client):
+        """Test a cached unhealthy snapshot is still served as 503"""
+        payload = {'status': 'unhealthy', 'services': {}}
+        with patch('routes.health._compute_health', return_value=(payload, 503)):
+            health_client.get('/api/health')
+            response = health_client.get('/api/health')
+
+        assert response.status_code == 503
+        assert json.loads(response.data)['status'] == 'unhealthy'
+
+    def test_health_snapshot_refreshed_after_ttl(self, health_client):
+        """Test an expired snapshot is recomputed"""
+        with patch('routes.health.HEALTH_CACHE_TTL', 0), \
+             patch('routes.health._compute_health', return_value=({'status': 'healthy'}, 200)) as compute:
+            health_client.get('/api/health')
+            health_client.get('/api/health')
+
+        assert compute.call_count == 2
+
+    def test_liveness_constant_body(self, health_client):
+        """Test liveness answers with the fixed body"""
+        response = health_client.get('/api/health/live')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.data) == {'status': 'alive'}
+
+    def test_health_skips_table_counts(self, health_client):
+        """Test /health reports connectivity only, not row counts"""
+        with patch('routes.health._ping_database') as ping, \
+             patch('routes.health._redis_client'), \
+             patch('routes.health._metta_session'), \
+             patch('routes.health.psutil'):
+            response = health_client.get('/api/health')
+
+        services = json.loads(response.data)['services']
+        assert 'application' not in services
+        ping.assert_called_once()
+
+    def test_metrics_counts_tables(self, client, db_session):
+        """Test /health/metrics reports per-table counts"""
+        from routes.health import _health_cache
+        from models import Agent
+
+        _health_cache.clear()
+        db_session.session.add(Agent(name='Test Agent', address='agent1test', agent_type='healthcare', status='active'))
+        db_session.session.commit()
+
+        with patch('routes.health.monitor.get_system_metrics', return_value={}):
+            response = client.get('/api/health/metrics')
+
+        assert response.status_code == 200
+        application = json.loads(response.data)['application']
+        assert application['total_agents'] == 1
+        assert application['active_agents'] == 1
+        assert application['total_users'] == 0
+
+    def test_ready_uses_health_engine(self, client):
+        """Test readiness pings the database through the probe engine"""
+        with patch('routes.health._redis_client'):
+            response = client.get('/api/health/ready')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['status'] == 'ready'
+
+    def test_hung_probe_times_out(self, health_client):
+        """Test a probe past the deadline is reported without blocking the rest"""
+        import time
+
+        def hung():
+            time.sleep(0.5)
+            return {'status': 'healthy'}, True
+
+        probes = {'fast': lambda: ({'status': 'healthy'}, True), 'hung': hung}
+        with patch.dict('routes.health.HEALTH_PROBES', probes, clear=True), \
+             patch('routes.health.HEALTH_PROBE_TIMEOUT', 0.1):
+            response = health_client.get('/api/health')
+
+        assert response.status_code == 503
+        services = json.loads(response.data)['services']
+        assert services['fast']['status'] == 'healthy'
+        assert 'Timed out' in services['hung']['error']
+
+    def test_slow_metta_probe_only_degrades(self, health_client):
+        """Test a non-critical probe past the deadline is degraded, not a 503"""
+        import time
+
+        def hung():
+            time.sleep(0.5)
+            return {'status': 'healthy'}, True
+
+        probes = {'database': lambda: ({'status': 'healthy'}, True), 'metta_kg': hung}
+        with patch.dict('routes.health.HEALTH_PROBES', probes, clear=True), \
+             patch('routes.health.HEALTH_PROBE_TIMEOUT', 0.1):
+            response = health_client.get('/api/health')
+
+        assert response.status_code == 200
+        services = json.loads(response.data)['services']
+        assert services['metta_kg']['status'] == 'degraded'
+        assert 'Timed out' in services['metta_kg']['error']
+
+    def test_probe_timeouts_fit_the_budget(self):
+        """Test the MeTTa HEAD plus GET fallback cannot outlast the overall deadline"""
+        import routes.health as health
+
+        assert 2 * sum(health.METTA_REQUEST_TIMEOUT) < health.HEALTH_PROBE_TIMEOUT
+
+    def test_redis_ping_throttled(self):
+        """Test a recent successful PING is reused and a failure forces a re-probe"""
+        import routes.health as health
+
+        with patch.object(health, '_redis_last_ok', 0.0), \
+             patch.object(health, '_redis_client') as redis_client:
+            health._ping_redis()
+            health._ping_redis()
+            assert redis_client.ping.call_count == 1
+
+            health._redis_last_ok = 0.0
+            redis_client.ping.side_effect = ConnectionError('down')
+            with pytest.raises(ConnectionError):
+                health._ping_redis()
+            assert health._redis_last_ok == 0.0
+
+    def test_portfolio_data_splices_wallet(self, client, auth_headers):
+        """Test the pre-encoded portfolio body carries the escaped wallet"""
+        response = client.get('/api/portfolio-data?wallet=0xabc"def', headers=auth_headers)
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['walletAddress'] == '0xabc"def'
+        assert len(data['defiPositions']) == 3
+
+    def test_metta_probe_falls_back_to_get(self):
+        """Test a server rejecting HEAD is probed with GET from then on"""
+        from datetime import timedelta
+        from unittest.mock import MagicMock
+        import routes.health as health
+
+        with patch.object(health, '_metta_probe_method', 'HEAD'), \
+             patch.object(health, '_metta_last_good', None), \
+             patch.object(health, 'METTA_PROBE_TTL', 0), \
+             patch.object(health, '_metta_session') as session:
+            session.head.return_value = MagicMock(status_code=405)
+            session.get.return_value = MagicMock(status_code=200, elapsed=timedelta(milliseconds=5))
+            details, _ = health._check_metta()
+            health._check_metta()
+
+            assert details['status'] == 'healthy'
+            assert session.head.call_count == 1
+            assert session.get.call_count == 2
+
+    def test_metrics_serves_stale_on_error(self, health_client):
+        """Test a failed metrics refresh falls back to the last good snapshot"""
+        results = [({'application': {'total_users': 3}}, 200), ({'error': 'Failed to retrieve metrics'}, 500)]
+        with patch('routes.health.METRICS_CACHE_TTL', 0), \
+             patch('routes.health._compute_metrics', side_effect=results):
+            health_client.get('/api/health/metrics')
+            response = health_client.get('/api/health/metrics')
+
+        assert response.status_code == 200
+        assert response.headers['X-Cache'] == 'STALE'
+        assert json.loads(response.data)['application']['total_users'] == 3
+
+    def test_refresh_locks_are_per_key_and_non_blocking(self, health_client):
+        """Test a running metrics refresh never blocks /health, and a busy refresh serves the old snapshot"""
+        from threading import Lock
+        from routes import health
+
+        payload = {'status': 'healthy', 'services': {}}
+        metrics_lock, health_lock = Lock(), Lock()
+        with patch.dict(health._health_cache_locks, {'metrics': metrics_lock, 'health': health_lock}), \
+             patch('routes.health._compute_health', return_value=(payload, 200)) as compute:
+            with metrics_lock:
+                assert health_client.get('/api/health').status_code == 200
+            assert compute.call_count == 1
+
+            # Expired, but another request is already refreshing it
+            with patch('routes.health.HEALTH_CACHE_TTL', 0), health_lock:
+                response = health_client.get('/api/health')
+            assert response.status_code == 200
+            assert json.loads(response.data) == payload
+            assert compute.call_count == 1
+
+    def test_metrics_stale_snapshot_expires(self, health_client):
+        """Test the last good snapshot is not served past the stale limit"""
+        results = [({'application': {'total_users': 3}}, 200)] + [({'error': 'Failed to retrieve metrics'}, 500)] * 2
+        with patch('routes.health.METRICS_CACHE_TTL', 0), \
+             patch('routes.health._compute_metrics', side_effect=results):
+            health_client.get('/api/health/metrics')
+            assert health_client.get('/api/health/metrics').status_code == 200
+            with patch('routes.health.HEALTH_STALE_LIMIT', 0):
+                response = health_client.get('/api/health/metrics')
+
+        assert response.status_code == 500
+        assert 'X-Cache' not in response.headers
+
+    def test_metta_probe_stale_if_error(self):
+        """Test a failing MeTTa probe reuses the last good result while it is recent"""
+        from datetime import timedelta
+        from unittest.mock import MagicMock
+        import routes.health as health
+
+        with patch.object(health, '_metta_probe_method', 'HEAD'), \
+             patch.object(health, '_metta_last_good', None), \
+             patch.object(health, '_metta_session') as session:
+            session.head.return_value = MagicMock(status_code=200, elapsed=timedelta(milliseconds=5))
+            health._check_metta()
+            cached, _ = health._check_metta()
+            assert session.head.call_count == 1
+            assert 'stale' not in cached
+
+            session.head.side_effect = ConnectionError('refused')
+            with patch.object(health, 'METTA_PROBE_TTL', 0):
+                stale, _ = health._check_metta()
+                assert stale['status'] == 'healthy' and stale['stale'] is True
+
+                with patch.object(health, 'METTA_STALE_LIMIT', 0):
+                    failed, _ = health._check_metta()
+                    assert failed['status'] == 'unhealthy'
+
+    def test_estimated_counts_scoped_to_current_schema(self):
+        """Test the statistics lookup ignores same-named tables in other schemas"""
+        from sqlalchemy.dialects import postgresql
+        from routes import health
+
+        sql = str(health._METRIC_COUNTS_ESTIMATED.compile(dialect=postgresql.dialect()))
+        assert sql.count('pg_stat_user_tables.schemaname = current_schema()') == sql.count('FROM pg_stat_user_tables')
@@ -0,0 +1,167 @@
+"""
+Unit tests for knowledge API endpoints
+"""
+
+import pytest
+import json
+from unittest.mock import patch
+
+
+@pytest.fixture
+def kg():
+    """Mocked MeTTa knowledge graph with an empty result cache"""
+    from routes.knowledge import _knowledge_cache
+
+    _knowledge_cache.clear()
+    with patch('routes.knowledge.knowledge_graph') as mock_kg:
+        mock_kg.semantic_search.return_value = [{'concept': 'diabetes'}]
+        mock_kg.query.return_value = {'result': 'mock'}
+        yield mock_kg
+    _knowledge_cache.clear()
+
+
+class TestKnowledgeAPI:
+    """Test knowledge API endpoints"""
+
+    def test_search_reuses_recent_result(self, client, db_session, auth_headers, kg):
+        """Test an identical search within the TTL skips the graph"""
+        first = client.get('/api/knowledge/search?q=diabetes', headers=auth_headers)
+        second = client.get('/api/knowledge/search?q=diabetes', headers=auth_headers)
+
+        assert first.status_code == second.status_code == 200
+        assert json.loads(second.data)['count'] == 1
+        assert kg.semantic_search.call_count == 1
+
+    def test_fresh_bypasses_cache(self, client, db_session, auth_headers, kg):
+        """Test ?fresh=1 recomputes the result"""
+        client.get('/api/knowledge/search?q=diabetes', headers=auth_headers)
+        client.get('/api/knowledge/search?q=diabetes&fresh=1', headers=auth_headers)
+
+        assert kg.semantic_search.call_count == 2
+
+    def test_write_invalidates_cache(self, client, db_session, auth_headers, kg):
+        """Test adding a concept drops cached query results"""
+        client.post('/api/knowledge/query', json={'query': 'insulin'}, headers=auth_headers)
+        client.post('/api/knowledge/concept', json={'concept': 'insulin'}, headers=auth_headers)
+        response = client.post('/api/knowledge/query', json={'query': 'insulin'}, headers=auth_headers)
+
+        assert kg.query.call_count == 2
+        assert json.loads(response.data)['local_results'][0]['concept'] == 'insulin'
+
+    def test_get_concept_combines_sources(self, client, db_session, auth_headers, kg):
+        """Test the concurrent MeTTa calls and local lookup all land in the response"""
+        kg.query_concept.return_value = {'name': 'insulin'}
+        kg.find_relationships.return_value = [{'type': 'treats'}]
+
+        response = client.get('/api/knowledge/concept/insulin', headers=auth_headers)
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['metta_data'] == {'name': 'insulin'}
+        assert data['relationships'] == [{'type': 'treats'}]
+        assert data['local_data'] is None
+
+    def test_postgres_search_adds_full_text_match(self):
+        """Test PostgreSQL lookups OR a tsvector match onto the substring match"""
+        from sqlalchemy.dialects import postgresql
+        from routes.knowledge import _knowledge_search_filter
+
+        sql = str(_knowledge_search_filter('insulin', 'postgresql').compile(dialect=postgresql.dialect()))
+        assert 'LIKE' in sql
+        assert "to_tsvector('english', knowledge_graph.concept || ' ' || coalesce(knowledge_graph.definition, ''))" in sql
+        assert "@@ websearch_to_tsquery('english'" in sql
+
+        assert '@@' not in str(_knowledge_search_filter('insulin', 'sqlite'))
+
+    def test_concepts_per_page_capped(self, client, db_session):
+        """Test an oversized per_page is clamped to the maximum"""
+        from routes.knowledge import MAX_CONCEPTS_PER_PAGE
+
+        response = client.get('/api/knowledge/concepts?per_page=100000')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['pagination']['per_page'] == MAX_CONCEPTS_PER_PAGE
+
+    def test_bulk_add_commits_once_and_queues_metta(self, client, db_session, auth_headers, kg):
+        """Test bulk concepts land in one commit and reach MeTTa off the request path"""
+        from models import db
+
+        concepts = [{'concept': f'concept {i}', 'definition': 'd'} for i in range(3)]
+        with patch('routes.knowledge._bulk_sync_executor') as executor, \
+                patch('routes.knowledge._kg_executor') as query_executor, \
+                patch.object(db.session, 'commit', wraps=db.session.commit) as commit:
+            response = client.post('/api/knowledge/concepts/bulk', json={'concepts': concepts}, headers=auth_headers)
+
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert data['count'] == 3 and len(set(data['local_ids'])) == 3
+        assert commit.call_count == 1
+        # One batch job on the bulk worker, nothing on the interactive query pool
+        assert executor.submit.call_count == 1 and query_executor.submit.call_count == 0
+        job, batch = executor.submit.call_args.args
+        assert [concept for concept, _ in batch] == ['concept 0', 'concept 1', 'concept 2']
+        job(batch)
+        assert [call.args[0] for call in kg.add_concept.call_args_list] == ['concept 0', 'concept 1', 'concept 2']
+
+    def test_bulk_add_bounded(self, client, db_session, auth_headers, kg):
+        """Test a bulk import is refused while the sync queue is full"""
+        from threading import BoundedSemaphore
+
+        with patch('routes.knowledge._bulk_sync_slots', BoundedSemaphore(0)), \
+                patch('routes.knowledge._bulk_sync_executor') as executor:
+            response = client.post('/api/knowledge/concepts/bulk', json={'concepts': [{'concept': 'x'}]},
+                                   headers=auth_headers)
+
+        assert response.status_code == 503
+        assert executor.submit.call_count == 0
+
+    def test_bulk_add_rejects_missing_concept(self, client, db_session, auth_headers, kg):
+        """Test items without a concept are reported by index"""
+        response = client.post('/api/knowledge/concepts/bulk',
+                               json={'concepts': [{'concept': 'ok'}, {'definition': 'no name'}]},
+                               headers=auth_headers)
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['invalid_indexes'] == [1]
+
+    def test_bulk_add_applies_concept_schema(self, client, db_session, auth_headers, kg):
+        """Test bulk rows get the single add_concept rules: types and column lengths"""
+        from routes.knowledge import _bulk_sync_slots
+
+        with patch.object(_bulk_sync_slots, 'acquire') as acquire:
+            response = client.post('/api/knowledge/concepts/bulk', json={'concepts': [
+                {'concept': 'ok'},
+                {'concept': 42},
+                {'concept': 'x' * 201},
+                {'concept': 'ok', 'domain': 'd' * 101},
+                {'concept': 'ok', 'source': 's' * 101}
+            ]}, headers=auth_headers)
+
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['invalid_indexes'] == [1, 2, 3, 4]
+        assert data['details']['1'] == "Field 'concept' must be of type str"
+        acquire.assert_not_called()
+
+    def test_add_concept_validates_payload(self, client, db_session, auth_headers, kg):
+        """Test schema validation rejects missing and mistyped fields before any write"""
+        missing = client.post('/api/knowledge/concept', json={'definition': 'no name'}, headers=auth_headers)
+        mistyped = client.post('/api/knowledge/concept', json={'concept': 'x', 'relationships': []}, headers=auth_headers)
+        not_object = client.post('/api/knowledge/relationships', json=['a', 'b'], headers=auth_headers)
+
+        assert missing.status_code == mistyped.status_code == not_object.status_code == 400
+        assert json.loads(missing.data)['error'] == "Required field 'concept' is missing"
+        assert kg.add_concept.call_count == 0
+
+    def test_metta_client_session_per_thread(self):
+        """Test pool threads never share one requests.Session"""
+        from concurrent.futures import ThreadPoolExecutor
+        from knowledge.metta_kg.integration import MeTTaKnowledgeGraph
+
+        client = MeTTaKnowledgeGraph()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            other = pool.submit(lambda: client.session).result()
+
+        assert client.session is client.session
+        assert client.session is not other
+        assert other.headers['Content-Type'] == 'application/json'
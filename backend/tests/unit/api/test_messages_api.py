@@ -0,0 +1,189 @@
+"""
+Unit tests for messages API endpoints
+"""
+
+import pytest
+import json
+from unittest.mock import patch
+
+
+class TestMessagesAPI:
+    """Test messages API endpoints"""
+
+    def test_agent_response_context_oldest_first(self, app, db_session, mock_agent):
+        """Test the last five messages reach the AI layer in chronological order"""
+        from models import Agent, Message, db
+        from routes.messages import generate_agent_response
+
+        with app.app_context():
+            agent = Agent(name=mock_agent['name'], address=mock_agent['address'], agent_type='healthcare')
+            db.session.add(agent)
+            db.session.commit()
+            db.session.add_all([
+                Message(content=f'message {i}', sender_type='user', agent_id=agent.id) for i in range(7)
+            ])
+            db.session.commit()
+
+            with patch('routes.messages.ai_intelligence') as ai:
+                ai.generate_response.return_value = 'reply'
+                assert generate_agent_response(agent, 'hello') == 'reply'
+
+            agent_type, _, context = ai.generate_response.call_args.args
+            assert agent_type == 'healthcare'
+            assert [m['content'] for m in context['recent_messages']] == [f'message {i}' for i in range(2, 7)]
+
+    def test_agent_type_read_from_column(self, app, db_session):
+        """Test the prompt set comes from Agent.agent_type, not the agent's name"""
+        from models import Agent, db
+        from routes.messages import generate_agent_response
+
+        with app.app_context():
+            agent = Agent(name='Finance Agent', address='0xfinance', agent_type='finance')
+            db.session.add(agent)
+            db.session.commit()
+
+            with patch('routes.messages.ai_intelligence') as ai:
+                ai.generate_response.return_value = 'reply'
+                generate_agent_response(agent, 'hello')
+
+            assert ai.generate_response.call_args.args[0] == 'financial'
+
+    def test_agent_prompt_formats_context_datetimes(self):
+        """Test raw datetimes in the context reach the prompt as ISO 8601"""
+        from datetime import datetime
+        from utils.ai_intelligence import AIAgentIntelligence
+
+        prompt = AIAgentIntelligence()._build_agent_prompt('healthcare', 'hello', {
+            'recent_messages': [{'content': 'hi', 'sender_type': 'user', 'timestamp': datetime(2024, 1, 2, 3, 4, 5)}]
+        })
+
+        assert '"timestamp": "2024-01-02T03:04:05"' in prompt
+
+    def test_send_message_commits_user_side_first(self, app, client, db_session, auth_headers, mock_agent):
+        """Test the user message is committed before generation and kept if generation fails"""
+        from models import Agent, Message, db
+
+        with app.app_context():
+            agent = Agent(name=mock_agent['name'], address=mock_agent['address'], agent_type='healthcare')
+            db.session.add(agent)
+            db.session.commit()
+            agent_id = agent.id
+
+        def generate(*args):
+            # No transaction is open while the model runs, and the user's message is durable
+            assert not db.session.in_transaction()
+            assert Message.query.filter_by(agent_id=agent_id, sender_type='user').count() == 1
+            return 'reply'
+
+        with patch('routes.messages.ai_intelligence') as ai:
+            ai.generate_response.side_effect = generate
+            ai.analyze_sentiment.return_value = {'sentiment': 'neutral'}
+            ai.extract_intent.return_value = {'primary_intent': 'question'}
+            response = client.post('/api/messages/', json={'content': 'hello', 'agent_id': agent_id}, headers=auth_headers)
+
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        with app.app_context():
+            stored = {m.id: m.sender_type for m in Message.query.filter_by(agent_id=agent_id)}
+        assert stored == {data['user_message_id']: 'user', data['agent_response_id']: 'agent'}
+
+        with patch('routes.messages._build_agent_reply', side_effect=RuntimeError('model down')):
+            with pytest.raises(RuntimeError):
+                client.post('/api/messages/', json={'content': 'again', 'agent_id': agent_id}, headers=auth_headers)
+        with app.app_context():
+            assert Message.query.filter_by(agent_id=agent_id, content='again').count() == 1
+
+    def test_repeated_question_answered_from_cache(self, app, client, db_session, auth_headers, mock_agent):
+        """Test asking the same question twice in a conversation calls the model once"""
+        from models import Agent, db
+        from routes.messages import ai_intelligence
+
+        with app.app_context():
+            agent = Agent(name=mock_agent['name'], address=mock_agent['address'], agent_type='healthcare')
+            db.session.add(agent)
+            db.session.commit()
+            agent_id = agent.id
+
+        ai_intelligence.response_cache.clear()
+        question = {'content': 'What are the symptoms of influenza?', 'agent_id': agent_id}
+        with patch.object(ai_intelligence, '_call_ai_model', return_value='Fever and cough') as call:
+            first = client.post('/api/messages/', json=question, headers=auth_headers)
+            second = client.post('/api/messages/', json=question, headers=auth_headers)
+
+        assert first.status_code == second.status_code == 201
+        assert call.call_count == 1
+
+    def test_async_send_replies_over_socket(self, app, client, db_session, auth_headers, mock_agent):
+        """Test ?async=1 answers 202 at once and the reply is stored and emitted later"""
+        from unittest.mock import MagicMock
+        from models import Agent, Message, db
+        from routes.messages import _reply_in_background
+
+        with app.app_context():
+            agent = Agent(name=mock_agent['name'], address=mock_agent['address'], agent_type='healthcare')
+            db.session.add(agent)
+            db.session.commit()
+            agent_id = agent.id
+
+        with patch('routes.messages._reply_executor') as executor:
+            response = client.post('/api/messages/?async=1', json={'content': 'hello', 'agent_id': agent_id},
+                                   headers=auth_headers)
+
+        assert response.status_code == 202
+        data = json.loads(response.data)
+        assert data['status'] == 'pending' and data['agent_response_id'] is None
+
+        # Run the queued job inline with a stand-in Socket.IO server
+        socketio = MagicMock()
+        with patch.dict(app.extensions, {'socketio': socketio}), \
+                patch('routes.messages.ai_intelligence') as ai:
+            ai.generate_response.return_value = 'reply'
+            ai.analyze_sentiment.return_value = {'sentiment': 'neutral'}
+            ai.extract_intent.return_value = {'primary_intent': 'question'}
+            _reply_in_background(*executor.submit.call_args.args[1:])
+
+        event, payload = socketio.emit.call_args.args
+        assert event == 'agent_response'
+        assert socketio.emit.call_args.kwargs['room'] == 'user_test-user'
+        assert payload['message'] == 'reply'
+        assert payload['user_message_id'] == data['user_message_id']
+        with app.app_context():
+            assert db.session.get(Message, payload['agent_response_id']).sender_type == 'agent'
+
+    def test_conversation_streams_with_keyset_resume(self, app, client, db_session, auth_headers, mock_agent):
+        """Test the history streams oldest-first and ?after/&limit page by message id"""
+        from models import Agent, Message, db
+
+        with app.app_context():
+            agent = Agent(name=mock_agent['name'], address=mock_agent['address'], agent_type='healthcare')
+            db.session.add(agent)
+            db.session.commit()
+            db.session.add_all([
+                Message(content=f'message {i}', sender_type='user', agent_id=agent.id, user_id='test-user')
+                for i in range(5)
+            ])
+            db.session.commit()
+            agent_id = agent.id
+
+        full = json.loads(client.get(f'/api/messages/conversation/{agent_id}', headers=auth_headers).data)
+        assert [m['content'] for m in full] == [f'message {i}' for i in range(5)]
+
+        page = json.loads(client.get(
+            f'/api/messages/conversation/{agent_id}?after={full[1]["id"]}&limit=2', headers=auth_headers
+        ).data)
+        assert [m['content'] for m in page] == ['message 2', 'message 3']
+
+    def test_conversation_rejects_bad_limit(self, client, db_session, auth_headers):
+        """Test a malformed or non-positive ?limit/?after is a 400 before streaming starts"""
+        for query in ('limit=-1', 'limit=0', 'limit=abc', 'after=x'):
+            response = client.get(f'/api/messages/conversation/1?{query}', headers=auth_headers)
+            assert response.status_code == 400, query
+            assert 'error' in json.loads(response.data)
+
+    def test_send_message_validates_payload(self, client, db_session, auth_headers):
+        """Test the send schema rejects an empty content and a mistyped agent_id"""
+        empty = client.post('/api/messages/', json={'content': '', 'agent_id': 1}, headers=auth_headers)
+        mistyped = client.post('/api/messages/', json={'content': 'hi', 'agent_id': [1]}, headers=auth_headers)
+
+        assert empty.status_code == mistyped.status_code == 400
+        assert json.loads(mistyped.data)['error'] == "Field 'agent_id' must be of type int or str"
@@ -0,0 +1,90 @@
+"""
+Unit tests for multisig API helpers
+"""
+
+from routes.multisig import _user_address
+
+
+class TestMultisigHelpers:
+    """Test multisig route helpers"""
+
+    def test_user_address_from_jwt_identity(self):
+        """Test string identities format to a zero-padded 20-byte address, cached per user"""
+        address = _user_address('42')
+
+        assert address == '0x' + '0' * 38 + '42'
+        assert len(address) == 42
+        assert _user_address('42') is address
+
+    def test_supported_chains_prebuilt_body(self):
+        """Test the static chain list is served from the pre-encoded body"""
+        import json
+        from flask import Flask
+        from routes.multisig import multisig_bp, _SUPPORTED_CHAINS_BODY
+
+        app = Flask(__name__)
+        app.register_blueprint(multisig_bp, url_prefix='/api/multisig')
+        response = app.test_client().get('/api/multisig/supported-chains')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        assert response.data == _SUPPORTED_CHAINS_BODY
+        assert json.loads(response.data)['supported_chains'] == ['ethereum', 'polygon', 'solana']
+
+    def test_wallet_status_cached_with_etag(self):
+        """Test a repeat status read reuses the cached body and revalidates to 304"""
+        from unittest.mock import patch
+        from flask import Flask
+        from flask_jwt_extended import JWTManager, create_access_token
+        from routes.multisig import multisig_bp, _wallet_status_cache
+
+        app = Flask(__name__)
+        app.config['JWT_SECRET_KEY'] = 'test-jwt-secret-key-with-enough-length'
+        JWTManager(app)
+        app.register_blueprint(multisig_bp, url_prefix='/api/multisig')
+        with app.app_context():
+            headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+        client = app.test_client()
+        url = '/api/multisig/wallet/0xabc/status'
+
+        _wallet_status_cache.clear()
+        with patch('routes.multisig.multisig_manager') as manager:
+            manager.get_multisig_status.return_value = {'threshold': 2}
+            first = client.get(url, headers=headers)
+            second = client.get(url, headers={**headers, 'If-None-Match': first.headers['ETag']})
+        _wallet_status_cache.clear()
+
+        assert first.status_code == 200
+        assert first.get_json() == {'wallet_status': {'threshold': 2}}
+        assert second.status_code == 304 and second.data == b''
+        assert manager.get_multisig_status.call_count == 1
+
+    def test_wallet_writes_drop_cached_status(self):
+        """Test owner changes and approvals are visible on the next status read"""
+        from unittest.mock import patch
+        from flask import Flask
+        from flask_jwt_extended import JWTManager, create_access_token
+        from routes.multisig import multisig_bp, _wallet_status_cache
+
+        app = Flask(__name__)
+        app.config['JWT_SECRET_KEY'] = 'test-jwt-secret-key-with-enough-length'
+        JWTManager(app)
+        app.register_blueprint(multisig_bp, url_prefix='/api/multisig')
+        with app.app_context():
+            headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+        client = app.test_client()
+        url = '/api/multisig/wallet/0xabc/status'
+
+        _wallet_status_cache.clear()
+        with patch('routes.multisig.multisig_manager') as manager:
+            manager.get_multisig_status.side_effect = [{'threshold': 2}, {'threshold': 3}, {'threshold': 4}]
+            manager.approve_transaction.return_value = {'transaction_id': 'tx1', 'status': 'approved'}
+            client.get(url, headers=headers)
+            client.post('/api/multisig/wallet/0xabc/add-owner', json={'new_owner': '0xdef'}, headers=headers)
+            after_write = client.get(url, headers=headers)
+            client.post('/api/multisig/transaction/tx1/approve', json={'transaction_id': 'tx1'}, headers=headers)
+            after_approval = client.get(url, headers=headers)
+        _wallet_status_cache.clear()
+
+        assert after_write.get_json() == {'wallet_status': {'threshold': 3}}
+        assert after_approval.get_json() == {'wallet_status': {'threshold': 4}}
@@ -0,0 +1,193 @@
+"""
+Unit tests for sessions API endpoints
+"""
+
+import pytest
+import json
+
+
+@pytest.fixture
+def user_headers(app):
+    """Auth headers for a numeric user id, as the session routes expect"""
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+
+
+@pytest.fixture
+def agent_id(app, db_session, mock_agent):
+    """An agent without an owner, open to any user"""
+    from models import Agent, db
+
+    with app.app_context():
+        agent = Agent(name=mock_agent['name'], address=mock_agent['address'], agent_type='healthcare')
+        db.session.add(agent)
+        db.session.commit()
+        return agent.id
+
+
+class TestSessionsAPI:
+    """Test sessions API endpoints"""
+
+    def test_create_session(self, client, user_headers, agent_id):
+        """Test a session can be opened with an unowned agent"""
+        response = client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers)
+
+        assert response.status_code == 201
+        session = json.loads(response.data)['session']
+        assert session['agent_id'] == agent_id
+        assert session['user_id'] == 1
+        # Server-side defaults come back from RETURNING
+        assert session['started_at'] and session['ended_at'] is None
+
+    def test_create_session_refreshes_agent_status(self, client, user_headers, agent_id):
+        """Test a new session shows up in the cached agent status counts"""
+        def active_sessions():
+            status = json.loads(client.get('/api/agents/status').data)
+            return next(agent['active_sessions'] for agent in status if agent['agent_id'] == agent_id)
+
+        assert active_sessions() == 0
+        client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers)
+
+        assert active_sessions() == 1
+
+    def test_delete_session_refreshes_agent_status(self, client, user_headers, agent_id):
+        """Test deleting an active session drops it from the cached agent status counts"""
+        def active_sessions():
+            status = json.loads(client.get('/api/agents/status').data)
+            return next(agent['active_sessions'] for agent in status if agent['agent_id'] == agent_id)
+
+        created = client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers)
+        assert active_sessions() == 1
+        session_id = json.loads(created.data)['session']['id']
+        assert client.delete(f'/api/sessions/{session_id}', headers=user_headers).status_code == 200
+
+        assert active_sessions() == 0
+
+    def test_create_session_unknown_agent(self, client, db_session, user_headers):
+        """Test an unknown agent id is a 404"""
+        response = client.post('/api/sessions/', json={'agent_id': 999999}, headers=user_headers)
+
+        assert response.status_code == 404
+
+    def test_create_session_other_owner(self, app, client, user_headers, agent_id):
+        """Test another user's agent is refused"""
+        from models import Agent, db
+
+        with app.app_context():
+            db.session.get(Agent, agent_id).owner_id = 2
+            db.session.commit()
+
+        response = client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers)
+
+        assert response.status_code == 403
+
+    def test_sessions_keyset_pages(self, client, user_headers, agent_id):
+        """Test ?cursor walks every session once, newest first, without a total"""
+        created = [
+            json.loads(client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers).data)['session']['id']
+            for _ in range(5)
+        ]
+
+        seen, cursor = [], ''
+        while cursor is not None:
+            data = json.loads(client.get(f'/api/sessions/?per_page=2&cursor={cursor}', headers=user_headers).data)
+            assert 'total' not in data['pagination']
+            seen += [s['id'] for s in data['sessions']]
+            cursor = data['pagination']['next_cursor']
+
+        assert seen == sorted(created, reverse=True)
+
+    def test_session_listings(self, client, user_headers, agent_id):
+        """Test the paged and active listings return the full session fields"""
+        client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers)
+
+        listed = json.loads(client.get('/api/sessions/', headers=user_headers).data)
+        active = json.loads(client.get('/api/sessions/active', headers=user_headers).data)
+
+        assert listed['pagination']['total'] == 1
+        assert set(listed['sessions'][0]) == {
+            'id', 'session_id', 'agent_id', 'user_id', 'status', 'started_at', 'ended_at', 'agent_metadata'
+        }
+        assert active['count'] == 1
+        assert active['active_sessions'][0]['agent_id'] == agent_id
+
+    def test_sessions_page_total_in_one_query(self, client, user_headers, agent_id):
+        """Test page mode reports totals from the window count, including past the end"""
+        for _ in range(3):
+            client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers)
+
+        second = json.loads(client.get('/api/sessions/?page=2&per_page=2', headers=user_headers).data)
+        beyond = json.loads(client.get('/api/sessions/?page=5&per_page=2', headers=user_headers).data)
+
+        assert len(second['sessions']) == 1
+        assert 'total' not in second['sessions'][0]
+        assert second['pagination'] == {
+            'page': 2, 'per_page': 2, 'total': 3, 'pages': 2, 'has_next': False, 'has_prev': True
+        }
+        assert beyond['sessions'] == [] and beyond['pagination']['total'] == 3
+
+    def test_sessions_per_page_bounded(self, client, user_headers, agent_id):
+        """Test a non-positive per_page falls back to the default and a huge one is capped"""
+        from routes.sessions import MAX_SESSIONS_PER_PAGE
+
+        client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers)
+
+        zero = json.loads(client.get('/api/sessions/?cursor=&per_page=0', headers=user_headers).data)
+        huge = json.loads(client.get('/api/sessions/?per_page=100000', headers=user_headers).data)
+
+        assert zero['pagination'] == {'per_page': 20, 'has_next': False, 'next_cursor': None}
+        assert len(zero['sessions']) == 1
+        assert huge['pagination']['per_page'] == MAX_SESSIONS_PER_PAGE
+
+    def test_sessions_query_error_is_json_500(self, client, user_headers, agent_id):
+        """Test a failing listing query still answers with the JSON error"""
+        from unittest.mock import patch
+
+        client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers)
+        with patch('routes.sessions._session_payload', side_effect=RuntimeError('db down')):
+            response = client.get('/api/sessions/?cursor=', headers=user_headers)
+
+        assert response.status_code == 500
+        assert json.loads(response.data)['error'] == 'Failed to get sessions: db down'
+
+    def test_session_scoped_to_owner(self, app, client, user_headers, agent_id):
+        """Test another user's session reads, updates and deletes as not found"""
+        from flask_jwt_extended import create_access_token
+
+        session_id = json.loads(
+            client.post('/api/sessions/', json={'agent_id': agent_id}, headers=user_headers).data
+        )['session']['id']
+        with app.app_context():
+            other = {'Authorization': f'Bearer {create_access_token(identity="2")}'}
+
+        assert client.get(f'/api/sessions/{session_id}', headers=other).status_code == 404
+        assert client.put(f'/api/sessions/{session_id}', json={'status': 'ended'}, headers=other).status_code == 404
+        assert client.delete(f'/api/sessions/{session_id}', headers=other).status_code == 404
+
+        assert json.loads(client.get(f'/api/sessions/{session_id}', headers=user_headers).data)['session']['status'] == 'active'
+        assert client.delete(f'/api/sessions/{session_id}', headers=user_headers).status_code == 200
+        assert client.get(f'/api/sessions/{session_id}', headers=user_headers).status_code == 404
+
+    def test_non_numeric_identity_is_401(self, client, db_session, auth_headers):
+        """Test a token whose identity is not a user id gets a JSON 401, not a crash"""
+        responses = [
+            client.get('/api/sessions/', headers=auth_headers),
+            client.get('/api/sessions/1', headers=auth_headers),
+            client.delete('/api/sessions/1', headers=auth_headers),
+        ]
+
+        assert [response.status_code for response in responses] == [401, 401, 401]
+        assert json.loads(responses[0].data)['error'] == 'Invalid user identity'
+
+    def test_response_timestamp_per_second(self):
+        """Test the response timestamp is whole-second UTC and formatted once per second"""
+        from unittest.mock import patch
+        from routes import sessions
+
+        with patch('routes.sessions.time.time', side_effect=[1700000000.2, 1700000000.9, 1700000001.0]):
+            first = sessions._now_iso()
+            assert sessions._now_iso() is first
+            assert first == '2023-11-14T22:13:20'
+            assert sessions._now_iso() == '2023-11-14T22:13:21'
@@ -0,0 +1,120 @@
+"""
+Unit tests for the orjson-backed JSON provider
+"""
+
+import json
+from datetime import datetime
+from flask import Flask, jsonify
+
+from utils.json_provider import init_json_provider, json_column_dumps, json_column_loads, stream_json_array
+
+
+class TestOrjsonProvider:
+    """Test the Flask JSON provider"""
+    
+    def test_jsonify_round_trip(self):
+        """jsonify output parses back to the same payload"""
+        app = Flask(__name__)
+        init_json_provider(app)
+        payload = {'agents': [{'id': 1, 'name': 'Healthcare Assistant', 'capabilities': ['a', 'b']}], 'count': 1}
+        
+        with app.app_context():
+            response = jsonify(payload)
+        
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.data) == payload
+    
+    def test_datetime_and_int_keys(self):
+        """datetimes serialize to ISO 8601 and non-string keys are allowed"""
+        app = Flask(__name__)
+        provider = init_json_provider(app)
+        
+        data = json.loads(provider.dumps({'at': datetime(2024, 1, 1, 12, 30), 1: 'one'}))
+        
+        assert data['1'] == 'one'
+        assert data['at'].startswith('2024-01-01')
+    
+    def test_request_json_parsing(self):
+        """request.get_json() goes through the provider's loads"""
+        app = Flask(__name__)
+        init_json_provider(app)
+        
+        @app.route('/echo', methods=['POST'])
+        def echo():
+            from flask import request
+            return jsonify(request.get_json())
+        
+        response = app.test_client().post('/echo', json={'query': 'héllo'})
+        assert json.loads(response.data) == {'query': 'héllo'}
+    
+    def test_stream_json_array(self):
+        """Streamed chunks join into a valid array across batch boundaries"""
+        app = Flask(__name__)
+        init_json_provider(app)
+        
+        with app.app_context():
+            empty = b''.join(stream_json_array(iter([])))
+            chunks = list(stream_json_array(({'id': i} for i in range(5)), batch_size=2))
+        
+        assert json.loads(empty) == []
+        assert json.loads(b''.join(chunks)) == [{'id': i} for i in range(5)]
+        assert len(chunks) == 5  # '[', three batches, ']'
+    
+    def test_dumps_bytes_without_app(self):
+        """Module-level dumps_bytes works outside an app context"""
+        from utils.json_provider import dumps_bytes
+        
+        body = dumps_bytes({'severity_levels': ['high', 'low'], 'total': 2})
+        
+        assert isinstance(body, bytes)
+        assert json.loads(body) == {'severity_levels': ['high', 'low'], 'total': 2}
+    
+    def test_dumps_bytes_uses_provider_default(self):
+        """Module-level dumps_bytes encodes what jsonify does, with or without orjson"""
+        from decimal import Decimal
+        from unittest.mock import patch
+        from utils.json_provider import dumps_bytes
+        
+        payload = {'score': Decimal('0.85'), 'at': datetime(2024, 1, 1, 12, 30)}
+        expected = {'score': '0.85', 'at': '2024-01-01T12:30:00'}
+        
+        assert json.loads(dumps_bytes(payload)) == expected
+        with patch('utils.json_provider.orjson', None):
+            assert json.loads(dumps_bytes(payload)) == expected
+    
+    def test_stdlib_fallback_keeps_iso_dates(self):
+        """Without orjson, datetimes still serialize as ISO 8601"""
+        from unittest.mock import patch
+        
+        app = Flask(__name__)
+        provider = init_json_provider(app)
+        
+        with patch('utils.json_provider.orjson', None):
+            data = json.loads(provider.dumps({'at': datetime(2024, 1, 1, 12, 30)}))
+        
+        assert data['at'] == '2024-01-01T12:30:00'
+
+
+class TestJsonColumnCodec:
+    """Test the SQLAlchemy JSON column serializer pair"""
+    
+    def test_round_trip(self):
+        """Column values encode to str and decode back unchanged"""
+        value = {'response_time': '2024-01-02T03:04:05', 'tags': ['a', 'b'], 'score': 0.5, 'nested': {'ok': True}}
+        
+        encoded = json_column_dumps(value)
+        
+        assert isinstance(encoded, str)
+        assert json_column_loads(encoded) == value
+    
+    def test_engine_uses_codec(self, tmp_path):
+        """A JSON column written through the engine reads back via the codec"""
+        from sqlalchemy import JSON, Column, Integer, MetaData, Table, create_engine, insert, select
+        
+        engine = create_engine(f'sqlite:///{tmp_path}/codec.db',
+                               json_serializer=json_column_dumps, json_deserializer=json_column_loads)
+        table = Table('t', MetaData(), Column('id', Integer, primary_key=True), Column('data', JSON))
+        table.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(table).values(data={1: 'int key'}))
+            assert conn.execute(select(table.c.data)).scalar() == {'1': 'int key'}
@@ -0,0 +1,74 @@
+"""
+Unit tests for structured logging
+"""
+
+import atexit
+import json
+import queue
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from utils.logging import StructuredLogger
+
+
+@pytest.fixture
+def async_logger():
+    """A fresh logger whose exit hook does not outlive the test"""
+    logger = StructuredLogger('test_async_logger')
+    yield logger
+    atexit.unregister(logger._flush_at_exit)
+
+
+class TestAsyncEvents:
+    """Test events queued for the background writer"""
+
+    def test_async_event_written_off_thread(self, app, async_logger):
+        """Test a queued event carries the request id and is written by the writer thread"""
+        logger = async_logger
+        written = []
+        with patch.object(logger.logger, 'log', side_effect=lambda level, msg: written.append(msg)):
+            with app.test_request_context():
+                from flask import g
+                g.request_id = 'req-1'
+                logger.log_event_async('INFO', 'wallet_created', {'threshold': 2})
+            logger.flush()
+
+        record = json.loads(written[0])
+        assert record['event'] == 'wallet_created'
+        assert record['request_id'] == 'req-1'
+        assert record['data'] == {'threshold': 2}
+
+    def test_full_queue_drops_instead_of_blocking(self, app, async_logger):
+        """Test events past the queue bound are counted and dropped"""
+        logger = async_logger
+        logger._ensure_writer()
+        with patch.object(logger._queue, 'put_nowait', side_effect=queue.Full):
+            with app.test_request_context():
+                logger.log_event_async('INFO', 'dropped')
+
+        assert logger.dropped_events == 1
+
+    def test_exit_flush_is_bounded_and_reports_drops(self, async_logger):
+        """Test the exit hook stops waiting on a stuck writer and logs what was lost"""
+        logger = async_logger
+        logger.EXIT_FLUSH_TIMEOUT = 0.05
+        logger._ensure_writer()
+        logger.dropped_events = 1
+        release = threading.Event()
+        written = []
+
+        def write(level, log_data):
+            if log_data['event'] == 'stuck':
+                release.wait(1)
+            else:
+                written.append(log_data)
+
+        with patch.object(logger, '_write', side_effect=write):
+            logger._queue.put_nowait(('INFO', {'event': 'stuck'}))
+            logger._flush_at_exit()
+            release.set()
+
+        assert written[0]['event'] == 'log_events_dropped'
+        assert written[0]['data'] == {'dropped_events': 2}
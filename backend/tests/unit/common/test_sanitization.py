@@ -0,0 +1,100 @@
+"""
+Unit tests for input schema validation
+"""
+
+from flask import Flask, g, jsonify
+from unittest.mock import patch
+
+from utils.sanitization import _compile_schema, require_sanitized_input, validate_input_schema
+
+
+SCHEMA = {
+    'name': {'required': True, 'type': str, 'pattern': r'^[a-z]+$', 'max_length': 5},
+    'owners': {'required': False, 'type': list, 'min_length': 1, 'max_length': 3},
+    'threshold': {'required': False, 'type': int, 'min_value': 1},
+    'chain': {'required': False, 'type': str, 'choices': ('ethereum', 'polygon')},
+    'amount': {'required': False, 'type': (int, float, str), 'max_value': 100}
+}
+
+
+def _post(payload):
+    app = Flask(__name__)
+    
+    @app.route('/', methods=['POST'])
+    @validate_input_schema(SCHEMA)
+    def view():
+        return jsonify({'ok': True})
+    
+    response = app.test_client().post('/', json=payload)
+    return response.status_code, response.get_json()
+
+
+class TestValidateInputSchema:
+    """Test the compiled schema validator"""
+    
+    def test_compiled_once_per_schema(self):
+        """The same schema object reuses its compiled rules"""
+        assert _compile_schema(SCHEMA) is _compile_schema(SCHEMA)
+    
+    def test_valid_payload_passes(self):
+        """A payload meeting every rule reaches the view"""
+        owners = ['0x' + '1' * 40, '0x' + '2' * 40]
+        assert _post({'name': 'alice', 'owners': owners, 'threshold': 2, 'chain': 'polygon'}) == (200, {'ok': True})
+    
+    def test_rules_enforced(self):
+        """Missing, mistyped, out-of-range and unmatched values are 400s"""
+        assert _post({})[1]['error'] == "Required field 'name' is missing"
+        assert _post({'name': 'Alice'})[1]['error'] == "Field 'name' does not match required pattern"
+        assert _post({'name': 'bob', 'threshold': 0})[1]['error'] == "Field 'threshold' must be at least 1"
+        assert _post({'name': 'bob', 'owners': ['a', 'b', 'c', 'd']})[1]['error'] == "Field 'owners' must be no more than 3 items"
+        assert _post({'name': 'bobbie'})[1]['error'] == "Field 'name' must be no more than 5 characters"
+        assert _post({'name': 'bob', 'amount': 'lots'}) == (400, {'error': "Field 'amount' must be a number"})
+        assert _post({'name': 'bob', 'chain': 'solana'})[1]['error'] == "Field 'chain' must be one of: ethereum, polygon"
+
+
+class TestRequireSanitizedInput:
+    """Test the sanitizing decorator"""
+    
+    def test_body_parsed_once_and_always_bound(self):
+        """The body is parsed once, and g.sanitized_data is a dict even without one"""
+        app = Flask(__name__)
+        
+        @app.route('/', methods=['POST'])
+        @require_sanitized_input
+        def view():
+            return jsonify(g.sanitized_data)
+        
+        client = app.test_client()
+        with patch.object(app.json, 'loads', wraps=app.json.loads) as loads:
+            response = client.post('/', json={'name': 'bob'})
+        assert loads.call_count == 1
+        assert response.get_json() == {'name': 'bob'}
+        assert client.post('/', data='null', content_type='application/json').get_json() == {}
+        assert client.post('/').get_json() == {}
+
+
+class TestPlainTextFastPath:
+    """Test skipping bleach for plain text never changes the result"""
+    
+    SAMPLES = ['plain text', 'tab\tand\nnewline', 'nul\x00byte', 'crlf\r\nline', 'lone\rcr',
+               'bell\x07char', 'esc\x1b[0m', '<b>bold</b>', 'fish & chips', 'del\x7fc1\x85']
+    
+    def test_sanitize_input_matches_bleach(self):
+        """sanitize_input gives bleach.clean's output, control characters included"""
+        import bleach
+        from routes.auth import sanitize_input
+        
+        for text in self.SAMPLES:
+            assert sanitize_input(text) == bleach.clean(text, tags=[], strip=True), repr(text)
+        assert sanitize_input('crlf\r\nline') == 'crlf\nline'
+        assert sanitize_input('nul\x00byte') == 'nulbyte'
+    
+    def test_sanitize_username_matches_bleach(self):
+        """sanitize_username keeps its pre-fast-path result for every sample"""
+        import bleach
+        from utils.sanitization import InputSanitizer, _USERNAME_DISALLOWED
+        
+        for text in self.SAMPLES:
+            expected = _USERNAME_DISALLOWED.sub('', bleach.clean(text, tags=[], strip=True))
+            if 3 <= len(expected) <= 30:
+                assert InputSanitizer.sanitize_username(text) == expected, repr(text)
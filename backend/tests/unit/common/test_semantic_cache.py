@@ -0,0 +1,86 @@
+"""
+Unit tests for the semantic response cache
+"""
+
+from utils.semantic_cache import SemanticCache
+
+
+class TestSemanticCache:
+    """Test near-duplicate lookup"""
+    
+    def test_rephrasing_with_function_words_hits(self):
+        """The same question with different filler words reuses the answer"""
+        cache = SemanticCache()
+        cache.put('healthcare', 'What are the flu symptoms?', 'answer')
+        
+        assert cache.get('healthcare', 'what flu symptoms please') == 'answer'
+    
+    def test_different_questions_miss(self):
+        """Interrogatives and word order distinguish questions on the same terms"""
+        cache = SemanticCache()
+        cache.put('healthcare', 'when should I take insulin', 'answer')
+        cache.put('logistics', 'route from berlin to paris', 'answer')
+        
+        assert cache.get('healthcare', 'why should I take insulin') is None
+        assert cache.get('logistics', 'route from paris to berlin') is None
+    
+    def test_namespaces_are_separate(self):
+        """The same question to another agent type misses"""
+        cache = SemanticCache()
+        cache.put('healthcare', 'diabetes diet advice', 'answer')
+        
+        assert cache.get('financial', 'diabetes diet advice') is None
+    
+    def test_below_threshold_misses(self):
+        """A partially overlapping question is not treated as the same"""
+        cache = SemanticCache(threshold=0.95)
+        cache.put('healthcare', 'diabetes diet advice', 'answer')
+        
+        assert cache.get('healthcare', 'diabetes exercise advice') is None
+    
+    def test_stopword_only_text_not_cached(self):
+        """Greetings have no content terms and never hit"""
+        cache = SemanticCache()
+        cache.put('healthcare', 'hello', 'answer')
+        
+        assert cache.get('healthcare', 'hi') is None
+    
+    def test_generate_response_skips_model_on_hit(self, app):
+        """AIAgentIntelligence only calls the model once for a repeated question"""
+        from unittest.mock import patch
+        from utils.ai_intelligence import AIAgentIntelligence
+        
+        intelligence = AIAgentIntelligence()
+        with app.test_request_context(), \
+                patch.object(intelligence, '_call_ai_model', return_value='reply') as call:
+            assert intelligence.generate_response('healthcare', 'What are flu symptoms?') == 'reply'
+            assert intelligence.generate_response('healthcare', 'what are the flu symptoms please') == 'reply'
+        
+        assert call.call_count == 1
+    
+    def test_generate_response_keyed_on_context(self, app):
+        """Another conversation's context never reuses a cached reply"""
+        from unittest.mock import patch
+        from utils.ai_intelligence import AIAgentIntelligence
+        
+        intelligence = AIAgentIntelligence()
+        alice = {'recent_messages': [{'content': 'I am pregnant', 'sender_type': 'user'}], 'timestamp': 1}
+        bob = {'recent_messages': [{'content': 'I am 70 years old', 'sender_type': 'user'}], 'timestamp': 2}
+        with app.test_request_context(), \
+                patch.object(intelligence, '_call_ai_model', side_effect=['for alice', 'for bob']) as call:
+            assert intelligence.generate_response('healthcare', 'flu medication', alice) == 'for alice'
+            assert intelligence.generate_response('healthcare', 'flu medication', bob) == 'for bob'
+            # Same conversation asked again later: only the request time differs
+            assert intelligence.generate_response('healthcare', 'flu medication', {**alice, 'timestamp': 3}) == 'for alice'
+        
+        assert call.call_count == 2
+    
+    def test_index_rebuilt_after_evictions(self):
+        """Evicted entries stop matching and their postings are dropped"""
+        cache = SemanticCache(maxsize=10)
+        for i in range(30):
+            cache.put('logistics', f'route {i} planning', f'answer {i}')
+        
+        assert cache.get('logistics', 'route 0 planning') is None
+        assert cache.get('logistics', 'route 29 planning') == 'answer 29'
+        assert len(cache._norms) <= 11
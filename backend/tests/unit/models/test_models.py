@@ -120,4 +120,42 @@ class TestModelImports:
             assert saved_entry is not None
             assert saved_entry.definition == 'Influenza is a viral infection'
             assert saved_entry.confidence_score == 85
-            assert saved_entry.relationships['symptoms'] == ['fever', 'cough']
\ No newline at end of file
+            assert saved_entry.relationships['symptoms'] == ['fever', 'cough']
+    
+    def test_agent_to_dict(self, app, db_session):
+        """Test serializing an Agent model"""
+        with app.app_context():
+            from models import Agent, db
+            
+            agent = Agent(
+                name='Financial Advisor',
+                address='agent1qtodict',
+                description='AI financial advisor',
+                capabilities=['investment_advice'],
+                status='active',
+                agent_type='financial',
+                agent_metadata={'tier': 'pro'}
+            )
+            db.session.add(agent)
+            db.session.commit()
+            
+            data = agent.to_dict()
+            assert data['id'] == agent.id
+            assert data['name'] == 'Financial Advisor'
+            assert data['capabilities'] == ['investment_advice']
+            assert data['created_at'] == agent.created_at.isoformat()
+            assert 'metadata' not in data
+            assert agent.to_dict(include_metadata=True)['metadata'] == {'tier': 'pro'}
+    
+    def test_session_ids_time_ordered(self):
+        """Test session ids are version 7 UUIDs that sort by creation time"""
+        import time
+        from models import new_session_id
+        
+        first = new_session_id()
+        time.sleep(0.002)
+        second = new_session_id()
+        
+        assert first.version == second.version == 7
+        assert first.variant == second.variant
+        assert first.hex < second.hex
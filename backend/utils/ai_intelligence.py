@@ -1,14 +1,47 @@
 import openai
 import requests
+import hashlib
 import json
 import os
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
 from utils.logging import StructuredLogger
+from utils.semantic_cache import SemanticCache
+from utils.json_provider import OrjsonProvider
 
 logger = StructuredLogger('ai_intelligence')
 
+# Near-duplicate questions to the same agent type reuse an earlier answer
+# instead of paying for another model call
+RESPONSE_CACHE_THRESHOLD = float(os.getenv('RESPONSE_CACHE_THRESHOLD', 0.95))
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 3600))
+
+# Keyword tables for analyze_sentiment / extract_intent, built once at import
+POSITIVE_WORDS = ('good', 'great', 'excellent', 'happy', 'satisfied', 'love', 'amazing', 'wonderful')
+NEGATIVE_WORDS = ('bad', 'terrible', 'awful', 'hate', 'angry', 'frustrated', 'disappointed', 'worried')
+
+INTENT_PATTERNS = {
+    'healthcare': {
+        'symptom_check': ['symptom', 'pain', 'ache', 'hurt', 'feel'],
+        'medication_question': ['medication', 'drug', 'pill', 'medicine', 'prescription'],
+        'health_advice': ['advice', 'recommendation', 'should i', 'what should'],
+        'emergency': ['emergency', 'urgent', 'immediate', 'call 911', 'ambulance']
+    },
+    'financial': {
+        'investment_advice': ['invest', 'investment', 'portfolio', 'buy', 'sell'],
+        'defi_question': ['defi', 'yield', 'staking', 'liquidity', 'protocol'],
+        'risk_assessment': ['risk', 'safe', 'dangerous', 'volatile', 'stable'],
+        'market_analysis': ['market', 'price', 'trend', 'analysis', 'forecast']
+    },
+    'logistics': {
+        'route_optimization': ['route', 'path', 'delivery', 'shipping', 'transport'],
+        'inventory_management': ['inventory', 'stock', 'warehouse', 'storage'],
+        'cost_reduction': ['cost', 'expensive', 'cheap', 'budget', 'save money'],
+        'supply_chain': ['supply chain', 'vendor', 'supplier', 'procurement']
+    }
+}
+
 class AIAgentIntelligence:
     """Enhanced AI intelligence for agents"""
     
@@ -20,10 +53,22 @@ class AIAgentIntelligence:
             'gpt-3.5-turbo': {'provider': 'openai', 'max_tokens': 2000},
             'claude-3': {'provider': 'anthropic', 'max_tokens': 4000}
         }
+        self.response_cache = SemanticCache(threshold=RESPONSE_CACHE_THRESHOLD, ttl=RESPONSE_CACHE_TTL)
     
     def generate_response(self, agent_type: str, user_message: str, context: Dict[str, Any] = None) -> str:
         """Generate intelligent response using AI"""
         
+        # Replies depend on the conversation, so only the same agent type and
+        # the same conversation (or context) may share an answer
+        namespace = self._cache_namespace(agent_type, context)
+        cached = self.response_cache.get(namespace, user_message)
+        if cached is not None:
+            logger.log_event('INFO', 'ai_response_cache_hit', {
+                'agent_type': agent_type,
+                'user_message_length': len(user_message)
+            })
+            return cached
+        
         try:
             # Get agent-specific prompt
             prompt = self._build_agent_prompt(agent_type, user_message, context)
@@ -43,12 +88,29 @@ class AIAgentIntelligence:
                 'context_provided': bool(context)
             })
             
+            # Fallback responses below are not cached, so a failed call is retried next time
+            self.response_cache.put(namespace, user_message, response)
             return response
             
         except Exception as e:
             logger.log_error(e, f"AI response generation failed for {agent_type}")
             return self._fallback_response(agent_type, user_message)
     
+    @staticmethod
+    def _cache_namespace(agent_type: str, context: Dict[str, Any] = None) -> str:
+        """Response cache namespace: the agent type plus the conversation, or a digest of the context"""
+        # recent_messages gains a turn on every call, so a digest of it never
+        # repeats within a conversation; key on the conversation itself
+        conversation_id = (context or {}).get('conversation_id')
+        if conversation_id is not None:
+            return f"{agent_type}:conversation:{conversation_id}"
+        # The request time changes on every call and says nothing about the conversation
+        stable = {key: value for key, value in (context or {}).items() if key != 'timestamp'}
+        if not stable:
+            return agent_type
+        encoded = json.dumps(stable, sort_keys=True, default=OrjsonProvider.default).encode('utf-8')
+        return f"{agent_type}:{hashlib.blake2b(encoded, digest_size=16).hexdigest()}"
+    
     def _build_agent_prompt(self, agent_type: str, user_message: str, context: Dict[str, Any] = None) -> str:
         """Build agent-specific prompt"""
         
@@ -111,7 +173,7 @@ class AIAgentIntelligence:
         # Build context information
         context_info = ""
         if context:
-            context_info = f"\n\nAdditional Context:\n{json.dumps(context, indent=2)}"
+            context_info = f"\n\nAdditional Context:\n{json.dumps(context, indent=2, default=OrjsonProvider.default)}"
         
         prompt = f"""{agent_config['system']}
 
@@ -386,12 +448,9 @@ A resilient supply chain can adapt to disruptions and maintain operations."""
         """Analyze sentiment of user input"""
         try:
             # Simple sentiment analysis (in production, use a proper NLP library)
-            positive_words = ['good', 'great', 'excellent', 'happy', 'satisfied', 'love', 'amazing', 'wonderful']
-            negative_words = ['bad', 'terrible', 'awful', 'hate', 'angry', 'frustrated', 'disappointed', 'worried']
-            
             text_lower = text.lower()
-            positive_count = sum(1 for word in positive_words if word in text_lower)
-            negative_count = sum(1 for word in negative_words if word in text_lower)
+            positive_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
+            negative_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
             
             if positive_count > negative_count:
                 sentiment = 'positive'
@@ -417,29 +476,8 @@ A resilient supply chain can adapt to disruptions and maintain operations."""
     def extract_intent(self, text: str, agent_type: str) -> Dict[str, Any]:
         """Extract user intent from text"""
         
-        intent_patterns = {
-            'healthcare': {
-                'symptom_check': ['symptom', 'pain', 'ache', 'hurt', 'feel'],
-                'medication_question': ['medication', 'drug', 'pill', 'medicine', 'prescription'],
-                'health_advice': ['advice', 'recommendation', 'should i', 'what should'],
-                'emergency': ['emergency', 'urgent', 'immediate', 'call 911', 'ambulance']
-            },
-            'financial': {
-                'investment_advice': ['invest', 'investment', 'portfolio', 'buy', 'sell'],
-                'defi_question': ['defi', 'yield', 'staking', 'liquidity', 'protocol'],
-                'risk_assessment': ['risk', 'safe', 'dangerous', 'volatile', 'stable'],
-                'market_analysis': ['market', 'price', 'trend', 'analysis', 'forecast']
-            },
-            'logistics': {
-                'route_optimization': ['route', 'path', 'delivery', 'shipping', 'transport'],
-                'inventory_management': ['inventory', 'stock', 'warehouse', 'storage'],
-                'cost_reduction': ['cost', 'expensive', 'cheap', 'budget', 'save money'],
-                'supply_chain': ['supply chain', 'vendor', 'supplier', 'procurement']
-            }
-        }
-        
         text_lower = text.lower()
-        agent_patterns = intent_patterns.get(agent_type, {})
+        agent_patterns = INTENT_PATTERNS.get(agent_type, {})
         
         detected_intents = []
         for intent, keywords in agent_patterns.items():
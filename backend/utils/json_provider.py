@@ -0,0 +1,115 @@
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from datetime import date
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson
+
+    Every jsonify() call and request.get_json() routes through this provider.
+    orjson serializes datetime/UUID/dataclass natively and writes bytes
+    straight into the response, skipping the str -> bytes re-encode. When
+    orjson is not installed the stdlib-based DefaultJSONProvider is used.
+    """
+
+    # Key sorting only helps diffing; skip it on the hot path
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        """Encode types orjson doesn't know; dates as ISO 8601 like orjson itself"""
+        # Keeps the stdlib fallback from switching dates to HTTP-date strings,
+        # so views can hand datetimes straight to jsonify()
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def _options(self, indent: bool = False) -> int:
+        """Build the orjson option bitmask"""
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes"""
+        if orjson is None:
+            kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+            return self.dumps(obj, **kwargs).encode('utf-8')
+        return orjson.dumps(obj, default=self.default, option=self._options(indent))
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+
+        return self._app.response_class(
+            self.dumps_bytes(obj, indent=indent) + b'\n',
+            mimetype=self.mimetype
+        )
+
+def dumps_bytes(obj) -> bytes:
+    """Serialize obj to compact JSON bytes without needing an app context"""
+    if orjson is None:
+        return json.dumps(obj, separators=(',', ':'), default=OrjsonProvider.default).encode('utf-8')
+    return orjson.dumps(obj, default=OrjsonProvider.default, option=orjson.OPT_NON_STR_KEYS)
+
+def json_column_dumps(obj) -> str:
+    """SQLAlchemy json_serializer for JSON/JSONB columns"""
+    if orjson is None:
+        return json.dumps(obj)
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+def json_column_loads(value):
+    """SQLAlchemy json_deserializer for JSON/JSONB columns"""
+    if orjson is None:
+        return json.loads(value)
+    return orjson.loads(value)
+
+def init_json_provider(app):
+    """Install the orjson provider on a Flask app"""
+    app.json = OrjsonProvider(app)
+    if orjson is None:
+        logger.warning("orjson not installed, using stdlib json for responses")
+    return app.json
+
+def stream_json_array(items, batch_size: int = 500):
+    """Encode an iterable as a JSON array in chunks for a streamed response
+
+    Neither the rows nor the encoded array are held in memory at once; each
+    chunk carries up to batch_size elements to keep socket writes coarse.
+    """
+    provider = current_app.json
+    encode = getattr(provider, 'dumps_bytes', None) or (lambda obj: provider.dumps(obj).encode('utf-8'))
+
+    yield b'['
+    buffer = []
+    first = True
+    for item in items:
+        buffer.append(encode(item))
+        if len(buffer) >= batch_size:
+            yield (b'' if first else b',') + b','.join(buffer)
+            buffer.clear()
+            first = False
+    if buffer:
+        yield (b'' if first else b',') + b','.join(buffer)
+    yield b']\n'
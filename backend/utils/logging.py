@@ -1,3 +1,4 @@
+import atexit
 import logging
 import json
 import os
@@ -7,15 +8,27 @@ from flask import request, g, current_app
 from functools import wraps
 import traceback
 import psutil
+import queue
+import threading
 import time
 from typing import Dict, Any, Optional
 
 class StructuredLogger:
     """Structured logging for the application"""
     
+    ASYNC_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    ASYNC_BATCH_SIZE = 256
+    EXIT_FLUSH_TIMEOUT = 2.0
+    
     def __init__(self, name: str = 'asi_agents'):
         self.logger = logging.getLogger(name)
         self._setup_logger()
+        self._queue = queue.Queue(maxsize=self.ASYNC_QUEUE_SIZE)
+        self._writer = None
+        self._writer_pid = None
+        self._writer_lock = threading.Lock()
+        self._dropped_lock = threading.Lock()
+        self.dropped_events = 0
     
     def _setup_logger(self):
         """Setup logger with proper formatting"""
@@ -67,7 +80,45 @@ class StructuredLogger:
     
     def log_event(self, level: str, event: str, data: Dict[str, Any] = None, **kwargs):
         """Log a structured event"""
+        self._write(level, self._event_record(level, event, data, **kwargs))
+    
+    def log_event_async(self, level: str, event: str, data: Dict[str, Any] = None, **kwargs):
+        """Queue a structured event for the background writer
         
+        The record (with request context) is built here, but serializing it and
+        the handler I/O happen on a daemon thread. When the queue is full the
+        event is dropped and counted rather than blocking the request.
+        """
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((level, self._event_record(level, event, data, **kwargs)))
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped_events += 1
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event has been written; False if timeout ran out first"""
+        if self._writer_pid != os.getpid():
+            return True
+        events = self._queue
+        with events.all_tasks_done:
+            return events.all_tasks_done.wait_for(lambda: not events.unfinished_tasks, timeout)
+    
+    def _flush_at_exit(self):
+        """Give the daemon writer a bounded chance to finish before the process exits"""
+        if not self.flush(self.EXIT_FLUSH_TIMEOUT):
+            with self._dropped_lock:
+                self.dropped_events += self._queue.unfinished_tasks
+        if self.dropped_events:
+            # No app context at interpreter exit, so skip _event_record's g lookups
+            self._write('WARNING', {
+                'timestamp': datetime.utcnow().isoformat(),
+                'event': 'log_events_dropped',
+                'level': 'WARNING',
+                'data': {'dropped_events': self.dropped_events}
+            })
+    
+    def _event_record(self, level: str, event: str, data: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
         log_data = {
             'timestamp': datetime.utcnow().isoformat(),
             'event': event,
@@ -83,19 +134,45 @@ class StructuredLogger:
         if hasattr(g, 'user_id'):
             log_data['user_id'] = g.user_id
         
+        return log_data
+    
+    def _write(self, level: str, log_data: Dict[str, Any]):
         # Log based on level
-        log_message = json.dumps(log_data, default=str)
-        
-        if level.upper() == 'DEBUG':
-            self.logger.debug(log_message)
-        elif level.upper() == 'INFO':
-            self.logger.info(log_message)
-        elif level.upper() == 'WARNING':
-            self.logger.warning(log_message)
-        elif level.upper() == 'ERROR':
-            self.logger.error(log_message)
-        elif level.upper() == 'CRITICAL':
-            self.logger.critical(log_message)
+        level_no = getattr(logging, level.upper(), None)
+        if isinstance(level_no, int) and self.logger.isEnabledFor(level_no):
+            self.logger.log(level_no, json.dumps(log_data, default=str))
+    
+    def _ensure_writer(self):
+        """Start the background writer, again in a forked worker process"""
+        if self._writer_pid == os.getpid():
+            return
+        with self._writer_lock:
+            if self._writer_pid != os.getpid():
+                # A forked child inherits the queue but not the thread
+                self._queue = queue.Queue(maxsize=self.ASYNC_QUEUE_SIZE)
+                self._writer = threading.Thread(target=self._drain, name=f'{self.logger.name}-writer', daemon=True)
+                self._writer.start()
+                if self._writer_pid is None:
+                    # Registered handlers survive fork, so once per logger is enough
+                    atexit.register(self._flush_at_exit)
+                self._writer_pid = os.getpid()
+    
+    def _drain(self):
+        events = self._queue
+        while True:
+            batch = [events.get()]
+            while len(batch) < self.ASYNC_BATCH_SIZE:
+                try:
+                    batch.append(events.get_nowait())
+                except queue.Empty:
+                    break
+            for level, log_data in batch:
+                try:
+                    self._write(level, log_data)
+                except Exception:
+                    pass
+                finally:
+                    events.task_done()
     
     def log_request(self, method: str, path: str, status_code: int, duration: float, **kwargs):
         """Log HTTP request"""
@@ -128,11 +205,12 @@ class StructuredLogger:
             **kwargs
         })
     
-    def log_agent_event(self, agent_id: str, event_type: str, **kwargs):
+    def log_agent_event(self, agent_id: str, event_type: str, data: Dict[str, Any] = None, **kwargs):
         """Log agent-related events"""
         self.log_event('INFO', 'agent_event', {
             'agent_id': agent_id,
             'event_type': event_type,
+            **(data or {}),
             **kwargs
         })
     
@@ -151,6 +229,8 @@ class PerformanceMonitor:
     def __init__(self):
         self.metrics = {}
         self.start_time = time.time()
+        # Prime psutil so the first non-blocking cpu_percent() has a baseline
+        psutil.cpu_percent(interval=None)
     
     def record_metric(self, name: str, value: float, tags: Dict[str, str] = None):
         """Record a performance metric"""
@@ -172,7 +252,7 @@ class PerformanceMonitor:
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get current system metrics"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
             
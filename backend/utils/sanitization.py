@@ -1,5 +1,4 @@
 from flask import request, g
-import bleach
 import re
 import html
 from functools import wraps
@@ -7,6 +6,19 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Characters bleach.clean acts on when no tags are allowed: markup, plus the C0
+# controls it rewrites (NUL is dropped, CR/CRLF become LF, the rest other than
+# tab and LF become '?')
+_BLEACH_CHARS = re.compile(r'[<>&\x00-\x08\x0b-\x1f]')
+_USERNAME_DISALLOWED = re.compile(r'[^a-zA-Z0-9_-]')
+_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_EVM_ADDRESS = re.compile(r'^0x[a-fA-F0-9]{40}$')
+_SOLANA_ADDRESS = re.compile(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$')
+
+def needs_cleaning(text: str) -> bool:
+    """Whether bleach.clean would change text (tags, entities, stray brackets, control characters)"""
+    return _BLEACH_CHARS.search(text) is not None
+
 class InputSanitizer:
     """Comprehensive input sanitization for XSS protection"""
     
@@ -35,6 +47,7 @@ class InputSanitizer:
         text = html.escape(text)
         
         if allow_html:
+            import bleach  # deferred: bleach pulls in html5lib
             # Use bleach for HTML content
             text = bleach.clean(
                 text,
@@ -54,9 +67,7 @@ class InputSanitizer:
         
         # Basic email validation and sanitization
         email = email.strip().lower()
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        
-        if re.match(email_pattern, email):
+        if _EMAIL.match(email):
             return email
         else:
             raise ValueError("Invalid email format")
@@ -68,10 +79,12 @@ class InputSanitizer:
             return ""
         
         # Remove HTML tags and dangerous characters
-        username = bleach.clean(username, tags=[], strip=True)
+        if needs_cleaning(username):
+            import bleach  # deferred: bleach pulls in html5lib
+            username = bleach.clean(username, tags=[], strip=True)
         
         # Allow only alphanumeric, underscore, and hyphen
-        username = re.sub(r'[^a-zA-Z0-9_-]', '', username)
+        username = _USERNAME_DISALLOWED.sub('', username)
         
         # Length validation
         if len(username) < 3 or len(username) > 30:
@@ -89,11 +102,11 @@ class InputSanitizer:
         address = address.strip().lower()
         
         # Ethereum address validation (42 characters, starts with 0x)
-        if re.match(r'^0x[a-fA-F0-9]{40}$', address):
+        if _EVM_ADDRESS.match(address):
             return address
         
         # Solana address validation (32-44 characters, base58)
-        if re.match(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$', address):
+        if _SOLANA_ADDRESS.match(address):
             return address
         
         raise ValueError("Invalid wallet address format")
@@ -135,12 +148,16 @@ def sanitize_request_data():
     """Middleware to sanitize all request data"""
     if request.is_json:
         try:
-            original_data = request.get_json()
-            sanitized_data = InputSanitizer.sanitize_json_data(original_data)
-            g.sanitized_data = sanitized_data
+            # Parsed once here (app.json is the orjson provider) and cached on
+            # the request; handlers read g.sanitized_data, not get_json()
+            original_data = request.get_json(silent=True)
+            g.sanitized_data = {} if original_data is None else InputSanitizer.sanitize_json_data(original_data)
         except Exception as e:
             logger.warning(f"Failed to sanitize JSON data: {e}")
             g.sanitized_data = {}
+    else:
+        # Handlers read g.sanitized_data directly; never leave it unset
+        g.sanitized_data = {}
     
     # Sanitize form data
     if request.form:
@@ -173,37 +190,107 @@ def require_sanitized_input(f):
     
     return decorated_function
 
+# id(schema) -> (schema, compiled rules); the schema is kept so its id stays unique
+_compiled_schemas = {}
+
+def _compile_schema(schema: dict) -> tuple:
+    """Flatten a validation schema into per-field tuples, compiling patterns once"""
+    cached = _compiled_schemas.get(id(schema))
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+    
+    compiled = []
+    for field, rules in schema.items():
+        expected_type = rules.get('type', str)
+        names = [t.__name__ for t in expected_type] if isinstance(expected_type, tuple) else [expected_type.__name__]
+        # Any iterable of allowed values; membership is a set lookup
+        choices = rules.get('choices')
+        if choices is not None:
+            choices = frozenset(choices)
+        pattern = rules.get('pattern')
+        compiled.append((
+            field,
+            rules.get('required', False),
+            expected_type,
+            f"Field '{field}' must be of type {' or '.join(names)}",
+            rules.get('min_length'),
+            rules.get('max_length'),
+            choices,
+            f"Field '{field}' must be one of: {', '.join(sorted(choices))}" if choices is not None else None,
+            re.compile(pattern).match if pattern is not None else None,
+            rules.get('min_value'),
+            rules.get('max_value'),
+        ))
+    compiled = tuple(compiled)
+    _compiled_schemas[id(schema)] = (schema, compiled)
+    return compiled
+
+def _check_compiled(data, compiled) -> None:
+    """Raise ValueError for the first rule data breaks"""
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    
+    for (field, required, expected_type, type_error, min_length, max_length,
+         choices, choices_error, pattern, min_value, max_value) in compiled:
+        if field not in data:
+            if required:
+                raise ValueError(f"Required field '{field}' is missing")
+            continue
+        value = data[field]
+        
+        # Type validation
+        if not isinstance(value, expected_type):
+            raise ValueError(type_error)
+        
+        # Length validation; lists and objects by item count, the rest as text
+        if min_length is not None or max_length is not None:
+            if isinstance(value, (list, dict)):
+                length, unit = len(value), 'items'
+            else:
+                length, unit = len(str(value)), 'characters'
+            if min_length is not None and length < min_length:
+                raise ValueError(f"Field '{field}' must be at least {min_length} {unit}")
+            if max_length is not None and length > max_length:
+                raise ValueError(f"Field '{field}' must be no more than {max_length} {unit}")
+        
+        # Range validation; a value that can't be compared is a bad request, not a 500
+        try:
+            if min_value is not None and value < min_value:
+                raise ValueError(f"Field '{field}' must be at least {min_value}")
+            if max_value is not None and value > max_value:
+                raise ValueError(f"Field '{field}' must be at most {max_value}")
+        except TypeError:
+            raise ValueError(f"Field '{field}' must be a number")
+        
+        # Fixed set of allowed values; a hash lookup, no regex engine
+        if choices is not None:
+            try:
+                allowed = value in choices
+            except TypeError:  # unhashable, e.g. a list
+                allowed = False
+            if not allowed:
+                raise ValueError(choices_error)
+        
+        # Pattern validation
+        if pattern is not None and not pattern(str(value)):
+            raise ValueError(f"Field '{field}' does not match required pattern")
+
+def check_schema(data, schema: dict) -> None:
+    """Validate one object against a schema outside a view, e.g. bulk items; raises ValueError"""
+    _check_compiled(data, _compile_schema(schema))
+
 def validate_input_schema(schema: dict):
     """Validate input against a schema"""
+    # Compiled when the route is decorated, not per request
+    compiled = _compile_schema(schema)
+    
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             try:
-                data = getattr(g, 'sanitized_data', request.get_json() or {})
-                
-                # Validate required fields
-                for field, rules in schema.items():
-                    if rules.get('required', False) and field not in data:
-                        raise ValueError(f"Required field '{field}' is missing")
-                    
-                    if field in data:
-                        value = data[field]
-                        
-                        # Type validation
-                        expected_type = rules.get('type', str)
-                        if not isinstance(value, expected_type):
-                            raise ValueError(f"Field '{field}' must be of type {expected_type.__name__}")
-                        
-                        # Length validation
-                        if 'min_length' in rules and len(str(value)) < rules['min_length']:
-                            raise ValueError(f"Field '{field}' must be at least {rules['min_length']} characters")
-                        
-                        if 'max_length' in rules and len(str(value)) > rules['max_length']:
-                            raise ValueError(f"Field '{field}' must be no more than {rules['max_length']} characters")
-                        
-                        # Pattern validation
-                        if 'pattern' in rules and not re.match(rules['pattern'], str(value)):
-                            raise ValueError(f"Field '{field}' does not match required pattern")
+                # Only parse the body here when no sanitizer ran first
+                data = g.sanitized_data if 'sanitized_data' in g else (request.get_json(silent=True) or {})
+                _check_compiled(data, compiled)
                 
                 return f(*args, **kwargs)
             except ValueError as e:
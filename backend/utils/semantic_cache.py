@@ -0,0 +1,126 @@
+import math
+import re
+from collections import Counter, defaultdict
+from threading import Lock
+from typing import Optional
+
+from cachetools import TTLCache
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Function words say nothing about what is being asked; dropping them lets
+# "what are my symptoms" and "tell me my symptoms" share their content terms.
+# Interrogatives stay: "when" and "why" ask different questions
+_STOPWORDS = frozenset("""
+    a about am an and any are as at be been but by can could do does for from
+    give had has have hello hey hi i if in is it its me my of on or
+    please show so tell than that the their them then there these this to
+    us was we were will with would you your
+""".split())
+
+def text_vector(text: str) -> Counter:
+    """Term counts: lowercased words without stopwords, plus adjacent word pairs
+
+    The pairs keep some word order, so "dog bites man" and "man bites dog"
+    are different questions.
+    """
+    tokens = [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+    vector = Counter(tokens)
+    vector.update(f'{first} {second}' for first, second in zip(tokens, tokens[1:]))
+    return vector
+
+def _norm(vector: Counter) -> float:
+    return math.sqrt(sum(count * count for count in vector.values()))
+
+class SemanticCache:
+    """Response cache that also matches near-duplicate questions
+
+    Entries are grouped by namespace (the agent type) and looked up by cosine
+    similarity of term vectors; anything at or above the threshold is a hit.
+    Entries expire after ttl seconds and the least recently used are evicted
+    beyond maxsize.
+
+    Lookups go through an inverted index of term -> entry keys, so only
+    entries sharing a term with the question are scored. The cache drops
+    expired and evicted entries without telling the index, so a candidate is
+    confirmed against the cache before it is returned and the index is rebuilt
+    once more than REBUILD_RATIO of its keys are stale.
+    """
+
+    REBUILD_RATIO = 0.1
+
+    def __init__(self, threshold: float = 0.95, maxsize: int = 1024, ttl: float = 3600):
+        self.threshold = threshold
+        # (namespace, sorted term counts) -> (norm, response)
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        # (namespace, term) -> {entry key: term count}, plus each indexed
+        # entry's norm; kept beside the cache so scoring does not touch LRU order
+        self._postings = defaultdict(dict)
+        self._norms = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(namespace: str, vector: Counter):
+        return namespace, tuple(sorted(vector.items()))
+
+    def get(self, namespace: str, text: str) -> Optional[str]:
+        """Cached response for text or a close paraphrase, if any"""
+        vector = text_vector(text)
+        if not vector:
+            return None
+        key = self._key(namespace, vector)
+        norm = _norm(vector)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[1]
+            dots = defaultdict(float)
+            for term, count in vector.items():
+                for entry_key, entry_count in self._postings.get((namespace, term), {}).items():
+                    dots[entry_key] += count * entry_count
+            scored = sorted(
+                ((dot / (norm * self._norms[entry_key]), entry_key) for entry_key, dot in dots.items()),
+                reverse=True,
+            )
+            for score, entry_key in scored:
+                if score < self.threshold:
+                    break
+                # Postings can outlive expired or evicted entries
+                entry = self._entries.get(entry_key)
+                if entry is not None:
+                    return entry[1]
+            return None
+
+    def put(self, namespace: str, text: str, response: str) -> None:
+        """Remember response for text"""
+        vector = text_vector(text)
+        if not vector:
+            return
+        key = self._key(namespace, vector)
+        norm = _norm(vector)
+        with self._lock:
+            self._entries[key] = (norm, response)
+            if key not in self._norms:
+                self._index(key, norm)
+            if len(self._norms) > len(self._entries) * (1 + self.REBUILD_RATIO):
+                self._rebuild_index()
+
+    def _index(self, key, norm: float) -> None:
+        namespace, terms = key
+        self._norms[key] = norm
+        for term, count in terms:
+            self._postings[namespace, term][key] = count
+
+    def _rebuild_index(self) -> None:
+        """Re-index the live entries, dropping postings for expired or evicted ones"""
+        self._postings.clear()
+        self._norms.clear()
+        for key, (norm, _) in list(self._entries.items()):
+            self._index(key, norm)
+
+    def clear(self) -> None:
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self._norms.clear()
@@ -51,6 +51,8 @@ const RealtimeManager = () => {
     try {
       const newSocket = io(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:5001', {
         transports: ['websocket', 'polling'],
+        // Verified on connect; joins this user's room for async agent replies
+        auth: { token: localStorage.getItem('auth_token') },
         timeout: 5000,
         reconnection: autoReconnect,
         reconnectionAttempts: 5,